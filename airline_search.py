@@ -0,0 +1,130 @@
+"""
+Airline name resolution for the delayed-flights-by-airline lookups.
+
+Description:
+    AirlineSearch keeps an in-memory trigram index over the names of the
+    small `airlines` table and resolves user input to airline IDs, so the
+    flights can then be looked up with an indexed `AIRLINE IN (...)`
+    predicate instead of joining every flight to its airline and matching
+    `lower(AIRLINE) LIKE '%...%'`.
+
+    Input is matched in this order:
+        - Substring: case-insensitive, like the former LIKE '%input%'
+          (including its % and _ wildcards). Names starting with the input,
+          or with a word starting with it, rank first.
+        - Fuzzy: if nothing contains the input, names that are similar to
+          it, or have a word that is (e.g. a typo such as "detla"), most
+          similar first.
+
+Notes:
+    - The index is built once from the airlines passed in; create a new
+      object after the `airlines` table changed.
+"""
+import re
+from difflib import SequenceMatcher
+
+# Minimum similarity (0..1) of an airline name, or of one of its words, to the
+# input for a fuzzy match
+FUZZY_CUTOFF = 0.75
+
+
+def like_to_regex(pattern: str):
+    """
+    Translate an SQL LIKE pattern into a case-insensitive regular expression.
+    """
+    translated = ''.join('.*' if char == '%' else
+                         '.' if char == '_' else
+                         re.escape(char) for char in pattern)
+    return re.compile(f"^{translated}$", re.IGNORECASE | re.DOTALL)
+
+
+def _trigrams(text: str) -> set:
+    """
+    Return the trigrams (substrings of length 3) of a lowercase string.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AirlineSearch:
+    """
+    Resolves (partial, possibly misspelled) airline names to airline IDs
+    using an in-memory trigram index.
+    """
+
+    def __init__(self, airlines):
+        """
+        Build the trigram index.
+
+        Parameter:
+            airlines (iterable of tuple): (ID, AIRLINE) rows.
+        """
+        self.names = {airline_id: name for airline_id, name in airlines
+                      if name is not None}
+        self._lower_names = {airline_id: name.lower()
+                             for airline_id, name in self.names.items()}
+        self._words = {airline_id: name.split()
+                       for airline_id, name in self._lower_names.items()}
+        self._index = {}
+        for airline_id, name in self._lower_names.items():
+            for trigram in _trigrams(name):
+                self._index.setdefault(trigram, set()).add(airline_id)
+
+    def _candidates(self, text: str) -> set:
+        """
+        Return the IDs of the airlines whose name contains every trigram of
+        the text (all airlines for texts shorter than a trigram).
+        """
+        trigrams = _trigrams(text)
+        if not trigrams:
+            return set(self._lower_names)
+        postings = sorted((self._index.get(trigram, set())
+                           for trigram in trigrams), key=len)
+        return set.intersection(*postings)
+
+    def _rank(self, airline_id, text) -> tuple:
+        """
+        Sort key of a substring match: prefix of the name first, then
+        prefix of a word, then by name.
+        """
+        name = self._lower_names[airline_id]
+        return (not name.startswith(text),
+                not any(word.startswith(text)
+                        for word in self._words[airline_id]),
+                name)
+
+    def match(self, airline: str, fuzzy=True) -> list:
+        """
+        Resolve an airline name to the IDs of the matching airlines.
+
+        Parameters:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+            fuzzy (bool):
+                Fall back to similar names if no name contains the input.
+
+        Returns:
+            list of int: The IDs of the matching airlines, best match first.
+        """
+        text = airline.lower()
+        if '%' in text or '_' in text:
+            pattern = like_to_regex("%" + airline + "%")
+            matches = [airline_id for airline_id, name in self.names.items()
+                       if pattern.match(name)]
+            return sorted(matches, key=lambda airline_id:
+                          self._lower_names[airline_id])
+
+        matches = [airline_id for airline_id in self._candidates(text)
+                   if text in self._lower_names[airline_id]]
+        if matches or not fuzzy:
+            return sorted(matches,
+                          key=lambda airline_id: self._rank(airline_id, text))
+
+        scores = {}
+        for airline_id, name in self._lower_names.items():
+            score = max(SequenceMatcher(None, text, word).ratio()
+                        for word in self._words[airline_id] + [name])
+            if score >= FUZZY_CUTOFF:
+                scores[airline_id] = score
+        return sorted(scores, key=lambda airline_id: (-scores[airline_id],
+                                                      self._lower_names[
+                                                          airline_id]))
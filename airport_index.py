@@ -0,0 +1,245 @@
+"""
+In-memory index of the airports table with spatial lookups.
+
+Description:
+    AirportIndex loads the small `airports` table once and answers the
+    coordinate lookups of the maps and reports without querying the
+    database:
+        - Airport rows and coordinates keyed by IATA code, so origin and
+          destination are never confused by the order of result rows.
+        - A KD-tree over the airports' positions as 3D unit vectors for
+          nearest-airport and "airports within N km" queries. Straight-line
+          (chord) distance between unit vectors grows with the great-circle
+          distance, so the tree needs no special handling of the poles or
+          the antimeridian.
+        - Great-circle distances between airports, computed from the
+          precomputed unit vectors and memoized per route.
+
+Notes:
+    - The index is a snapshot: create a new object after the `airports`
+      table changed.
+    - Airports without coordinates are kept for the IATA code lookups but
+      are left out of the spatial queries.
+"""
+import heapq
+import math
+
+from light_rows import light_row_type
+
+# Mean radius of the earth (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+
+AIRPORT_COLUMNS = ('IATA_CODE', 'AIRPORT', 'CITY', 'STATE', 'COUNTRY',
+                   'LATITUDE', 'LONGITUDE')
+
+Airport = light_row_type(AIRPORT_COLUMNS)
+AirportCoords = light_row_type(('IATA_CODE', 'LATITUDE', 'LONGITUDE'))
+
+
+def unit_vector(latitude, longitude) -> tuple:
+    """
+    Return the 3D unit vector of a position on the sphere.
+    """
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    return (math.cos(latitude) * math.cos(longitude),
+            math.cos(latitude) * math.sin(longitude),
+            math.sin(latitude))
+
+
+def chord_to_km(chord: float) -> float:
+    """
+    Convert the straight-line distance between two unit vectors to the
+    great-circle distance in kilometers.
+    """
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    """
+    Convert a great-circle distance in kilometers to the straight-line
+    distance between two unit vectors.
+    """
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _squared_distance(a, b) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class _KDTree:
+    """
+    A static KD-tree over 3D points. Nodes are (point, key, axis, left,
+    right) tuples; leaves' children are None.
+    """
+
+    def __init__(self, points):
+        """
+        Parameter:
+            points (list of tuple): (vector, key) pairs.
+        """
+        self._root = self._build(list(points), 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        median = len(points) // 2
+        vector, key = points[median]
+        return (vector, key, axis,
+                self._build(points[:median], depth + 1),
+                self._build(points[median + 1:], depth + 1))
+
+    def nearest(self, target, count) -> list:
+        """
+        Return the `count` points closest to the target as (squared
+        distance, key) pairs, closest first.
+        """
+        # Max-heap of the best points so far, as (-squared distance, key)
+        best = []
+
+        def visit(node):
+            if node is None:
+                return
+            vector, key, axis, left, right = node
+            distance = _squared_distance(vector, target)
+            if len(best) < count:
+                heapq.heappush(best, (-distance, key))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, key))
+
+            offset = target[axis] - vector[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(best) < count or offset * offset < -best[0][0]:
+                visit(far)
+
+        visit(self._root)
+        return sorted((-distance, key) for distance, key in best)
+
+    def within(self, target, radius) -> list:
+        """
+        Return the points within `radius` of the target as (squared
+        distance, key) pairs, closest first.
+        """
+        radius_squared = radius * radius
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            vector, key, axis, left, right = node
+            distance = _squared_distance(vector, target)
+            if distance <= radius_squared:
+                found.append((distance, key))
+            offset = target[axis] - vector[axis]
+            if offset <= radius:
+                stack.append(left)
+            if offset >= -radius:
+                stack.append(right)
+        return sorted(found)
+
+
+class AirportIndex:
+    """
+    The airports keyed by IATA code, with a KD-tree for spatial queries and
+    memoized great-circle distances.
+    """
+
+    def __init__(self, airports):
+        """
+        Build the index.
+
+        Parameter:
+            airports (iterable of tuple):
+                (IATA_CODE, AIRPORT, CITY, STATE, COUNTRY, LATITUDE,
+                LONGITUDE) rows.
+        """
+        self._airports = {}
+        self._vectors = {}
+        for row in airports:
+            airport = Airport(row)
+            self._airports[airport.IATA_CODE] = airport
+            if airport.LATITUDE is not None and airport.LONGITUDE is not None:
+                self._vectors[airport.IATA_CODE] = unit_vector(
+                    float(airport.LATITUDE), float(airport.LONGITUDE))
+        self._tree = _KDTree((vector, code)
+                             for code, vector in self._vectors.items())
+        self._distances = {}
+
+    def __len__(self) -> int:
+        return len(self._airports)
+
+    def __contains__(self, iata_code) -> bool:
+        return iata_code.upper() in self._airports
+
+    def get(self, iata_code: str):
+        """
+        Return the Airport row of an IATA code, or None.
+        """
+        return self._airports.get(iata_code.upper())
+
+    def coords(self, iata_code: str):
+        """
+        Return the (IATA_CODE, LATITUDE, LONGITUDE) row of an airport, or
+        None if it is unknown.
+        """
+        airport = self.get(iata_code)
+        if airport is None:
+            return None
+        return AirportCoords((airport.IATA_CODE, airport.LATITUDE,
+                              airport.LONGITUDE))
+
+    def distance_km(self, origin: str, destination: str):
+        """
+        Return the great-circle distance between two airports in
+        kilometers, or None if one of them has no coordinates.
+        """
+        origin, destination = origin.upper(), destination.upper()
+        route = (origin, destination) if origin <= destination \
+            else (destination, origin)
+        distance = self._distances.get(route)
+        if distance is None:
+            if origin not in self._vectors \
+                    or destination not in self._vectors:
+                return None
+            distance = chord_to_km(math.sqrt(_squared_distance(
+                self._vectors[origin], self._vectors[destination])))
+            self._distances[route] = distance
+        return distance
+
+    def nearest(self, latitude, longitude, count=1) -> list:
+        """
+        Find the airports closest to a position.
+
+        Parameters:
+            latitude (float): The latitude of the position.
+            longitude (float): The longitude of the position.
+            count (int): The number of airports to return.
+
+        Returns:
+            list of tuple: (Airport, distance in km) pairs, closest first.
+        """
+        if count < 1:
+            return []
+        found = self._tree.nearest(unit_vector(latitude, longitude), count)
+        return [(self._airports[code], chord_to_km(math.sqrt(distance)))
+                for distance, code in found]
+
+    def within(self, latitude, longitude, radius_km) -> list:
+        """
+        Find the airports within a great-circle distance of a position.
+
+        Parameters:
+            latitude (float): The latitude of the position.
+            longitude (float): The longitude of the position.
+            radius_km (float): The maximum distance in kilometers.
+
+        Returns:
+            list of tuple: (Airport, distance in km) pairs, closest first.
+        """
+        found = self._tree.within(unit_vector(latitude, longitude),
+                                  km_to_chord(radius_km))
+        return [(self._airports[code], chord_to_km(math.sqrt(distance)))
+                for distance, code in found]
@@ -0,0 +1,278 @@
+import asyncio
+
+from sqlalchemy import text, Sequence, Row
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from airline_search import AirlineSearch
+from airport_index import AirportIndex
+from engine_profile import _is_memory_database
+
+from util_sql_query import QUERY_FLIGHT_BY_ID, QUERY_FLIGHT_BY_DATE, \
+    QUERY_FLIGHT_BY_AIRLINE_IDS, QUERY_FLIGHT_BY_ORIGIN_AIRPORT, \
+    QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS, QUERY_AIRPORTS, QUERY_TABLE_EXISTS, \
+    QUERY_FLIGHTS_FINGERPRINT, QUERY_ROUTE_STATS_META, \
+    QUERY_ROUTE_STATS_PERCENTAGE, QUERY_AIRLINES, QUERY_TABLE_COLUMNS, \
+    QUERY_FLIGHTS_CHANGES, DEFAULT_DELAY_THRESHOLD
+
+
+class AsyncFlightData:
+    """
+    The AsyncFlightData class is the asyncio counterpart of FlightData. It
+    offers the same lookups as coroutines, backed by an SQLAlchemy async
+    engine using the aiosqlite driver, so queries do not block the event
+    loop and several of them can run at the same time.
+
+    At most `max_concurrency` queries run at once; further queries wait for
+    a free slot. Call `dispose` (or use the object as an async context
+    manager) to close the connections.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    def __init__(self, db_uri, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 delay_threshold=DEFAULT_DELAY_THRESHOLD):
+        """
+        Initialize a new async engine using the given database URI.
+
+        Parameters:
+            db_uri (str):
+                The SQLAlchemy URI of the database. A plain sqlite:// URI is
+                switched to the sqlite+aiosqlite driver.
+            max_concurrency (int):
+                The maximum number of queries running at the same time.
+            delay_threshold (int):
+                The departure delay in minutes from which a flight counts
+                as delayed (see FlightData).
+        """
+        url = make_url(db_uri)
+        if url.drivername == 'sqlite':
+            url = url.set(drivername='sqlite+aiosqlite')
+        if _is_memory_database(url):
+            # In-memory databases use a single shared connection
+            self._engine = create_async_engine(url)
+        else:
+            self._engine = create_async_engine(url, pool_size=max_concurrency,
+                                               max_overflow=0)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.delay_threshold = delay_threshold
+        self._use_route_stats = None
+        self._airline_search = None
+        self._airport_index = None
+
+    async def _execute_query(self, query, params) -> Sequence[Row]:
+        """
+        Execute an SQL query with the params provided in a dictionary,
+        and returns a list of records (dictionary-like objects).
+        If an exception was raised, print the error, and return an empty list.
+
+        Parameters:
+            query (str):
+                The SQL query string to execute. This can include placeholders
+                for parameters.
+            params (dict):
+                A dictionary of parameter values to safely inject into the query.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database. Returns an empty
+                list if an exception occurs.
+        """
+        if ':delay_threshold' in query:
+            params = {**params, 'delay_threshold': self.delay_threshold}
+        try:
+            async with self._semaphore:
+                async with self._engine.connect() as connection:
+                    results = await connection.execute(text(query), params)
+                    return results.fetchall()
+        except SQLAlchemyError as e:
+            print(f"SQLAlchemy Error: {e}")
+            return []
+        except Exception as e:
+            print(f"Unexpected Error: {e}")
+            return []
+
+    async def _route_stats_available(self) -> bool:
+        """
+        Check once whether the `route_stats` summary table exists and is up
+        to date for the delay threshold. AsyncFlightData never builds it;
+        use FlightData or `python maintenance.py route-stats` for that.
+
+        Returns:
+            bool: True if `route_stats` can be queried.
+        """
+        if self._use_route_stats is None:
+            table, meta_columns = await asyncio.gather(
+                self._execute_query(QUERY_TABLE_EXISTS,
+                                    {'name': 'route_stats'}),
+                self._execute_query(QUERY_TABLE_COLUMNS,
+                                    {'table': 'route_stats_meta'}))
+            # The change counter of `flights` exists with this meta table
+            fresh = bool(table) and 'FLIGHTS_CHANGES' in [
+                column[0] for column in meta_columns]
+            if fresh:
+                meta, fingerprint, changes = await asyncio.gather(
+                    self._execute_query(QUERY_ROUTE_STATS_META, {}),
+                    self._execute_query(QUERY_FLIGHTS_FINGERPRINT, {}),
+                    self._execute_query(QUERY_FLIGHTS_CHANGES, {}))
+                fresh = bool(meta and fingerprint and changes) \
+                    and tuple(meta[0][:2]) == tuple(fingerprint[0]) \
+                    and meta[0].DELAY_THRESHOLD == self.delay_threshold \
+                    and meta[0].FLIGHTS_CHANGES == changes[0][0]
+            self._use_route_stats = fresh
+        return self._use_route_stats
+
+    async def resolve_airlines(self, airline: str) -> list:
+        """
+        Resolve an airline name to the IDs of the matching airlines
+        (see FlightData).
+
+        Parameter:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+
+        Returns:
+            list of int: The IDs of the matching airlines, best match first.
+        """
+        if self._airline_search is None:
+            airlines = await self._execute_query(QUERY_AIRLINES, {})
+            if not airlines:
+                return []
+            self._airline_search = AirlineSearch(airlines)
+        return self._airline_search.match(airline)
+
+    async def get_flight_by_id(self, flight_id) -> Sequence[Row]:
+        """
+        Retrieve flight details by flight ID (see FlightData).
+
+        Parameter:
+            flight_id (int):
+                The unique identifier of the flight to retrieve.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        params = {'id': flight_id}
+        return await self._execute_query(QUERY_FLIGHT_BY_ID, params)
+
+    async def get_flights_by_date(self, day, month, year) -> Sequence[Row]:
+        """
+        Retrieve flights for a specific date with delays (see FlightData).
+
+        Parameters:
+            day (int): The day of the flight.
+            month (int): The month of the flight.
+            year (int): The year of the flight.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        params = {'day': day, 'month': month, 'year': year}
+        return await self._execute_query(QUERY_FLIGHT_BY_DATE, params)
+
+    async def get_delayed_flights_by_airline(self, airline: str) -> Sequence[
+        Row]:
+        """
+        Retrieve delayed flights for a specific airline (see FlightData).
+
+        Parameter:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        airline_ids = await self.resolve_airlines(airline)
+        if not airline_ids:
+            return []
+        params = {f"airline_id_{i}": airline_id
+                  for i, airline_id in enumerate(airline_ids)}
+        query = QUERY_FLIGHT_BY_AIRLINE_IDS.format(
+            ids=", ".join(":" + name for name in params))
+        return await self._execute_query(query, params)
+
+    async def get_delayed_flights_by_airport(self, airport_input: str) -> \
+            Sequence[Row]:
+        """
+        Retrieve delayed flights departing from a specific airport
+        (see FlightData).
+
+        Parameters:
+            airport_input (str):
+                The IATA code of the origin airport.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        params = {'origin_airport': airport_input}
+        return await self._execute_query(QUERY_FLIGHT_BY_ORIGIN_AIRPORT,
+                                         params)
+
+    async def generate_percentage_of_delayed_flights(self,
+                                                     origin_airport: str,
+                                                     destination_airport: str
+                                                     ) -> Sequence[Row]:
+        """
+        Calculates the average percentage of delayed flights between two
+        airports, considering both directions (see FlightData).
+
+        Parameters:
+            origin_airport (str): The IATA code of the origin airport.
+            destination_airport (str): The IATA code of the destination airport.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        params = {'origin': origin_airport,
+                  'destination': destination_airport,
+                  'origin_vv': destination_airport,
+                  'destination_vv': origin_airport
+                  }
+        if await self._route_stats_available():
+            return await self._execute_query(QUERY_ROUTE_STATS_PERCENTAGE,
+                                             params)
+        return await self._execute_query(QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS,
+                                         params)
+
+    async def get_airport_lat_long(self, origin_airport: str,
+                                   destination_airport: str) -> list:
+        """
+        Retrieves the latitude and longitude coordinates for the specified
+        origin and destination airports (see FlightData).
+
+        Parameters:
+            origin_airport (str): The IATA code of the origin airport.
+            destination_airport (str): The IATA code of the destination airport.
+
+        Returns:
+            list:
+                The (IATA_CODE, LATITUDE, LONGITUDE) rows of the origin and
+                then the destination airport; unknown airports are left out.
+        """
+        if self._airport_index is None:
+            airports = await self._execute_query(QUERY_AIRPORTS, {})
+            if not airports:
+                return []
+            self._airport_index = AirportIndex(airports)
+        index = self._airport_index
+        return [coords for coords in (index.coords(origin_airport),
+                                      index.coords(destination_airport))
+                if coords is not None]
+
+    async def dispose(self) -> None:
+        """
+        Close all connections of the engine.
+        """
+        await self._engine.dispose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.dispose()
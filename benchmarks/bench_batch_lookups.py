@@ -0,0 +1,74 @@
+"""
+Batch lookups compared with looping over the single-item lookups.
+
+Usage:
+    python benchmarks/bench_batch_lookups.py DB_PATH [--count N]
+
+Looks up COUNT flight IDs, route pairs and airports, once by calling the
+single-item FlightData methods in a loop and once with the batch methods,
+and prints the total time of both.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from engine_profile import DEFAULT_PROFILE  # noqa: E402
+
+
+def timed(function) -> float:
+    """
+    Return the time a call takes in milliseconds.
+    """
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    data_manager = data.FlightData(f"sqlite:///{args.db_path}",
+                                   profile=DEFAULT_PROFILE)
+    random.seed(0)
+    max_id = data_manager._execute_query("SELECT MAX(ID) FROM flights",
+                                         {})[0][0]
+    codes = [row[0] for row in data_manager._execute_query(
+        "SELECT IATA_CODE FROM airports", {})]
+    ids = random.sample(range(1, max_id + 1), min(args.count, max_id))
+    routes = [tuple(random.sample(codes, 2)) for _ in range(args.count)]
+    airports = [random.choice(codes) for _ in range(args.count)]
+    data_manager.generate_percentage_of_delayed_flights(*routes[0])
+
+    cases = {
+        'flights by id': (
+            lambda: [data_manager.get_flight_by_id(i) for i in ids],
+            lambda: data_manager.get_flights_by_ids(ids)),
+        'delay percentages': (
+            lambda: [data_manager.generate_percentage_of_delayed_flights(*r)
+                     for r in routes],
+            lambda: data_manager.get_delay_percentages(routes)),
+        'airport coordinates': (
+            lambda: [data_manager.get_airport_lat_long(a, a)
+                     for a in airports],
+            lambda: data_manager.get_airport_coords(airports)),
+    }
+
+    print(f"{'lookup':<22}{'items':>7}{'loop ms':>12}{'batch ms':>12}"
+          f"{'speedup':>10}")
+    for name, (loop, batch) in cases.items():
+        loop_ms = timed(loop)
+        batch_ms = timed(batch)
+        print(f"{name:<22}{args.count:>7}{loop_ms:>12.1f}{batch_ms:>12.1f}"
+              f"{loop_ms / batch_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Columnar analytics compared with the SQL path of FlightData.
+
+Usage:
+    python benchmarks/bench_columnar.py DB_PATH [--repeat N]
+
+Loads a ColumnarFlightData, checks that every lookup returns the same rows
+as the SQL path, and prints the mean latency of both paths and the time
+the columnar load took.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from columnar_data import ColumnarFlightData  # noqa: E402
+from engine_profile import DEFAULT_PROFILE  # noqa: E402
+
+LOOKUPS = {
+    'generate_percentage_of_delayed_flights': ('ORD', 'LAX'),
+    'get_flights_by_date': (1, 1, 2015),
+    'get_delayed_flights_by_airline': ('air',),
+    'get_delayed_flights_by_airport': ('ORD',),
+}
+
+
+def mean_ms(function, args, repeat) -> float:
+    """
+    Return the mean latency of a call in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings)
+
+
+def same_rows(sql_rows, columnar_rows) -> bool:
+    """
+    Compare results irrespective of the order of rows with equal delays.
+    """
+    return sorted(map(tuple, sql_rows)) == sorted(map(tuple, columnar_rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    data_manager = data.FlightData(f"sqlite:///{args.db_path}",
+                                   profile=DEFAULT_PROFILE)
+    start = time.perf_counter()
+    columnar = ColumnarFlightData(data_manager)
+    print(f"Columnar load: {time.perf_counter() - start:.2f} s "
+          f"({len(columnar.ids)} flights)")
+
+    print(f"{'lookup':<40}{'same':>6}{'sql ms':>10}{'columnar ms':>13}")
+    for name, lookup_args in LOOKUPS.items():
+        sql_lookup = getattr(data_manager, name)
+        columnar_lookup = getattr(columnar, name)
+        same = same_rows(sql_lookup(*lookup_args),
+                         columnar_lookup(*lookup_args))
+        print(f"{name:<40}{str(same):>6}"
+              f"{mean_ms(sql_lookup, lookup_args, args.repeat):>10.2f}"
+              f"{mean_ms(columnar_lookup, lookup_args, args.repeat):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
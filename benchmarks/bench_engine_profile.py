@@ -0,0 +1,81 @@
+"""
+Latency of the FlightData lookups with different engine profiles.
+
+Usage:
+    python benchmarks/bench_engine_profile.py DB_PATH [--repeat N]
+
+Runs every lookup REPEAT times with SQLAlchemy's default engine, the
+DEFAULT_PROFILE and the READ_ONLY_PROFILE and prints the mean and median
+latency per call in milliseconds. Run `python maintenance.py route-stats`
+and `python maintenance.py indexes` on the database first, so that every
+profile (including the read-only one) answers from the same summary table
+and indexes.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from engine_profile import DEFAULT_PROFILE, READ_ONLY_PROFILE  # noqa: E402
+
+PROFILES = {'sqlalchemy defaults': None,
+            'DEFAULT_PROFILE': DEFAULT_PROFILE,
+            'READ_ONLY_PROFILE': READ_ONLY_PROFILE}
+
+LOOKUPS = {
+    'get_flight_by_id': lambda fd: fd.get_flight_by_id(1),
+    'get_flights_by_date': lambda fd: fd.get_flights_by_date(1, 1, 2015),
+    'get_delayed_flights_by_airline':
+        lambda fd: fd.get_delayed_flights_by_airline('united'),
+    'get_delayed_flights_by_airport':
+        lambda fd: fd.get_delayed_flights_by_airport('ORD'),
+    'generate_percentage_of_delayed_flights':
+        lambda fd: fd.generate_percentage_of_delayed_flights('ORD', 'LAX'),
+    'get_airport_lat_long': lambda fd: fd.get_airport_lat_long('ORD', 'LAX'),
+}
+
+
+def measure(data_manager, lookup, repeat) -> list:
+    """
+    Time a lookup.
+
+    Parameters:
+        data_manager (FlightData): The data manager to query.
+        lookup (callable): Runs one lookup on the data manager.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        list of float: The latency of every call in milliseconds.
+    """
+    lookup(data_manager)  # warm up the pool and the page cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lookup(data_manager)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'lookup':<40}{'profile':<22}{'mean ms':>10}{'p50 ms':>10}")
+    for name, lookup in LOOKUPS.items():
+        for profile_name, profile in PROFILES.items():
+            data_manager = data.FlightData(f"sqlite:///{args.db_path}",
+                                           profile=profile)
+            timings = measure(data_manager, lookup, args.repeat)
+            print(f"{name:<40}{profile_name:<22}"
+                  f"{statistics.mean(timings):>10.3f}"
+                  f"{statistics.median(timings):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
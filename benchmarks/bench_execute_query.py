@@ -0,0 +1,96 @@
+"""
+Per-call overhead of FlightData._execute_query.
+
+Usage:
+    python benchmarks/bench_execute_query.py DB_PATH [--repeat N]
+
+Runs point lookups and a larger lookup REPEAT times in three modes and
+prints the mean and median latency per call in microseconds:
+
+    text() per call:
+        The SQL string is wrapped in a new text() clause on every call
+        (the behaviour before the clauses were cached).
+    cached text():
+        The text() clause is created once and reused (the default).
+    light rows:
+        FlightData(light_rows=True): the query runs on the DBAPI cursor and
+        returns LightRow tuples instead of SQLAlchemy rows.
+
+The result cache is off, so every call queries the database.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from engine_profile import DEFAULT_PROFILE  # noqa: E402
+
+LOOKUPS = {
+    'get_flight_by_id':
+        lambda fd, rng: fd.get_flight_by_id(rng.randint(1, fd.max_id)),
+    'get_delayed_flights_by_airport_page':
+        lambda fd, rng: fd.get_delayed_flights_by_airport_page('ORD'),
+    'generate_percentage_of_delayed_flights':
+        lambda fd, rng: fd.generate_percentage_of_delayed_flights('ORD',
+                                                                  'LAX'),
+    'get_flights_by_date':
+        lambda fd, rng: fd.get_flights_by_date(1, 1, 2015),
+}
+
+MODES = ('text() per call', 'cached text()', 'light rows')
+
+
+def measure(data_manager, lookup, repeat, per_call_text) -> list:
+    """
+    Time a lookup.
+
+    Parameters:
+        data_manager (FlightData): The data manager to query.
+        lookup (callable): Runs one lookup on the data manager.
+        repeat (int): Number of timed calls.
+        per_call_text (bool): Drop the cached text() clauses before every
+                              call.
+
+    Returns:
+        list of float: The latency of every call in microseconds.
+    """
+    rng = random.Random(0)
+    lookup(data_manager, rng)  # warm up the pool and the page cache
+    timings = []
+    for _ in range(repeat):
+        if per_call_text:
+            data._text_clause.cache_clear()
+        start = time.perf_counter()
+        lookup(data_manager, rng)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'lookup':<40}{'mode':<18}{'mean us':>10}{'p50 us':>10}")
+    for name, lookup in LOOKUPS.items():
+        for mode in MODES:
+            data_manager = data.FlightData(f"sqlite:///{args.db_path}",
+                                           profile=DEFAULT_PROFILE,
+                                           light_rows=mode == 'light rows')
+            data_manager.max_id = data_manager._execute_query(
+                "SELECT MAX(ID) FROM flights", {})[0][0]
+            timings = measure(data_manager, lookup, args.repeat,
+                              mode == 'text() per call')
+            print(f"{name:<40}{mode:<18}"
+                  f"{statistics.mean(timings):>10.1f}"
+                  f"{statistics.median(timings):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
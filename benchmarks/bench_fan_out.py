@@ -0,0 +1,176 @@
+"""
+Latency saved by FlightData.fan_out, and a check of a shared FlightData.
+
+Usage:
+    python benchmarks/bench_fan_out.py DB_PATH [--repeat N] [--threads N]
+
+Runs composite requests REPEAT times with their lookups one after the
+other (serial) and concurrently (fan_out), and prints the mean and median
+latency of both:
+
+    route map (cold):
+        The lookups of menu option 5 on a new FlightData, which also loads
+        the airport index and checks route_stats, like the first map drawn.
+    route map (warm):
+        The same lookups on a FlightData that has loaded everything.
+    delay dashboard:
+        Delay summary, daily trend and per-airline and per-airport delays
+        of one airport and month, four queries of the delay cube.
+
+The result cache is off, so every call queries the database. SQLite
+releases the GIL while a query runs, so the lookups only overlap on a
+machine with more than one CPU core.
+
+Finally THREADS threads run the lookups of a fresh shared FlightData at
+the same time and their results are compared with serial results.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from engine_profile import DEFAULT_PROFILE  # noqa: E402
+from run_benchmarks import Workload  # noqa: E402
+
+MONTH = (date(2015, 3, 1), date(2015, 3, 31))
+
+
+def route_map_calls(fd, origin, destination) -> list:
+    return [lambda: fd.generate_percentage_of_delayed_flights(origin,
+                                                              destination),
+            lambda: fd.get_airport_coords([origin, destination])]
+
+
+def dashboard_calls(fd, airport) -> list:
+    return [lambda: fd.get_delay_summary(*MONTH, origin_airport=airport),
+            lambda: fd.get_daily_delay_trend(*MONTH, origin_airport=airport),
+            lambda: fd.get_delays_by_airline(*MONTH, origin_airport=airport),
+            lambda: fd.get_delays_by_origin_airport(*MONTH)]
+
+
+def run(fd, calls, fan_out) -> list:
+    if fan_out:
+        return fd.fan_out(*calls)
+    return [call() for call in calls]
+
+
+def measure(new_data_manager, make_calls, workload, repeat, fan_out,
+            cold) -> list:
+    """
+    Time a composite request.
+
+    Parameters:
+        new_data_manager (callable): Returns a new FlightData.
+        make_calls (callable): Returns the calls of a request from the
+                               FlightData and the workload.
+        workload (Workload): Draws the arguments of the requests.
+        repeat (int): Number of timed requests.
+        fan_out (bool): Run the calls with fan_out.
+        cold (bool): Use a new FlightData for every request.
+
+    Returns:
+        list of float: The latency of every request in milliseconds.
+    """
+    fd = new_data_manager()
+    run(fd, make_calls(fd, workload), fan_out)  # warm up
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            fd.close()
+            fd = new_data_manager()
+        calls = make_calls(fd, workload)
+        start = time.perf_counter()
+        run(fd, calls, fan_out)
+        timings.append((time.perf_counter() - start) * 1000)
+    fd.close()
+    return timings
+
+
+def check_shared(new_data_manager, workload, threads) -> bool:
+    """
+    Run the lookups of a fresh FlightData from several threads at once and
+    compare the results with those of a serial run.
+    """
+    requests = [(workload.route(), workload.airport()[0])
+                for _ in range(threads)]
+
+    def lookups(fd, route, airport):
+        # Rows compared as tuples, airline IDs and coordinates as they are
+        return [[row if isinstance(row, int) else tuple(row) for row in rows]
+                if isinstance(rows, list) else rows
+                for rows in (
+                    *run(fd, route_map_calls(fd, *route), True),
+                    *run(fd, dashboard_calls(fd, airport), True),
+                    fd.resolve_airlines("delta"),
+                    fd.get_delay_percentiles('airline',
+                                             origin_airport=airport))]
+
+    with new_data_manager() as fd:
+        expected = [lookups(fd, *request) for request in requests]
+
+    results = [None] * threads
+    barrier = threading.Barrier(threads)
+
+    def worker(fd, position):
+        barrier.wait()
+        results[position] = lookups(fd, *requests[position])
+
+    with new_data_manager() as fd:
+        workers = [threading.Thread(target=worker, args=(fd, position))
+                   for position in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    return results == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    def new_data_manager():
+        return data.FlightData(f"sqlite:///{args.db_path}",
+                               profile=DEFAULT_PROFILE, light_rows=True)
+
+    with new_data_manager() as fd:
+        fd.refresh_route_stats()
+        fd.refresh_delay_cube()
+        workload = Workload(fd)
+
+    print(f"{os.cpu_count()} CPU cores")
+    requests = (
+        ('route map (cold)',
+         lambda fd, w: route_map_calls(fd, *w.route()), True),
+        ('route map (warm)',
+         lambda fd, w: route_map_calls(fd, *w.route()), False),
+        ('delay dashboard',
+         lambda fd, w: dashboard_calls(fd, w.airport()[0]), False),
+    )
+    print(f"{'request':<20}{'mode':<10}{'mean ms':>10}{'p50 ms':>10}")
+    for name, make_calls, cold in requests:
+        for mode in ('serial', 'fan_out'):
+            timings = measure(new_data_manager, make_calls, workload,
+                              args.repeat, mode == 'fan_out', cold)
+            print(f"{name:<20}{mode:<10}"
+                  f"{statistics.mean(timings):>10.2f}"
+                  f"{statistics.median(timings):>10.2f}")
+
+    same = check_shared(new_data_manager, workload, args.threads)
+    print(f"{args.threads} threads sharing one FlightData: "
+          f"{'same results as serial' if same else 'RESULTS DIFFER'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
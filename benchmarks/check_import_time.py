@@ -0,0 +1,61 @@
+"""
+Startup time budget check.
+
+Usage:
+    python benchmarks/check_import_time.py [--budget-ms MS] [--runs N]
+
+Imports `main` in fresh interpreters with `python -X importtime` and
+reports the cumulative import time of `main` (best of --runs) and its
+slowest imports. Exits with status 1 if the import takes longer than the
+budget, or if it loads a module that must only be loaded on demand:
+folium and NumPy are imported when a map is drawn, SQLAlchemy on the first
+query.
+
+The same check runs as a test in tests/test_startup.py (`python -m
+pytest tests`); this script reuses it and also lists the slowest imports.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+
+from test_startup import DEFAULT_BUDGET_MS, LAZY_MODULES, \
+    best_import_times  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--module', default='main')
+    args = parser.parse_args()
+
+    best = best_import_times(args.module, args.runs)
+    total_ms = best[args.module] / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms "
+          f"(best of {args.runs}, budget {args.budget_ms:g} ms)")
+    print("Slowest imports:")
+    own = {name: time for name, time in best.items() if name != args.module}
+    for name, time in sorted(own.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {time / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = sorted({name.split('.')[0] for name in best
+                    if name.split('.')[0] in LAZY_MODULES})
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms is over the budget of "
+              f"{args.budget_ms:g} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Generate a synthetic flights database for benchmarks.
+
+Usage:
+    python benchmarks/generate_synthetic_db.py DB_PATH [--rows N] [--seed S]
+
+Creates the `flights`, `airlines` and `airports` tables with the same
+schema as data/flights.sqlite3 and fills them with reproducible random
+data. Traffic is skewed like real data: airports and airlines are drawn
+from Zipf-like distributions, so a few hubs (ATL, ORD, DFW, ...) and large
+carriers carry most flights. Departure delays are mostly small, with an
+exponential tail of long delays and a small share of NULL delays
+(cancelled flights).
+
+Rows are generated with NumPy in chunks and inserted with executemany,
+so memory stays flat from 100k up to 50M rows.
+"""
+import argparse
+import os
+import sqlite3
+import string
+import time
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE airlines (
+    ID INTEGER PRIMARY KEY,
+    AIRLINE TEXT
+);
+CREATE TABLE airports (
+    IATA_CODE TEXT,
+    AIRPORT TEXT,
+    CITY TEXT,
+    STATE TEXT,
+    COUNTRY TEXT,
+    LATITUDE REAL,
+    LONGITUDE REAL
+);
+CREATE TABLE flights (
+    ID INTEGER PRIMARY KEY,
+    YEAR INTEGER,
+    MONTH INTEGER,
+    DAY INTEGER,
+    DAY_OF_WEEK INTEGER,
+    AIRLINE INTEGER,
+    FLIGHT_NUMBER INTEGER,
+    TAIL_NUMBER TEXT,
+    ORIGIN_AIRPORT TEXT,
+    DESTINATION_AIRPORT TEXT,
+    SCHEDULED_DEPARTURE INTEGER,
+    DEPARTURE_TIME INTEGER,
+    DEPARTURE_DELAY INTEGER,
+    ARRIVAL_DELAY INTEGER,
+    DIVERTED INTEGER,
+    CANCELLED INTEGER
+);
+"""
+
+AIRLINES = ["Southwest Airlines Co.", "Delta Air Lines Inc.",
+            "American Airlines Inc.", "Skywest Airlines Inc.",
+            "Atlantic Southeast Airlines", "United Air Lines Inc.",
+            "American Eagle Airlines Inc.", "JetBlue Airways",
+            "US Airways Inc.", "Alaska Airlines Inc.", "Spirit Air Lines",
+            "Frontier Airlines Inc.", "Hawaiian Airlines Inc.",
+            "Virgin America"]
+
+# The busiest airports, most traffic first
+HUBS = [("ATL", "Atlanta", "GA", 33.6367, -84.4281),
+        ("ORD", "Chicago", "IL", 41.9796, -87.9045),
+        ("DFW", "Dallas-Fort Worth", "TX", 32.8968, -97.0380),
+        ("DEN", "Denver", "CO", 39.8584, -104.6670),
+        ("LAX", "Los Angeles", "CA", 33.9425, -118.4081),
+        ("SFO", "San Francisco", "CA", 37.6190, -122.3749),
+        ("PHX", "Phoenix", "AZ", 33.4343, -112.0080),
+        ("IAH", "Houston", "TX", 29.9805, -95.3397),
+        ("LAS", "Las Vegas", "NV", 36.0801, -115.1522),
+        ("MSP", "Minneapolis", "MN", 44.8820, -93.2218),
+        ("MCO", "Orlando", "FL", 28.4294, -81.3090),
+        ("SEA", "Seattle", "WA", 47.4490, -122.3093),
+        ("DTW", "Detroit", "MI", 42.2124, -83.3534),
+        ("BOS", "Boston", "MA", 42.3643, -71.0052),
+        ("EWR", "Newark", "NJ", 40.6925, -74.1687),
+        ("JFK", "New York", "NY", 40.6398, -73.7789)]
+
+CHUNK_SIZE = 500_000
+
+
+def zipf_weights(count, exponent) -> np.ndarray:
+    """
+    Return normalized Zipf-like weights for `count` ranked items.
+    """
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def make_airports(rng, count) -> list:
+    """
+    Return `count` airport rows: the hubs followed by random airports in the
+    continental US.
+    """
+    airports = [(code, f"{city} International Airport", city, state, "USA",
+                 lat, long) for code, city, state, lat, long in HUBS[:count]]
+    used = {airport[0] for airport in airports}
+    letters = np.array(list(string.ascii_uppercase))
+    while len(airports) < count:
+        code = ''.join(rng.choice(letters, 3))
+        if code in used:
+            continue
+        used.add(code)
+        airports.append((code, f"{code} Regional Airport", f"City {code}",
+                         "US", "USA", round(float(rng.uniform(25.0, 48.5)), 5),
+                         round(float(rng.uniform(-123.0, -68.0)), 5)))
+    return airports
+
+
+def make_flights(rng, first_id, count, codes, airport_weights,
+                 airline_weights, year) -> list:
+    """
+    Return `count` random flight rows with IDs starting at `first_id`.
+    """
+    origins = rng.choice(len(codes), count, p=airport_weights)
+    destinations = rng.choice(len(codes), count, p=airport_weights)
+    same = origins == destinations
+    destinations[same] = (destinations[same] + 1 + rng.integers(
+        0, len(codes) - 1, same.sum())) % len(codes)
+
+    day_of_year = rng.integers(0, 365, count)
+    dates = np.datetime64(f"{year}-01-01") + day_of_year.astype(
+        'timedelta64[D]')
+    months = dates.astype('datetime64[M]').astype(int) % 12 + 1
+    days = (dates - dates.astype('datetime64[M]')).astype(int) + 1
+    days_of_week = (dates.astype(int) + 3) % 7 + 1
+
+    delays = np.where(rng.random(count) < 0.8,
+                      rng.normal(-2, 8, count),
+                      rng.exponential(45, count)).round().astype(np.int64)
+    arrival_delays = delays + rng.normal(-4, 10, count).round().astype(
+        np.int64)
+    scheduled = rng.integers(5, 23, count) * 100 + rng.integers(0, 12,
+                                                                count) * 5
+    cancelled = rng.random(count) < 0.015
+
+    airlines = rng.choice(len(airline_weights), count, p=airline_weights) + 1
+    flight_numbers = rng.integers(1, 7000, count)
+    tails = rng.integers(100, 999, count)
+
+    ids = range(first_id, first_id + count)
+    code_names = np.array(codes, dtype=object)
+    departure_times = [None if is_cancelled else departure
+                       for departure, is_cancelled
+                       in zip(scheduled.tolist(), cancelled.tolist())]
+    delays = [None if is_cancelled else delay
+              for delay, is_cancelled in zip(delays.tolist(),
+                                             cancelled.tolist())]
+    arrival_delays = [None if is_cancelled else delay
+                      for delay, is_cancelled
+                      in zip(arrival_delays.tolist(), cancelled.tolist())]
+    return list(zip(ids, [year] * count, months.tolist(), days.tolist(),
+                    days_of_week.tolist(), airlines.tolist(),
+                    flight_numbers.tolist(),
+                    [f"N{tail}XX" for tail in tails.tolist()],
+                    code_names[origins].tolist(),
+                    code_names[destinations].tolist(),
+                    scheduled.tolist(), departure_times, delays,
+                    arrival_delays, [0] * count,
+                    cancelled.astype(int).tolist()))
+
+
+def generate(path, rows, airports=320, seed=42, year=2015) -> None:
+    """
+    Create a synthetic flights database.
+
+    Parameters:
+        path (str): Path of the SQLite file; an existing file is replaced.
+        rows (int): The number of flights.
+        airports (int): The number of airports.
+        seed (int): Seed of the random generator.
+        year (int): The year of all flights.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    rng = np.random.default_rng(seed)
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.executescript(SCHEMA)
+    connection.executemany("INSERT INTO airlines VALUES (?, ?)",
+                           list(enumerate(AIRLINES, start=1)))
+    airport_rows = make_airports(rng, airports)
+    connection.executemany("INSERT INTO airports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           airport_rows)
+
+    codes = [airport[0] for airport in airport_rows]
+    airport_weights = zipf_weights(len(codes), 1.0)
+    airline_weights = zipf_weights(len(AIRLINES), 0.9)
+
+    start = time.perf_counter()
+    for first in range(0, rows, CHUNK_SIZE):
+        count = min(CHUNK_SIZE, rows - first)
+        connection.executemany(
+            "INSERT INTO flights VALUES "
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            make_flights(rng, first + 1, count, codes, airport_weights,
+                         airline_weights, year))
+        connection.commit()
+        print(f"{first + count} / {rows} flights "
+              f"({time.perf_counter() - start:.1f} s)")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the database to create.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--airports', type=int, default=320)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--year', type=int, default=2015)
+    args = parser.parse_args()
+    generate(args.db_path, args.rows, args.airports, args.seed, args.year)
+
+
+if __name__ == "__main__":
+    main()
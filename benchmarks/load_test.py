@@ -0,0 +1,180 @@
+"""
+Load test of the HTTP query service (server.py).
+
+Usage:
+    python benchmarks/load_test.py DB_PATH [--clients N] [--duration S]
+        [--workers N] [--gzip] [--revalidate] [--url URL]
+
+Starts `server.py` on DB_PATH in a separate process (or uses a running
+server with --url), then runs CLIENTS threads that each send requests over
+one keep-alive connection for DURATION seconds. The requests are a random
+mix of the JSON endpoints with realistic arguments drawn from the database
+(see Workload in run_benchmarks.py); the first requests of each URL fill
+the server's caches, as they would in daily use.
+
+Options:
+    --gzip        Send Accept-Encoding: gzip.
+    --revalidate  Send the ETag of an earlier response of the same URL as
+                  If-None-Match, like a browser cache revalidating.
+
+Reports the sustained requests per second, the latency percentiles, the
+status codes and the bytes received.
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from run_benchmarks import Workload, percentile  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def request_paths(workload, count) -> list:
+    """
+    Return a random mix of request paths.
+    """
+    choices = [
+        lambda: f"/flights/{workload.flight_id()[0]}",
+        lambda: "/flights/date/{2:04d}-{1:02d}-{0:02d}".format(
+            *workload.date()),
+        lambda: f"/flights/airline/{quote(workload.airline()[0])}",
+        lambda: f"/flights/airport/{workload.airport()[0]}",
+        lambda: "/routes/delay/{}/{}".format(*workload.route()),
+        lambda: f"/routes/from/{workload.airport()[0]}",
+        lambda: "/delays/summary?start=2015-03-01&end=2015-03-31"
+                f"&origin={workload.airport()[0]}",
+        lambda: f"/airports/{workload.airport()[0]}/nearby?radius_km=300",
+    ]
+    return [workload.random.choice(choices)() for _ in range(count)]
+
+
+def start_server(db_path, workers) -> tuple:
+    """
+    Start server.py on a free port and wait until it answers.
+
+    Returns:
+        tuple: The server process and its base URL.
+    """
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'server.py'),
+         '--db', f"sqlite:///{os.path.abspath(db_path)}",
+         '--port', str(port), '--workers', str(workers), '--quiet'],
+        cwd=ROOT, stdout=subprocess.DEVNULL)
+    while process.poll() is None:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/health')
+            connection.getresponse().read()
+            connection.close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server.py did not start")
+
+
+def run_client(url, paths, deadline, options, results) -> None:
+    """
+    Send requests over one keep-alive connection until the deadline.
+    """
+    address = urlsplit(url)
+    connection = http.client.HTTPConnection(address.hostname, address.port)
+    rng = random.Random()
+    etags = {}
+    timings = []
+    statuses = Counter()
+    received = 0
+    while time.monotonic() < deadline:
+        path = rng.choice(paths)
+        headers = {}
+        if options.gzip:
+            headers['Accept-Encoding'] = 'gzip'
+        if options.revalidate and path in etags:
+            headers['If-None-Match'] = etags[path]
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            statuses['error'] += 1
+            connection.close()
+            connection = http.client.HTTPConnection(address.hostname,
+                                                    address.port)
+            continue
+        timings.append((time.perf_counter() - start) * 1000)
+        statuses[response.status] += 1
+        received += len(body)
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+    connection.close()
+    results.append((timings, statuses, received))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--paths', type=int, default=2000,
+                        help="Number of distinct request URLs.")
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--revalidate', action='store_true')
+    parser.add_argument('--url', help="Base URL of a running server.")
+    args = parser.parse_args()
+
+    workload = Workload(data.FlightData(f"sqlite:///{args.db_path}"))
+    paths = request_paths(workload, args.paths)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args.db_path, args.workers)
+    try:
+        results = []
+        deadline = time.monotonic() + args.duration
+        started = time.perf_counter()
+        clients = [threading.Thread(target=run_client,
+                                    args=(url, paths, deadline, args,
+                                          results))
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    timings = sorted(timing for result in results for timing in result[0])
+    statuses = sum((result[1] for result in results), Counter())
+    received = sum(result[2] for result in results)
+    print(f"{len(timings)} requests from {args.clients} clients in "
+          f"{elapsed:.1f} s: {len(timings) / elapsed:,.0f} requests/s")
+    if timings:
+        print(f"latency ms: p50 {percentile(timings, 50):.2f}  "
+              f"p95 {percentile(timings, 95):.2f}  "
+              f"p99 {percentile(timings, 99):.2f}")
+    print("status: " + ", ".join(f"{status}: {count}" for status, count
+                                 in sorted(statuses.items(), key=str)))
+    print(f"received {received / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite for the FlightData lookups.
+
+Usage:
+    python benchmarks/run_benchmarks.py DB_PATH [--generate ROWS] [--prepare]
+        [--samples N] [--result-cache] [--save-baseline FILE]
+        [--compare FILE] [--tolerance FRACTION]
+
+Runs every FlightData lookup with random arguments drawn from the database
+and reports p50/p95/p99 latency, throughput and peak RSS.
+
+Modes:
+    warm:
+        One FlightData object serves all samples, so the connection pool
+        and the SQLite page cache are warm (and the result cache, with
+        --result-cache).
+    cold:
+        Every sample creates a new FlightData object, which opens a new
+        connection with an empty page cache and re-checks route_stats.
+        The operating system file cache is not dropped.
+
+Options:
+    --generate ROWS   Create a synthetic database with ROWS flights first
+                      (see generate_synthetic_db.py).
+    --prepare         Build route_stats and the advised indexes first.
+    --save-baseline   Write the results to a JSON file.
+    --compare         Compare p95 latencies with a saved baseline and exit
+                      with status 1 if any lookup is slower than the
+                      baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from engine_profile import DEFAULT_PROFILE  # noqa: E402
+from generate_synthetic_db import generate  # noqa: E402
+from query_cache import QueryCache  # noqa: E402
+
+
+class Workload:
+    """
+    Random, realistic arguments for the lookups, drawn from the database.
+    """
+
+    def __init__(self, data_manager, seed=0):
+        self.random = random.Random(seed)
+        self.max_id = data_manager._execute_query(
+            "SELECT MAX(ID) FROM flights", {})[0][0]
+        self.dates = [tuple(row) for row in data_manager._execute_query(
+            "SELECT DISTINCT DAY, MONTH, YEAR FROM flights LIMIT 366", {})]
+        # Airports weighted by traffic, like real users' lookups
+        airports = data_manager._execute_query(
+            "SELECT ORIGIN_AIRPORT, COUNT(*) FROM flights "
+            "GROUP BY ORIGIN_AIRPORT", {})
+        self.airports = [row[0] for row in airports]
+        self.airport_weights = [row[1] for row in airports]
+        self.airline_words = sorted({word.lower()
+                                     for _, name in data_manager.get_airlines()
+                                     for word in name.split() if len(word) > 3})
+
+    def flight_id(self):
+        return (self.random.randint(1, self.max_id),)
+
+    def date(self):
+        return self.random.choice(self.dates)
+
+    def airline(self):
+        return (self.random.choice(self.airline_words),)
+
+    def airport(self):
+        return tuple(self.random.choices(self.airports,
+                                         self.airport_weights))
+
+    def route(self):
+        return tuple(self.random.choices(self.airports, self.airport_weights,
+                                         k=2))
+
+
+LOOKUPS = {
+    'get_flight_by_id': Workload.flight_id,
+    'get_flights_by_date': Workload.date,
+    'get_delayed_flights_by_airline': Workload.airline,
+    'get_delayed_flights_by_airport': Workload.airport,
+    'generate_percentage_of_delayed_flights': Workload.route,
+    'get_airport_lat_long': Workload.route,
+    'get_routes_from_airport': Workload.airport,
+}
+
+
+def peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of the process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(sorted_values, p) -> float:
+    rank = max(int(round(p / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_lookup(make_data_manager, name, arguments, cold) -> dict:
+    """
+    Time a lookup once per set of arguments.
+
+    Parameters:
+        make_data_manager (callable): Creates a FlightData object.
+        name (str): The name of the FlightData method.
+        arguments (list of tuple): The arguments of every sample.
+        cold (bool): Create a new FlightData object for every sample.
+
+    Returns:
+        dict: The latency percentiles, throughput and peak RSS.
+    """
+    shared = None if cold else make_data_manager()
+    if shared is not None:
+        getattr(shared, name)(*arguments[0])  # warm up pool and page cache
+    timings = []
+    total_start = time.perf_counter()
+    for args in arguments:
+        data_manager = make_data_manager() if cold else shared
+        start = time.perf_counter()
+        getattr(data_manager, name)(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+        if cold:
+            data_manager._engine.dispose()
+    total = time.perf_counter() - total_start
+
+    timings.sort()
+    return {'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99),
+            'throughput_per_s': len(timings) / total,
+            'peak_rss_mb': peak_rss_mb()}
+
+
+def compare(results, baseline, tolerance) -> list:
+    """
+    Return the lookups whose p95 latency regressed against the baseline.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous and result['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append((key, previous['p95_ms'], result['p95_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('db_path', help="Path of the flights database.")
+    parser.add_argument('--generate', type=int, metavar='ROWS')
+    parser.add_argument('--prepare', action='store_true')
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--result-cache', action='store_true')
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--compare', metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.db_path, args.generate)
+    db_uri = f"sqlite:///{args.db_path}"
+
+    def make_data_manager(cache=None):
+        return data.FlightData(db_uri, profile=DEFAULT_PROFILE, cache=cache)
+
+    setup = make_data_manager()
+    if args.prepare:
+        setup.refresh_route_stats()
+        setup.provision_indexes(report=False)
+    workload = Workload(setup)
+
+    results = {}
+    print(f"{'lookup':<40}{'mode':<6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'ops/s':>10}{'RSS MiB':>9}")
+    for name, make_args in LOOKUPS.items():
+        arguments = [make_args(workload) for _ in range(args.samples)]
+        for mode in ('warm', 'cold'):
+            factory = make_data_manager
+            if mode == 'warm' and args.result_cache:
+                cache = QueryCache()
+                factory = lambda: make_data_manager(cache)  # noqa: E731
+            result = run_lookup(factory, name, arguments, mode == 'cold')
+            results[f"{name}/{mode}"] = result
+            print(f"{name:<40}{mode:<6}{result['p50_ms']:>9.2f}"
+                  f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                  f"{result['throughput_per_s']:>10.1f}"
+                  f"{result['peak_rss_mb']:>9.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file),
+                                  args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: p95 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Columnar in-memory analytics over the flights table.
+
+Description:
+    ColumnarFlightData loads the columns of `flights` needed for delay
+    analytics once into compact NumPy arrays. Airport codes are stored as
+    categorical codes into a sorted array of distinct codes, and the date
+    as a single YYYYMMDD integer. Aggregations are answered with vectorized
+    group-bys (np.bincount, np.unique) instead of SQL queries.
+
+    The lookups return the same rows as the SQL path of FlightData:
+        - generate_percentage_of_delayed_flights
+        - get_flights_by_date
+        - get_delayed_flights_by_airline
+        - get_delayed_flights_by_airport
+
+    Rows of the delayed-flight lookups are DelayedFlight tuples, which offer
+    the same `_mapping` access as SQLAlchemy rows, so they can be passed to
+    `main.print_results`. Flights with the same delay are ordered by ID.
+
+Notes:
+    - A flight is considered delayed if it is delayed by the delay threshold
+      of the data manager (20 minutes by default) or more; a NULL
+      DEPARTURE_DELAY is never a delay.
+    - Flights with a NULL airline, airport or date part are loaded with
+      placeholder values (see QUERY_FLIGHT_COLUMNS); they count towards
+      their route like in SQL but match no airline, airport or date lookup.
+    - The arrays are a snapshot: load a new object after `flights` changed.
+"""
+from collections import namedtuple
+from itertools import islice
+
+import numpy as np
+
+from airline_search import AirlineSearch
+
+LOAD_CHUNK_SIZE = 100_000
+
+
+class DelayedFlight(namedtuple('DelayedFlight', ['ID', 'ORIGIN_AIRPORT',
+                                                 'DESTINATION_AIRPORT',
+                                                 'AIRLINE', 'DELAY'])):
+    """
+    A row of a delayed-flight lookup.
+    """
+    __slots__ = ()
+
+    @property
+    def _mapping(self) -> dict:
+        return self._asdict()
+
+
+class ColumnarFlightData:
+    """
+    In-memory, column oriented copy of the flights data used for fast
+    vectorized delay analytics.
+    """
+
+    def __init__(self, data_manager):
+        """
+        Load the flights and airlines from the database.
+
+        Parameter:
+            data_manager (FlightData):
+                The data manager the data is loaded through.
+        """
+        airlines = data_manager.get_airlines()
+        self.airline_names = {airline_id: name for airline_id, name
+                              in airlines}
+        self.airline_search = AirlineSearch(airlines)
+
+        chunks = []
+        rows = data_manager.iter_flight_columns()
+        while True:
+            chunk = list(islice(rows, LOAD_CHUNK_SIZE))
+            if not chunk:
+                break
+            chunks.append(self._chunk_to_columns(chunk))
+
+        if chunks:
+            columns = [np.concatenate(column) for column in zip(*chunks)]
+        else:
+            columns = [np.array([], dtype=dtype)
+                       for dtype in (np.int64, np.int32, object, object,
+                                     np.int32, np.float64)]
+        self.ids, self.airlines, origins, destinations, dates, \
+            self.delays = columns
+
+        self.airports, codes = np.unique(
+            np.concatenate([origins, destinations]).astype(str),
+            return_inverse=True)
+        codes = codes.astype(np.int32)
+        self.origins = codes[:len(origins)]
+        self.destinations = codes[len(origins):]
+        self.dates = dates
+        self.delay_threshold = data_manager.delay_threshold
+        self.delayed = self.delays >= self.delay_threshold
+        # The SQL lookups join `airlines`, which drops unknown airlines
+        self._known_airline = np.isin(self.airlines,
+                                      list(self.airline_names))
+
+        self._route_totals = None
+        self._route_delayed = None
+
+    @staticmethod
+    def _chunk_to_columns(chunk) -> tuple:
+        """
+        Turn a list of rows into one compact array per column.
+        """
+        ids, airlines, origins, destinations, years, months, days, \
+            delays = zip(*chunk)
+        years = np.array(years, dtype=np.int32)
+        months = np.array(months, dtype=np.int32)
+        days = np.array(days, dtype=np.int32)
+        # A date with a NULL part (loaded as 0) is stored as 0
+        dates = np.where((years == 0) | (months == 0) | (days == 0), 0,
+                         years * 10000 + months * 100 + days)
+        return (np.array(ids, dtype=np.int64),
+                np.array(airlines, dtype=np.int32),
+                np.array(origins, dtype=object),
+                np.array(destinations, dtype=object),
+                dates,
+                np.array(delays, dtype=np.float64))
+
+    def _airport_code(self, iata_code: str) -> int:
+        """
+        Return the categorical code of an airport, or -1 if it has no flights.
+        """
+        position = np.searchsorted(self.airports, iata_code)
+        if position < len(self.airports) \
+                and self.airports[position] == iata_code:
+            return int(position)
+        return -1
+
+    def _route_counts(self) -> tuple:
+        """
+        Count the total and delayed flights of every directed route with a
+        single vectorized group-by, on first use.
+        """
+        if self._route_totals is None:
+            size = len(self.airports) ** 2
+            route_keys = self.origins.astype(np.int64) * len(self.airports) \
+                + self.destinations
+            self._route_totals = np.bincount(route_keys, minlength=size)
+            self._route_delayed = np.bincount(route_keys[self.delayed],
+                                              minlength=size)
+        return self._route_totals, self._route_delayed
+
+    def _delayed_rows(self, mask) -> list:
+        """
+        Return the delayed flights selected by a mask as DelayedFlight rows,
+        ordered by delay (descending) and ID.
+        """
+        selected = np.flatnonzero(mask & self.delayed & self._known_airline)
+        order = np.lexsort((self.ids[selected], -self.delays[selected]))
+        selected = selected[order]
+        airports = self.airports.tolist()
+        return [DelayedFlight(flight_id,
+                              airports[origin],
+                              airports[destination],
+                              self.airline_names.get(airline),
+                              int(delay) if float(delay).is_integer()
+                              else delay)
+                for flight_id, origin, destination, airline, delay
+                in zip(self.ids[selected].tolist(),
+                       self.origins[selected].tolist(),
+                       self.destinations[selected].tolist(),
+                       self.airlines[selected].tolist(),
+                       self.delays[selected].tolist())]
+
+    def generate_percentage_of_delayed_flights(self, origin_airport: str,
+                                               destination_airport: str
+                                               ) -> list:
+        """
+        Calculates the percentage of delayed flights between two airports
+        in both directions (see FlightData).
+
+        Parameters:
+            origin_airport (str): The IATA code of the origin airport.
+            destination_airport (str): The IATA code of the destination airport.
+
+        Returns:
+            list of tuple:
+                (ORIGIN_AIRPORT, DESTINATION_AIRPORT, PERCENT_DELAYED), one
+                per direction of the route that has flights.
+        """
+        totals, delayed = self._route_counts()
+        results = []
+        for origin, destination in ((origin_airport, destination_airport),
+                                    (destination_airport, origin_airport)):
+            origin_code = self._airport_code(origin)
+            destination_code = self._airport_code(destination)
+            if origin_code < 0 or destination_code < 0:
+                continue
+            key = origin_code * len(self.airports) + destination_code
+            if totals[key]:
+                results.append((origin, destination,
+                                int(delayed[key]) * 100.0 / int(totals[key])))
+        return results
+
+    def get_flights_by_date(self, day, month, year) -> list:
+        """
+        Retrieve the delayed flights of a specific date (see FlightData).
+
+        Parameters:
+            day (int): The day of the flight.
+            month (int): The month of the flight.
+            year (int): The year of the flight.
+
+        Returns:
+            list of DelayedFlight: The delayed flights, most delayed first.
+        """
+        return self._delayed_rows(self.dates == year * 10000 + month * 100
+                                  + day)
+
+    def get_delayed_flights_by_airline(self, airline: str) -> list:
+        """
+        Retrieve delayed flights for a specific airline (see FlightData).
+
+        Parameter:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+
+        Returns:
+            list of DelayedFlight: The delayed flights, most delayed first.
+        """
+        airline_ids = self.airline_search.match(airline)
+        return self._delayed_rows(np.isin(self.airlines, airline_ids))
+
+    def get_delayed_flights_by_airport(self, airport_input: str) -> list:
+        """
+        Retrieve delayed flights departing from a specific airport
+        (see FlightData).
+
+        Parameter:
+            airport_input (str): The IATA code of the origin airport.
+
+        Returns:
+            list of DelayedFlight: The delayed flights, most delayed first.
+        """
+        return self._delayed_rows(
+            self.origins == self._airport_code(airport_input))
+
+    def flights_per_day(self, delayed_only=False) -> dict:
+        """
+        Count the flights of every day.
+
+        Parameter:
+            delayed_only (bool): Only count delayed flights.
+
+        Returns:
+            dict: Maps (day, month, year) tuples to the number of flights.
+        """
+        dates = self.dates[self.delayed] if delayed_only else self.dates
+        dates = dates[dates > 0]
+        days, counts = np.unique(dates, return_counts=True)
+        return {(date % 100, date // 100 % 100, date // 10000): count
+                for date, count in zip(days.tolist(), counts.tolist())}
+
+    def top_delays(self, count: int) -> list:
+        """
+        Retrieve the delayed flights with the highest departure delay.
+
+        Parameter:
+            count (int): The number of flights to return.
+
+        Returns:
+            list of DelayedFlight:
+                At most `count` delayed flights, most delayed first.
+        """
+        delays = np.where(np.isnan(self.delays) | ~self._known_airline,
+                          -np.inf, self.delays)
+        count = min(count, len(delays))
+        if count <= 0:
+            return []
+        candidates = np.argpartition(-delays, count - 1)[:count]
+        mask = np.zeros(len(delays), dtype=bool)
+        mask[candidates] = True
+        return self._delayed_rows(mask)[:count]
@@ -1,30 +1,279 @@
-from sqlalchemy import create_engine, text, Sequence, Row
-from sqlalchemy.exc import SQLAlchemyError
+from __future__ import annotations
+
+import base64
+import json
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, TYPE_CHECKING
+
+from airline_search import AirlineSearch
+from airport_index import AirportIndex
+from engine_profile import create_profiled_engine
+from light_rows import light_row_type, make_light_rows
+from query_cache import make_key
+from query_stats import query_name
 
 from util_sql_query import QUERY_FLIGHT_BY_ID, QUERY_FLIGHT_BY_DATE, \
-    QUERY_FLIGHT_BY_AIRLINE, QUERY_FLIGHT_BY_ORIGIN_AIRPORT, \
-    QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS, QUERY_LONG_LAT
+    QUERY_FLIGHT_BY_AIRLINE_IDS, QUERY_FLIGHT_BY_ORIGIN_AIRPORT, \
+    QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS, QUERY_TABLE_EXISTS, \
+    QUERY_CREATE_ROUTE_STATS, QUERY_CREATE_ROUTE_STATS_META, \
+    QUERY_CLEAR_ROUTE_STATS, QUERY_DROP_ROUTE_STATS_META, \
+    QUERY_POPULATE_ROUTE_STATS, QUERY_INSERT_ROUTE_STATS_META, \
+    QUERY_FLIGHTS_FINGERPRINT, QUERY_ROUTE_STATS_META, \
+    QUERY_ROUTE_STATS_PERCENTAGE, INDEX_DEFINITIONS, REGISTERED_QUERIES, \
+    QUERY_INDEX_ADVICE, QUERY_INDEX_EXISTS, QUERY_FLIGHTS_BY_IDS, \
+    QUERY_SET_JOURNAL_MODE, JOURNAL_MODES, \
+    QUERY_FLIGHTS_BY_DATES, QUERY_ROUTE_STATS_BY_ROUTES, \
+    QUERY_PERCENTAGE_BY_ROUTES, QUERY_AIRPORTS, \
+    QUERY_ROUTE_STATS_SOURCE, QUERY_ROUTES_FROM_AIRPORT, \
+    QUERY_MOST_DELAYED_ROUTES, QUERY_FLIGHT_COLUMNS, QUERY_AIRLINES, \
+    QUERY_FLIGHT_BY_DATE_PAGE, QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE, \
+    QUERY_FLIGHT_BY_AIRLINE_ID_PAGE, \
+    QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE, QUERY_ORIGIN_AIRPORTS, \
+    QUERY_CREATE_DELAY_CUBE, QUERY_CREATE_DELAY_CUBE_INDEX, \
+    QUERY_CREATE_DELAY_CUBE_META, QUERY_CLEAR_DELAY_CUBE, \
+    QUERY_CLEAR_DELAY_CUBE_META, QUERY_DROP_DELAY_CUBE_META, \
+    QUERY_DELAY_CUBE_SOURCE, \
+    QUERY_UPSERT_DELAY_CUBE, QUERY_INSERT_DELAY_CUBE_META, \
+    QUERY_DELAY_CUBE_META, QUERY_COUNT_FLIGHTS_AFTER_ID, \
+    QUERY_DELAY_CUBE_AIRLINE_FILTER, QUERY_DELAY_CUBE_ORIGIN_FILTER, \
+    QUERY_DELAY_CUBE_SUMMARY, QUERY_DELAY_CUBE_DAILY, \
+    QUERY_DELAY_CUBE_BY_AIRLINE, QUERY_DELAY_CUBE_BY_ORIGIN, \
+    QUERY_TABLE_COLUMNS, QUERY_INSERT_FLIGHTS, \
+    QUERY_FLIGHTS_INDEXES, QUERY_DROP_INDEX, DEFAULT_DELAY_THRESHOLD, \
+    DELAY_GROUPS, QUERY_AIRLINE_NAME, QUERY_FLIGHTS_AIRLINE_FILTER, \
+    QUERY_FLIGHTS_ORIGIN_FILTER, QUERY_FLIGHTS_DESTINATION_FILTER, \
+    QUERY_DELAY_PERCENTILE_COLUMN, QUERY_DELAY_PERCENTILES, \
+    QUERY_DELAY_PERCENTILES_GROUP_BY, \
+    QUERY_DELAY_HISTOGRAM, QUERY_ROUTE_STATS_DELAY_RATES, \
+    QUERY_DELAY_CUBE_DELAY_RATES, QUERY_TOP_DELAY_RATES, \
+    QUERY_CREATE_FLIGHTS_CHANGES, QUERY_INIT_FLIGHTS_CHANGES, \
+    QUERY_CREATE_FLIGHTS_UPDATE_TRIGGER, \
+    QUERY_CREATE_FLIGHTS_DELETE_TRIGGER, QUERY_FLIGHTS_CHANGES
+
+# SQLAlchemy is imported on the first query (see FlightData._engine), so
+# importing this module stays cheap
+if TYPE_CHECKING:
+    from sqlalchemy import Sequence, Row
+
+
+@lru_cache(maxsize=512)
+def _text_clause(query: str):
+    """
+    Return the `text()` clause of an SQL string, created once per process.
+
+    Reusing the clause skips re-parsing the bind parameters of the string on
+    every call, and SQLAlchemy finds its compiled form in the engine's
+    compiled cache. Dynamically built queries (e.g. IN lists) share the
+    bounded LRU with the constants of util_sql_query.py.
+    """
+    from sqlalchemy import text
+    return text(query)
 
 
 class FlightData:
     """
     The FlightData class is a Data Access Layer (DAL) object that provides an
-    interface to the flight data in the SQLITE database. When the object is created,
-    the class forms connection to the sqlite database file, which remains active
-    until the object is destroyed.
+    interface to the flight data in the SQLITE database. The connection to
+    the sqlite database file is formed on the first query, and remains
+    active until `close` is called (or the `with` block of the object ends).
+
+    One object can be shared by many threads. Every query checks out its own
+    pooled connection; the lazily loaded state (the engine, the airline and
+    airport indexes and the summary table checks) is created under a lock,
+    so it is loaded once however many threads ask for it first, and the
+    result cache and stats are thread-safe. `fan_out` runs independent
+    lookups of one request concurrently on a shared thread pool.
     """
 
-    def __init__(self, db_uri):
+    DEFAULT_BATCH_SIZE = 1000
+
+    # Lowest SQLITE_MAX_VARIABLE_NUMBER of the SQLite versions we support
+    MAX_BOUND_PARAMETERS = 999
+
+    DEFAULT_PAGE_SIZE = 20
+
+    DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+    # Threads of the fan_out pool
+    DEFAULT_FAN_OUT_WORKERS = 4
+
+    # Rows per executemany call and per transaction of insert_flights
+    INSERT_CHUNK_ROWS = 10_000
+    INSERT_COMMIT_ROWS = 500_000
+
+    # Create the change counter of `flights` and its triggers; run before
+    # a summary table is built
+    _FLIGHTS_CHANGES_STATEMENTS = [QUERY_CREATE_FLIGHTS_CHANGES,
+                                   QUERY_INIT_FLIGHTS_CHANGES,
+                                   QUERY_CREATE_FLIGHTS_UPDATE_TRIGGER,
+                                   QUERY_CREATE_FLIGHTS_DELETE_TRIGGER]
+
+    # Lower than every flight ID: aggregate all flights into the delay cube
+    _NO_FLIGHTS_ID = -2 ** 63
+
+    # Position before the first row of a page ordered by
+    # (DEPARTURE_DELAY, ID) descending
+    _FIRST_PAGE_POSITION = (2 ** 63 - 1, 2 ** 63 - 1)
+
+    def __init__(self, db_uri, provision_indexes=False,
+                 batch_size=DEFAULT_BATCH_SIZE, cache=None, profile=None,
+                 stats=None, light_rows=False,
+                 delay_threshold=DEFAULT_DELAY_THRESHOLD,
+                 fan_out_workers=DEFAULT_FAN_OUT_WORKERS, raise_errors=False):
+        """
+        Initialize a new engine using the given database URI.
+
+        Parameters:
+            db_uri (str): The SQLAlchemy URI of the database.
+            provision_indexes (bool):
+                Create the indexes the registered queries need on startup
+                (see `provision_indexes`).
+            batch_size (int):
+                Number of rows fetched from the database at a time by the
+                streaming `iter_*` methods.
+            cache (QueryCache):
+                Optional result cache (see query_cache.py) consulted by every
+                `get_*` method before the database is queried.
+            profile (EngineProfile):
+                Optional pool and PRAGMA settings of the engine (see
+                engine_profile.py). SQLAlchemy's defaults are used otherwise.
+            stats (QueryStats):
+                Optional instrumentation (see query_stats.py) recording the
+                timings of every query.
+            light_rows (bool):
+                Run the `get_*` queries on the DBAPI cursor and return
+                LightRow tuples (see light_rows.py) instead of SQLAlchemy
+                rows, which cuts the per-call overhead of point lookups.
+            delay_threshold (int):
+                The departure delay in minutes from which a flight counts as
+                delayed. The summary tables are rebuilt when they were built
+                with another threshold.
+            fan_out_workers (int):
+                Number of threads `fan_out` runs lookups on.
+            raise_errors (bool):
+                Raise query errors to the caller instead of printing them
+                and returning an empty result, e.g. when the output is
+                JSON or CSV. Errors of statements that are not fatal (a
+                summary table that cannot be built) go to stderr.
+        """
+        self._db_uri = db_uri
+        self._profile = profile
+        self._engine_instance = None
+        self._engine_lock = threading.Lock()
+        # Serializes the summary table checks and builds; reentrant because
+        # the first query of a summary refreshes it
+        self._summary_lock = threading.RLock()
+        self._index_lock = threading.Lock()
+        self._executor = None
+        self.fan_out_workers = fan_out_workers
+        self.batch_size = batch_size
+        self.cache = cache
+        self.stats = stats
+        self.light_rows = light_rows
+        self.delay_threshold = delay_threshold
+        self.raise_errors = raise_errors
+        self._route_stats_ready = False
+        self._route_stats_checked = False
+        self._delay_cube_ready = False
+        self._delay_cube_checked = False
+        self._airline_search = None
+        self._airport_index = None
+        if provision_indexes:
+            self.provision_indexes()
+
+    @property
+    def _engine(self):
+        """
+        The SQLAlchemy engine, created (and SQLAlchemy imported) on first
+        use.
         """
-        Initialize a new engine using the given database URI
+        if self._engine_instance is None:
+            with self._engine_lock:
+                if self._engine_instance is None:
+                    self._engine_instance = create_profiled_engine(
+                        self._db_uri, self._profile)
+        return self._engine_instance
+
+    def close(self) -> None:
+        """
+        Wait for running `fan_out` lookups, then close the pooled
+        connections. The object can still be used afterwards: the next
+        query opens a new engine.
+        """
+        with self._engine_lock:
+            engine, self._engine_instance = self._engine_instance, None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if engine is not None:
+            engine.dispose()
+
+    def __enter__(self) -> FlightData:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def fan_out(self, *calls) -> list:
+        """
+        Run independent lookups concurrently, e.g. the queries of a map:
+
+            percentages, coords = data_manager.fan_out(
+                lambda: data_manager.generate_percentage_of_delayed_flights(
+                    "ORD", "LAX"),
+                lambda: data_manager.get_airport_coords(["ORD", "LAX"]))
+
+        The first call runs on the calling thread, the others on a thread
+        pool of `fan_out_workers` threads shared by all callers. SQLite
+        releases the GIL while a query runs, so the queries overlap.
+
+        Parameters:
+            *calls (callable):
+                Functions without arguments. They must not call `fan_out`
+                themselves, which could wait for a busy pool forever.
+
+        Returns:
+            list: The results of the calls, in order.
+
+        Raises:
+            Exception: The first exception raised by a call.
         """
-        self._engine = create_engine(db_uri)
+        if len(calls) < 2:
+            return [call() for call in calls]
+        from concurrent.futures import ThreadPoolExecutor, wait
+        with self._engine_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.fan_out_workers, thread_name_prefix='fan-out')
+            executor = self._executor
+        futures = [executor.submit(call) for call in calls[1:]]
+        try:
+            first = calls[0]()
+        except BaseException:
+            # Do not leave lookups running past the failed request
+            wait(futures)
+            raise
+        return [first, *(future.result() for future in futures)]
 
-    def _execute_query(self, query, params) -> Sequence[Row]:
+    def _execute_query(self, query, params, use_cache=True,
+                       name=None) -> Sequence[Row]:
         """
         Execute an SQL query with the params provided in a dictionary,
         and returns a list of records (dictionary-like objects).
-        If an exception was raised, print the error, and return an empty list.
+        If an exception was raised, print the error, and return an empty list,
+        or re-raise it if the object was created with `raise_errors`.
+
+        If the FlightData object has a cache, the rows are looked up in the
+        cache first, and successful results are stored in it. If it has
+        stats, the timings of the query are recorded.
+        With `light_rows`, the query is run on the DBAPI cursor and the rows
+        are LightRow tuples. Queries using `:delay_threshold` get the delay
+        threshold of the object bound.
 
         Parameters:
             query (str):
@@ -32,6 +281,11 @@ class FlightData:
                 for parameters.
             params (dict):
                 A dictionary of parameter values to safely inject into the query.
+            use_cache (bool):
+                Set to False to always query the database.
+            name (str):
+                The name the query is recorded under in the stats. Defaults
+                to the name of the query constant in util_sql_query.py.
 
         Returns:
             Sequence[Row]:
@@ -39,149 +293,1780 @@ class FlightData:
                 list if an exception occurs.
 
         Raises:
-                Returns an empty list in case of failure.
+            Exception: The error of the query, with `raise_errors`.
         """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        stats = self.stats if not query.startswith("EXPLAIN") else None
+        if stats is not None and name is None:
+            name = query_name(query)
+
+        params = self._with_delay_threshold(query, params)
+        use_cache = use_cache and self.cache is not None
+        if use_cache:
+            key = make_key(query, params)
+            rows = self.cache.get(key)
+            if rows is not None:
+                if stats is not None:
+                    stats.record_cache_hit(name)
+                return rows
+
         try:
+            start = time.perf_counter()
             with self._engine.connect() as connection:
-                query = text(query)
-                results = connection.execute(query, params)
-                return results.fetchall()
+                checked_out = time.perf_counter()
+                if self.light_rows:
+                    cursor = connection.connection.cursor()
+                    try:
+                        cursor.execute(query, params)
+                        executed = time.perf_counter()
+                        rows = make_light_rows(cursor.description,
+                                               cursor.fetchall())
+                    finally:
+                        cursor.close()
+                else:
+                    results = connection.execute(_text_clause(query), params)
+                    executed = time.perf_counter()
+                    rows = results.fetchall()
+                fetched = time.perf_counter()
         except SQLAlchemyError as e:
+            if stats is not None:
+                stats.record_error(name)
+            if self.raise_errors:
+                raise
             print(f"SQLAlchemy Error: {e}")
             return []
         except Exception as e:
+            if stats is not None:
+                stats.record_error(name)
+            if self.raise_errors:
+                raise
             print(f"Unexpected Error: {e}")
             return []
 
-    def get_flight_by_id(self, flight_id) -> Sequence[Row]:
+        if stats is not None:
+            stats.record(name, len(rows),
+                         wall_ms=(fetched - start) * 1000,
+                         checkout_ms=(checked_out - start) * 1000,
+                         execute_ms=(executed - checked_out) * 1000,
+                         fetch_ms=(fetched - executed) * 1000,
+                         explain=lambda: self.explain_query(query))
+
+        if use_cache:
+            self.cache.put(key, rows)
+        return rows
+
+    def _stream_query(self, query, params, name=None,
+                      raise_errors=False) -> Iterator[Row]:
         """
-        Retrieve flight details by flight ID.
+        Execute an SQL query with the params provided in a dictionary,
+        and yield the records one at a time.
 
-        Searches for flight details using flight ID.
-        If the flight was found, returns a list with a single record.
+        Rows are fetched from the database in batches of `batch_size`, so
+        only one batch is held in memory at a time and the first rows are
+        available before the query has been read completely. Streamed
+        results bypass the cache.
+        If an exception was raised, print the error, and stop iterating,
+        or re-raise it if `raise_errors` is set here or on the object.
 
-        Parameter:
-            flight_id (int):
-                The unique identifier of the flight to retrieve.
+        Parameters:
+            query (str):
+                The SQL query string to execute. This can include placeholders
+                for parameters.
+            params (dict):
+                A dictionary of parameter values to safely inject into the query.
+            name (str):
+                The name the query is recorded under in the stats. Defaults
+                to the name of the query constant in util_sql_query.py.
+            raise_errors (bool):
+                Re-raise errors instead of ending the iteration, so a
+                consumer can tell a failed query from a complete result.
+
+        Yields:
+            Row: The rows fetched from the database.
+        """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        if name is None:
+            name = query_name(query)
+        params = self._with_delay_threshold(query, params)
+        try:
+            start = time.perf_counter()
+            with self._engine.connect() as connection:
+                checked_out = time.perf_counter()
+                connection = connection.execution_options(
+                    yield_per=self.batch_size)
+                results = connection.execute(_text_clause(query), params)
+                executed = time.perf_counter()
+                rows = 0
+                for row in results:
+                    rows += 1
+                    yield row
+                fetched = time.perf_counter()
+        except SQLAlchemyError as e:
+            if self.stats is not None:
+                self.stats.record_error(name)
+            if raise_errors or self.raise_errors:
+                raise
+            print(f"SQLAlchemy Error: {e}")
+            return
+        except Exception as e:
+            if self.stats is not None:
+                self.stats.record_error(name)
+            if raise_errors or self.raise_errors:
+                raise
+            print(f"Unexpected Error: {e}")
+            return
+
+        if self.stats is not None:
+            self.stats.record(name, rows,
+                              wall_ms=(fetched - start) * 1000,
+                              checkout_ms=(checked_out - start) * 1000,
+                              execute_ms=(executed - checked_out) * 1000,
+                              fetch_ms=(fetched - executed) * 1000,
+                              explain=lambda: self.explain_query(query))
+
+    def _with_delay_threshold(self, query, params) -> dict:
+        """
+        Add the delay threshold to the params of a query that uses it.
+        """
+        if ':delay_threshold' in query:
+            return {**params, 'delay_threshold': self.delay_threshold}
+        return params
+
+    @staticmethod
+    def _bind_list(name, values) -> tuple:
+        """
+        Build a list of numbered placeholders for an IN list or a VALUES
+        clause.
+
+        Parameters:
+            name (str): Prefix of the placeholder names.
+            values (list): Values, or tuples of values for a VALUES clause.
 
         Returns:
-            Sequence[Row]:
-                A sequence of rows fetched from the database.
+            tuple:
+                The SQL fragment (e.g. ":id_0, :id_1" or
+                "(:route_0_0, :route_0_1), ...") and the matching params.
         """
-        params = {'id': flight_id}
-        return self._execute_query(QUERY_FLIGHT_BY_ID, params)
+        fragments = []
+        params = {}
+        for i, value in enumerate(values):
+            if isinstance(value, tuple):
+                names = [f"{name}_{i}_{j}" for j in range(len(value))]
+                params.update(zip(names, value))
+                fragments.append(
+                    "(" + ", ".join(":" + n for n in names) + ")")
+            else:
+                params[f"{name}_{i}"] = value
+                fragments.append(f":{name}_{i}")
+        return ", ".join(fragments), params
 
-    def get_flights_by_date(self, day, month, year) -> Sequence[Row]:
+    def _execute_batched(self, query, name, values) -> list:
         """
-        Retrieve flights for a specific date with delays.
+        Execute a batch query template once per chunk of values, keeping
+        every statement under the SQLite bound parameter limit.
 
         Parameters:
-            day (int): The day of the flight.
-            month (int): The month of the flight.
-            year (int): The year of the flight.
+            query (str): The query template, with a `{name}` placeholder.
+            name (str): The name of the placeholder in the template.
+            values (list): Values, or tuples of values for a VALUES clause.
 
         Returns:
-            Sequence[Row]:
-                A sequence of rows fetched from the database.
+            list: The rows of all chunks.
+        """
+        values = list(dict.fromkeys(values))
+        if not values:
+            return []
+        width = len(values[0]) if isinstance(values[0], tuple) else 1
+        chunk_size = self.MAX_BOUND_PARAMETERS // width
 
-        Notes:
-            - The method uses the `QUERY_FLIGHT_BY_DATE` SQL query.
+        rows = []
+        for start in range(0, len(values), chunk_size):
+            fragment, params = self._bind_list(
+                name, values[start:start + chunk_size])
+            rows.extend(self._execute_query(query.format(**{name: fragment}),
+                                            params, name=query_name(query)))
+        return rows
+
+    @staticmethod
+    def _encode_cursor(row) -> str:
+        """
+        Encode the position of a row of a delayed-flight page as an opaque
+        cursor string.
         """
+        position = json.dumps([row._mapping['DELAY'], row._mapping['ID']])
+        return base64.urlsafe_b64encode(position.encode()).decode()
 
-        params = {'day': day, 'month': month, 'year': year}
-        return self._execute_query(QUERY_FLIGHT_BY_DATE, params)
+    @staticmethod
+    def _decode_cursor(cursor) -> tuple:
+        """
+        Decode a cursor created by `_encode_cursor`.
 
-    def get_delayed_flights_by_airline(self, airline: str) -> Sequence[Row]:
+        Raises:
+            ValueError: If the cursor is not a valid cursor.
         """
-        Retrieve delayed flights for a specific airline.
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+        # A [delay, id] pair; bool is an int subclass but no position
+        if not (isinstance(position, list) and len(position) == 2
+                and isinstance(position[0], (int, float))
+                and isinstance(position[1], int)
+                and not any(isinstance(value, bool) for value in position)):
+            raise ValueError(f"Invalid page cursor: {cursor!r}")
+        last_delay, last_id = position
+        return last_delay, last_id
+
+    def _fetch_page(self, query, params, page_size, cursor,
+                    name=None) -> tuple:
+        """
+        Fetch one page of a keyset paginated query.
+
+        One row more than the page size is fetched to find out whether
+        another page follows.
+
+        Parameters:
+            query (str): The paginated SQL query string.
+            params (dict): The parameters of the query, without position.
+            page_size (int): The maximum number of rows of the page.
+            cursor (str): The cursor of the previous page, or None.
+            name (str): The name the query is recorded under in the stats.
+
+        Returns:
+            tuple:
+                The rows of the page, and the cursor of the next page or
+                None if this is the last page.
+        """
+        last_delay, last_id = self._decode_cursor(cursor) \
+            if cursor is not None else self._FIRST_PAGE_POSITION
+        rows = self._execute_query(query, {**params,
+                                           'last_delay': last_delay,
+                                           'last_id': last_id,
+                                           'page_size': page_size + 1},
+                                   name=name)
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self._encode_cursor(rows[-1])
+
+    @property
+    def _error_stream(self):
+        # With raise_errors stdout may carry JSON or CSV rows
+        return sys.stderr if self.raise_errors else sys.stdout
+
+    def _execute_statements(self, statements) -> bool:
+        """
+        Execute a list of SQL statements inside a single transaction.
+        The transaction is committed only if every statement succeeds,
+        after which the cache is invalidated.
+        If an exception was raised, print the error (on stderr with
+        `raise_errors`), and return False.
+
+        Parameters:
+            statements (list of str or tuple):
+                The SQL statements to execute, in order. A statement with
+                parameters is given as a (statement, params) tuple.
+
+        Returns:
+            bool:
+                True if the transaction was committed, False otherwise.
+        """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        try:
+            with self._engine.begin() as connection:
+                for statement in statements:
+                    statement, params = statement \
+                        if isinstance(statement, tuple) else (statement, {})
+                    connection.execute(
+                        _text_clause(statement),
+                        self._with_delay_threshold(statement, params))
+        except SQLAlchemyError as e:
+            print(f"SQLAlchemy Error: {e}", file=self._error_stream)
+            return False
+        except Exception as e:
+            print(f"Unexpected Error: {e}", file=self._error_stream)
+            return False
+
+        if self.cache is not None:
+            self.cache.invalidate()
+        self._airline_search = None
+        return True
+
+    def _table_exists(self, table_name: str) -> bool:
+        """
+        Check whether a table with the given name exists in the database.
 
         Parameter:
-            airline (str):
-                The name (or partial name) of the airline to search for.
+            table_name (str): The name of the table.
 
         Returns:
-            Sequence[Row]:
-                A sequence of rows fetched from the database.
+            bool: True if the table exists.
+        """
+        return bool(self._execute_query(QUERY_TABLE_EXISTS,
+                                        {'name': table_name},
+                                        use_cache=False))
 
-        Notes:
-            - The method uses the `QUERY_FLIGHT_BY_AIRLINE` SQL query.
+    def _table_columns(self, table_name: str) -> list:
         """
+        Return the column names of a table.
 
-        params = {'airline': "%" + airline + "%"}
-        return self._execute_query(QUERY_FLIGHT_BY_AIRLINE, params)
+        Parameter:
+            table_name (str): The name of the table.
 
-    def get_delayed_flights_by_airport(self, airport_input: str) -> Sequence[
-        Row]:
+        Returns:
+            list of str:
+                The column names in table order, or an empty list if the
+                table does not exist.
         """
-        Retrieve delayed flights departing from a specific airport.
+        return [row[0] for row in self._execute_query(
+            QUERY_TABLE_COLUMNS, {'table': table_name}, use_cache=False)]
 
-        Description:
-            This method fetches flights departing from a given origin airport
-            with departure delays of at least 20 minutes. Results are ordered
-            by departure delay in descending order.
+    def _flights_fingerprint(self):
+        """
+        Return the row count, the highest ID and the change counter of
+        `flights` (see util_sql_query.py, Route statistics). The counter is
+        None until a summary table has been built, which installs it.
 
-        Parameters:
-            airport_input (str):
-                The IATA code of the origin airport.
+        Returns:
+            tuple: The fingerprint, or None if it cannot be read.
+        """
+        fingerprint = self._execute_query(QUERY_FLIGHTS_FINGERPRINT, {},
+                                          use_cache=False)
+        if not fingerprint:
+            return None
+        changes = None
+        if self._table_exists('flights_changes'):
+            counter = self._execute_query(QUERY_FLIGHTS_CHANGES, {},
+                                          use_cache=False)
+            changes = counter[0][0] if counter else None
+        return (*fingerprint[0], changes)
+
+    def _meta_matches(self, meta, fingerprint) -> bool:
+        """
+        Check that the meta row of a summary table was written for the
+        delay threshold and at the change counter of the fingerprint of
+        `flights`. The row count and highest ID are compared by the caller.
+        """
+        return bool(meta) and fingerprint is not None \
+            and meta[0].DELAY_THRESHOLD == self.delay_threshold \
+            and meta[0].FLIGHTS_CHANGES == fingerprint[2]
+
+    def data_version(self) -> str:
+        """
+        Return a version string of the `flights` table, built from its row
+        count, highest ID and change counter. It changes whenever flights
+        are added or deleted, and when they are updated once the change
+        counter is installed.
 
         Returns:
-            Sequence[Row]:
-                A sequence of rows fetched from the database.
+            str: The version, or an empty string if it cannot be read.
+        """
+        fingerprint = self._flights_fingerprint()
+        if fingerprint is None:
+            return ""
+        count, max_id, changes = fingerprint
+        return f"{count}-{max_id}-{changes}"
 
-        Notes:
-            - The method uses the `QUERY_FLIGHT_BY_ORIGIN_AIRPORT` SQL query.
+    def is_route_stats_stale(self) -> bool:
         """
+        Check whether the `route_stats` summary table is missing or out of
+        date.
 
-        params = {'origin_airport': airport_input}
-        return self._execute_query(QUERY_FLIGHT_BY_ORIGIN_AIRPORT, params)
+        The summary is considered stale when the row count, the highest
+        flight ID or the change counter (updated and deleted flights)
+        stored in `route_stats_meta` no longer matches the `flights` table,
+        or when it was built with another delay threshold.
 
-    def generate_percentage_of_delayed_flights(self,
-                                               origin_airport: str,
-                                               destination_airport: str) -> \
-            Sequence[
-                Row]:
+        Returns:
+            bool: True if `route_stats` has to be (re)built.
         """
-        Calculates the average percentage of delayed flights between two airports,
-        considering both directions: origin to destination and destination to origin.
+        if not (self._table_exists('route_stats')
+                and 'FLIGHTS_CHANGES'
+                in self._table_columns('route_stats_meta')):
+            return True
 
-        Parameters:
-            origin_airport (str): The IATA code of the origin airport.
-            destination_airport (str): The IATA code of the destination airport.
+        meta = self._execute_query(QUERY_ROUTE_STATS_META, {},
+                                   use_cache=False)
+        fingerprint = self._flights_fingerprint()
+        if not self._meta_matches(meta, fingerprint):
+            return True
+        return tuple(meta[0][:2]) != fingerprint[:2]
+
+    def build_route_stats(self) -> bool:
+        """
+        (Re)build the `route_stats` summary table from `flights`.
+
+        Counts the delayed and total flights per directed route in a single
+        pass over `flights` and records the fingerprint of `flights` and the
+        delay threshold in `route_stats_meta`. The previous summary is
+        replaced atomically. The change counter of `flights` and its
+        triggers are created if needed.
 
         Returns:
-            Sequence[Row]:
-                A sequence of rows fetched from the database.
+            bool:
+                True if the summary was built, False if the database could
+                not be written (e.g. it is opened read-only).
         """
-        params = {'origin': origin_airport,
-                  'destination': destination_airport,
-                  'origin_vv': destination_airport,
-                  'destination_vv': origin_airport
-                  }
-        return self._execute_query(QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS,
-                                   params)
+        built = self._execute_statements([*self._FLIGHTS_CHANGES_STATEMENTS,
+                                          QUERY_CREATE_ROUTE_STATS,
+                                          QUERY_DROP_ROUTE_STATS_META,
+                                          QUERY_CREATE_ROUTE_STATS_META,
+                                          QUERY_CLEAR_ROUTE_STATS,
+                                          QUERY_POPULATE_ROUTE_STATS,
+                                          QUERY_INSERT_ROUTE_STATS_META])
+        self._route_stats_ready = built
+        return built
 
-    def get_airport_lat_long(self, origin_airport: str,
-                             destination_airport: str) -> Sequence[
-        Row]:
+    def refresh_route_stats(self, force=False) -> bool:
         """
-        Retrieves the latitude and longitude coordinates for the specified origin
-        and destination airports.
+        Rebuild the `route_stats` summary table if `flights` has changed.
 
-        Parameters:
-            origin_airport (str): The IATA code of the origin airport.
-            destination_airport (str): The IATA code of the destination airport.
+        Parameter:
+            force (bool):
+                Rebuild even if the summary is up to date.
 
         Returns:
-            Sequence[Row]:
-                A sequence of rows fetched from the database.
+            bool: True if the summary is available and up to date.
         """
-        params = {'origin': origin_airport,
-                  'destination': destination_airport}
+        with self._summary_lock:
+            if force or self.is_route_stats_stale():
+                return self.build_route_stats()
+            self._route_stats_ready = True
+            return True
+
+    def _ensure_route_stats(self) -> bool:
+        """
+        Make sure the `route_stats` summary is usable. The staleness check
+        (and the build, if needed) runs once per FlightData object; threads
+        arriving meanwhile wait for it. Call `refresh_route_stats` to pick
+        up later changes to `flights`.
 
-        return self._execute_query(QUERY_LONG_LAT, params)
+        Returns:
+            bool: True if `route_stats` can be queried.
+        """
+        if not self._route_stats_checked:
+            with self._summary_lock:
+                if not self._route_stats_checked:
+                    self.refresh_route_stats()
+                    self._route_stats_checked = True
+        return self._route_stats_ready
+
+    def delay_cube_status(self) -> str:
+        """
+        Check whether the `daily_delay_cube` is up to date with `flights`.
+
+        Flights are assumed to be appended with increasing IDs. If every
+        flight that is not in the cube has an ID above the highest ID the
+        cube includes, the cube can be updated incrementally; otherwise
+        (updated or deleted flights, missing cube, another delay
+        threshold) it has to be rebuilt.
+
+        Returns:
+            str: 'fresh', 'append' or 'rebuild'.
+        """
+        if not (self._table_exists('daily_delay_cube')
+                and 'FLIGHTS_CHANGES'
+                in self._table_columns('daily_delay_cube_meta')):
+            return 'rebuild'
+
+        meta = self._execute_query(QUERY_DELAY_CUBE_META, {},
+                                   use_cache=False)
+        fingerprint = self._flights_fingerprint()
+        if not self._meta_matches(meta, fingerprint):
+            return 'rebuild'
+
+        cube_count, cube_max_id = meta[0][:2]
+        flights_count, flights_max_id = fingerprint[:2]
+        if (cube_count, cube_max_id) == (flights_count, flights_max_id):
+            return 'fresh'
+        if cube_max_id is None or flights_max_id is None \
+                or flights_max_id < cube_max_id:
+            return 'rebuild'
+        appended = self._execute_query(QUERY_COUNT_FLIGHTS_AFTER_ID,
+                                       {'last_id': cube_max_id},
+                                       use_cache=False)
+        if appended and cube_count + appended[0][0] == flights_count:
+            return 'append'
+        return 'rebuild'
+
+    def build_delay_cube(self) -> bool:
+        """
+        (Re)build the `daily_delay_cube` from all flights. The previous cube
+        is replaced atomically.
+
+        Returns:
+            bool:
+                True if the cube was built, False if the database could not
+                be written (e.g. it is opened read-only).
+        """
+        built = self._execute_statements([
+            *self._FLIGHTS_CHANGES_STATEMENTS,
+            QUERY_CREATE_DELAY_CUBE,
+            QUERY_CREATE_DELAY_CUBE_INDEX,
+            QUERY_DROP_DELAY_CUBE_META,
+            QUERY_CREATE_DELAY_CUBE_META,
+            QUERY_CLEAR_DELAY_CUBE,
+            (QUERY_UPSERT_DELAY_CUBE, {'last_id': self._NO_FLIGHTS_ID}),
+            QUERY_INSERT_DELAY_CUBE_META])
+        self._delay_cube_ready = built
+        return built
+
+    def update_delay_cube(self) -> bool:
+        """
+        Add the flights appended since the last update to the
+        `daily_delay_cube`. Only the cells of the new flights' days,
+        airlines and airports are written.
+
+        Returns:
+            bool: True if the cube was updated.
+        """
+        meta = self._execute_query(QUERY_DELAY_CUBE_META, {},
+                                   use_cache=False)
+        if not meta:
+            return False
+        last_id = meta[0][1] if meta[0][1] is not None \
+            else self._NO_FLIGHTS_ID
+        updated = self._execute_statements([
+            (QUERY_UPSERT_DELAY_CUBE, {'last_id': last_id}),
+            QUERY_CLEAR_DELAY_CUBE_META,
+            QUERY_INSERT_DELAY_CUBE_META])
+        self._delay_cube_ready = updated
+        return updated
+
+    def refresh_delay_cube(self, force=False) -> bool:
+        """
+        Bring the `daily_delay_cube` up to date with `flights`: appended
+        flights are added incrementally, any other change rebuilds it.
+
+        Parameter:
+            force (bool):
+                Rebuild even if the cube is up to date.
+
+        Returns:
+            bool: True if the cube is available and up to date.
+        """
+        with self._summary_lock:
+            status = 'rebuild' if force else self.delay_cube_status()
+            if status == 'rebuild':
+                return self.build_delay_cube()
+            if status == 'append':
+                return self.update_delay_cube()
+            self._delay_cube_ready = True
+            return True
+
+    def _delay_cube_source(self) -> str:
+        """
+        Return what to select delay cube cells from: the `daily_delay_cube`
+        table, or a subquery over `flights` if it is not available. The
+        cube is refreshed once per FlightData object (threads arriving
+        meanwhile wait for it); call `refresh_delay_cube` to pick up later
+        changes to `flights`.
+        """
+        if not self._delay_cube_checked:
+            with self._summary_lock:
+                if not self._delay_cube_checked:
+                    self.refresh_delay_cube()
+                    self._delay_cube_checked = True
+        if self._delay_cube_ready:
+            return "daily_delay_cube"
+        return "(" + QUERY_DELAY_CUBE_SOURCE + ")"
+
+    def explain_query(self, query) -> list:
+        """
+        Return the SQLite query plan of an SQL query.
+
+        Every named parameter of the query is bound to NULL, which does not
+        change the plan SQLite chooses.
+
+        Parameter:
+            query (str): The SQL query string to explain.
+
+        Returns:
+            list of str:
+                The detail column of EXPLAIN QUERY PLAN, one entry per step.
+        """
+        params = {name: None for name in re.findall(r'(?<!:):(\w+)', query)}
+        plan = self._execute_query("EXPLAIN QUERY PLAN " + query, params,
+                                   use_cache=False)
+        return [step[3] for step in plan]
+
+    def provision_indexes(self, report=True) -> dict:
+        """
+        Create the indexes the registered queries need.
+
+        Runs EXPLAIN QUERY PLAN for every query in `REGISTERED_QUERIES`.
+        When a plan contains a full table scan, the indexes advised for that
+        query in `QUERY_INDEX_ADVICE` are created unless they already exist.
+        The tables are analyzed afterwards so that the query planner picks
+        the new indexes up.
+
+        Parameter:
+            report (bool): Print the plans before and after.
+
+        Returns:
+            dict:
+                Maps each query name to a tuple of its plan before and after
+                provisioning.
+        """
+        plans_before = {name: self.explain_query(query)
+                        for name, query in REGISTERED_QUERIES.items()}
+
+        wanted = []
+        for name, plan in plans_before.items():
+            if any(step.startswith('SCAN') for step in plan):
+                wanted += [index for index in QUERY_INDEX_ADVICE.get(name, [])
+                           if index not in wanted
+                           and not self._execute_query(QUERY_INDEX_EXISTS,
+                                                       {'name': index},
+                                                       use_cache=False)]
+
+        if wanted:
+            statements = [INDEX_DEFINITIONS[index] for index in wanted]
+            if not self._execute_statements(statements + ['ANALYZE']):
+                wanted = []
+
+        plans = {name: (plans_before[name], self.explain_query(query))
+                 for name, query in REGISTERED_QUERIES.items()}
+
+        if report:
+            print(f"Indexes created: {', '.join(wanted) or 'none'}")
+            for name, (before, after) in plans.items():
+                print(f"{name}:")
+                print(f"   before: {'; '.join(before)}")
+                print(f"   after:  {'; '.join(after)}")
+        return plans
+
+    def get_flights_table_columns(self) -> list:
+        """
+        Return the column names of the `flights` table.
+
+        Returns:
+            list of str:
+                The column names in table order, or an empty list if the
+                table does not exist.
+        """
+        return self._table_columns('flights')
+
+    def get_flights_indexes(self) -> list:
+        """
+        Return the indexes of the `flights` table.
+
+        Returns:
+            list of tuple: (name, statement creating the index) pairs.
+        """
+        return [tuple(row) for row in self._execute_query(
+            QUERY_FLIGHTS_INDEXES, {}, use_cache=False)]
+
+    def drop_flights_indexes(self) -> list:
+        """
+        Drop the indexes of the `flights` table, e.g. before a bulk load,
+        so that SQLite does not update them for every inserted row.
+
+        Returns:
+            list of tuple:
+                The (name, statement) pairs of the dropped indexes, to be
+                passed to `create_flights_indexes` afterwards. Empty if no
+                index was dropped.
+        """
+        indexes = self.get_flights_indexes()
+        if not indexes or not self._execute_statements(
+                [QUERY_DROP_INDEX.format(name=name) for name, _ in indexes]):
+            return []
+        return indexes
+
+    def set_journal_mode(self, mode: str):
+        """
+        Switch the journal mode of the database file. WAL lets readers run
+        while a writer commits; the mode persists in the file, and SQLite
+        keeps `-wal` and `-shm` files next to a database in WAL mode.
+
+        Parameter:
+            mode (str): One of JOURNAL_MODES ('WAL' or 'DELETE').
+
+        Returns:
+            str: The journal mode in effect afterwards, or None if it could
+                 not be read.
+
+        Raises:
+            ValueError: If the mode is not one of JOURNAL_MODES.
+        """
+        if mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {mode!r}")
+        rows = self._execute_query(
+            QUERY_SET_JOURNAL_MODE.format(mode=mode.upper()), {},
+            use_cache=False, name='QUERY_SET_JOURNAL_MODE')
+        return rows[0][0].upper() if rows else None
+
+    def create_flights_indexes(self, indexes) -> bool:
+        """
+        Create indexes of the `flights` table again and analyze the table,
+        so that each index is built once by sorting all rows.
+
+        Parameter:
+            indexes (list of tuple):
+                (name, statement) pairs from `drop_flights_indexes`.
+
+        Returns:
+            bool: True if the indexes were created.
+        """
+        if not indexes:
+            return True
+        return self._execute_statements(
+            [statement for _, statement in indexes] + ['ANALYZE flights'])
+
+    def insert_flights(self, columns, rows,
+                       chunk_rows=INSERT_CHUNK_ROWS,
+                       commit_rows=INSERT_COMMIT_ROWS, progress=None):
+        """
+        Insert flights into the `flights` table.
+
+        The rows are consumed lazily, `chunk_rows` at a time, and inserted
+        with `executemany` on the DBAPI cursor. A transaction is committed
+        every `commit_rows` rows, so memory use does not grow with the
+        number of rows and a failure only loses the current transaction.
+        Rows whose ID is already in `flights` are skipped.
+        If an exception was raised, print the error, and return None.
+
+        Parameters:
+            columns (list of str):
+                Names of `flights` columns, in the order of the row values.
+            rows (iterable of tuple):
+                The values of every flight.
+            chunk_rows (int):
+                Number of rows per `executemany` call.
+            commit_rows (int):
+                Number of rows per transaction.
+            progress (callable):
+                Optional function called with the number of rows read and
+                inserted so far after every chunk.
+
+        Returns:
+            tuple:
+                The number of rows read and inserted, or None on failure.
+        """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        unknown = set(columns) - set(self.get_flights_table_columns())
+        if not columns or unknown:
+            print(f"Unknown flights columns: {', '.join(sorted(unknown))}")
+            return None
+
+        query = QUERY_INSERT_FLIGHTS.format(
+            columns=", ".join(columns),
+            placeholders=", ".join("?" * len(columns)))
+        rows = iter(rows)
+        read = inserted = 0
+        try:
+            with self._engine.connect() as connection:
+                cursor = connection.connection.cursor()
+                try:
+                    exhausted = False
+                    while not exhausted:
+                        with connection.begin():
+                            in_transaction = 0
+                            while in_transaction < commit_rows:
+                                chunk = list(islice(rows, min(
+                                    chunk_rows,
+                                    commit_rows - in_transaction)))
+                                if not chunk:
+                                    exhausted = True
+                                    break
+                                cursor.executemany(query, chunk)
+                                in_transaction += len(chunk)
+                                read += len(chunk)
+                                inserted += cursor.rowcount
+                                if progress is not None:
+                                    progress(read, inserted)
+                finally:
+                    cursor.close()
+        except SQLAlchemyError as e:
+            print(f"SQLAlchemy Error: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected Error: {e}")
+            return None
+        finally:
+            if inserted:
+                self._flights_changed()
+        return read, inserted
+
+    def _flights_changed(self) -> None:
+        """
+        Forget the cached results and summary table checks after flights
+        were inserted.
+        """
+        if self.cache is not None:
+            self.cache.invalidate()
+        self._route_stats_checked = False
+        self._delay_cube_checked = False
+
+    def get_flight_by_id(self, flight_id) -> Sequence[Row]:
+        """
+        Retrieve flight details by flight ID.
+
+        Searches for flight details using flight ID.
+        If the flight was found, returns a list with a single record.
+
+        Parameter:
+            flight_id (int):
+                The unique identifier of the flight to retrieve.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        params = {'id': flight_id}
+        return self._execute_query(QUERY_FLIGHT_BY_ID, params)
+
+    def iter_flight_by_id(self, flight_id) -> Iterator[Row]:
+        """
+        Streaming variant of `get_flight_by_id`.
+
+        Parameter:
+            flight_id (int):
+                The unique identifier of the flight to retrieve.
+
+        Yields:
+            Row: The rows fetched from the database.
+        """
+        params = {'id': flight_id}
+        return self._stream_query(QUERY_FLIGHT_BY_ID, params)
+
+    def get_flights_by_date(self, day, month, year) -> Sequence[Row]:
+        """
+        Retrieve flights for a specific date with delays.
+
+        Parameters:
+            day (int): The day of the flight.
+            month (int): The month of the flight.
+            year (int): The year of the flight.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+
+        Notes:
+            - The method uses the `QUERY_FLIGHT_BY_DATE` SQL query.
+        """
+
+        params = {'day': day, 'month': month, 'year': year}
+        return self._execute_query(QUERY_FLIGHT_BY_DATE, params)
+
+    def iter_flights_by_date(self, day, month, year,
+                             raise_errors=False) -> Iterator[Row]:
+        """
+        Streaming variant of `get_flights_by_date`.
+
+        Parameters:
+            day (int): The day of the flight.
+            month (int): The month of the flight.
+            year (int): The year of the flight.
+            raise_errors (bool): Re-raise query errors instead of ending
+                                 the iteration.
+
+        Yields:
+            Row: The rows fetched from the database.
+        """
+        params = {'day': day, 'month': month, 'year': year}
+        return self._stream_query(QUERY_FLIGHT_BY_DATE, params,
+                                  raise_errors=raise_errors)
+
+    def resolve_airlines(self, airline: str) -> list:
+        """
+        Resolve an airline name to the IDs of the matching airlines, using
+        substring, prefix and fuzzy matching (see airline_search.py).
+
+        The airlines are loaded into an in-memory trigram index on first
+        use.
+
+        Parameter:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+
+        Returns:
+            list of int: The IDs of the matching airlines, best match first.
+        """
+        # Read once: a write to the database resets the index meanwhile
+        search = self._airline_search
+        if search is None:
+            with self._index_lock:
+                search = self._airline_search
+                if search is None:
+                    airlines = self.get_airlines()
+                    if not airlines:
+                        return []
+                    search = self._airline_search = AirlineSearch(airlines)
+        return search.match(airline)
+
+    def _airline_query(self, query, airline_ids):
+        """
+        Fill the `{ids}` list of an airline query template.
+
+        Returns:
+            tuple:
+                The query and its params, or None if there are no IDs.
+        """
+        airline_ids = list(dict.fromkeys(airline_ids))
+        if not airline_ids:
+            return None
+        fragment, params = self._bind_list('airline_id', airline_ids)
+        return query.format(ids=fragment), params
+
+    def get_delayed_flights_by_airline(self, airline: str) -> Sequence[Row]:
+        """
+        Retrieve delayed flights for a specific airline.
+
+        Parameter:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+
+        Notes:
+            - The name is resolved to airline IDs with `resolve_airlines`,
+              then the method uses the `QUERY_FLIGHT_BY_AIRLINE_IDS` SQL
+              query.
+        """
+        return self.get_delayed_flights_by_airline_ids(
+            self.resolve_airlines(airline))
+
+    def iter_delayed_flights_by_airline(self, airline: str) -> Iterator[Row]:
+        """
+        Streaming variant of `get_delayed_flights_by_airline`.
+
+        Parameter:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+
+        Yields:
+            Row: The rows fetched from the database.
+        """
+        return self.iter_delayed_flights_by_airline_ids(
+            self.resolve_airlines(airline))
+
+    def get_delayed_flights_by_airline_ids(self, airline_ids) -> Sequence[
+            Row]:
+        """
+        Retrieve delayed flights of a set of airlines.
+
+        Parameter:
+            airline_ids (list of int): The IDs of the airlines.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        airline_query = self._airline_query(QUERY_FLIGHT_BY_AIRLINE_IDS,
+                                            airline_ids)
+        if airline_query is None:
+            return []
+        return self._execute_query(*airline_query,
+                                   name='QUERY_FLIGHT_BY_AIRLINE_IDS')
+
+    def iter_delayed_flights_by_airline_ids(self, airline_ids,
+                                            raise_errors=False) -> Iterator[
+            Row]:
+        """
+        Streaming variant of `get_delayed_flights_by_airline_ids`.
+
+        Parameters:
+            airline_ids (list of int): The IDs of the airlines.
+            raise_errors (bool): Re-raise query errors instead of ending
+                                 the iteration.
+
+        Yields:
+            Row: The rows fetched from the database.
+        """
+        airline_query = self._airline_query(QUERY_FLIGHT_BY_AIRLINE_IDS,
+                                            airline_ids)
+        if airline_query is None:
+            return iter(())
+        return self._stream_query(*airline_query,
+                                  name='QUERY_FLIGHT_BY_AIRLINE_IDS',
+                                  raise_errors=raise_errors)
+
+    def get_delayed_flights_by_airport(self, airport_input: str) -> Sequence[
+        Row]:
+        """
+        Retrieve delayed flights departing from a specific airport.
+
+        Description:
+            This method fetches flights departing from a given origin airport
+            delayed by at least the delay threshold. Results are ordered
+            by departure delay in descending order.
+
+        Parameters:
+            airport_input (str):
+                The IATA code of the origin airport.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+
+        Notes:
+            - The method uses the `QUERY_FLIGHT_BY_ORIGIN_AIRPORT` SQL query.
+        """
+
+        params = {'origin_airport': airport_input}
+        return self._execute_query(QUERY_FLIGHT_BY_ORIGIN_AIRPORT, params)
+
+    def iter_delayed_flights_by_airport(self, airport_input: str,
+                                        raise_errors=False) -> Iterator[Row]:
+        """
+        Streaming variant of `get_delayed_flights_by_airport`.
+
+        Parameters:
+            airport_input (str):
+                The IATA code of the origin airport.
+            raise_errors (bool):
+                Re-raise query errors instead of ending the iteration.
+
+        Yields:
+            Row: The rows fetched from the database.
+        """
+        params = {'origin_airport': airport_input}
+        return self._stream_query(QUERY_FLIGHT_BY_ORIGIN_AIRPORT, params,
+                                  raise_errors=raise_errors)
+
+    def generate_percentage_of_delayed_flights(self,
+                                               origin_airport: str,
+                                               destination_airport: str) -> \
+            Sequence[
+                Row]:
+        """
+        Calculates the average percentage of delayed flights between two airports,
+        considering both directions: origin to destination and destination to origin.
+
+        The percentages are read from the `route_stats` summary table, which
+        is built on first use. If the summary cannot be built, the
+        percentages are computed from the `flights` table directly.
+
+        Parameters:
+            origin_airport (str): The IATA code of the origin airport.
+            destination_airport (str): The IATA code of the destination airport.
+
+        Returns:
+            Sequence[Row]:
+                A sequence of rows fetched from the database.
+        """
+        params = {'origin': origin_airport,
+                  'destination': destination_airport,
+                  'origin_vv': destination_airport,
+                  'destination_vv': origin_airport
+                  }
+        if self._ensure_route_stats():
+            return self._execute_query(QUERY_ROUTE_STATS_PERCENTAGE, params)
+        return self._execute_query(QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS,
+                                   params)
+
+    @property
+    def airport_index(self) -> AirportIndex:
+        """
+        The in-memory index of the airports (see airport_index.py), loaded
+        on first use. Coordinates and distances are answered from it
+        without querying the database.
+        """
+        if self._airport_index is None:
+            with self._index_lock:
+                if self._airport_index is None:
+                    self._airport_index = AirportIndex(self._execute_query(
+                        QUERY_AIRPORTS, {}, use_cache=False))
+        return self._airport_index
+
+    def get_airport_lat_long(self, origin_airport: str,
+                             destination_airport: str) -> list:
+        """
+        Retrieves the latitude and longitude coordinates for the specified origin
+        and destination airports.
+
+        Parameters:
+            origin_airport (str): The IATA code of the origin airport.
+            destination_airport (str): The IATA code of the destination airport.
+
+        Returns:
+            list:
+                The (IATA_CODE, LATITUDE, LONGITUDE) rows of the origin and
+                then the destination airport; unknown airports are left out.
+        """
+        index = self.airport_index
+        return [coords for coords in (index.coords(origin_airport),
+                                      index.coords(destination_airport))
+                if coords is not None]
+
+    def iter_airport_lat_long(self, origin_airport: str,
+                              destination_airport: str) -> Iterator[Row]:
+        """
+        Streaming variant of `get_airport_lat_long`.
+
+        Parameters:
+            origin_airport (str): The IATA code of the origin airport.
+            destination_airport (str): The IATA code of the destination airport.
+
+        Yields:
+            Row: The rows of the origin and the destination airport.
+        """
+        return iter(self.get_airport_lat_long(origin_airport,
+                                              destination_airport))
+
+    def get_route_distance(self, origin_airport: str,
+                           destination_airport: str):
+        """
+        Return the great-circle distance of a route in kilometers, or None
+        if an airport has no coordinates.
+        """
+        return self.airport_index.distance_km(origin_airport,
+                                              destination_airport)
+
+    def get_nearest_airports(self, latitude, longitude, count=1) -> list:
+        """
+        Find the airports closest to a position.
+
+        Parameters:
+            latitude (float): The latitude of the position.
+            longitude (float): The longitude of the position.
+            count (int): The number of airports to return.
+
+        Returns:
+            list of tuple: (Airport, distance in km) pairs, closest first.
+        """
+        return self.airport_index.nearest(latitude, longitude, count)
+
+    def get_airports_within(self, iata_code: str, radius_km) -> list:
+        """
+        Find the other airports within a distance of an airport.
+
+        Parameters:
+            iata_code (str): The IATA code of the airport.
+            radius_km (float): The maximum distance in kilometers.
+
+        Returns:
+            list of tuple:
+                (Airport, distance in km) pairs, closest first; empty if the
+                airport has no coordinates.
+        """
+        airport = self.airport_index.get(iata_code)
+        if airport is None or airport.LATITUDE is None \
+                or airport.LONGITUDE is None:
+            return []
+        return [(other, distance) for other, distance
+                in self.airport_index.within(float(airport.LATITUDE),
+                                             float(airport.LONGITUDE),
+                                             radius_km)
+                if other.IATA_CODE != airport.IATA_CODE]
+
+    def get_flights_by_ids(self, flight_ids) -> dict:
+        """
+        Retrieve the details of many flights at once.
+
+        Parameter:
+            flight_ids (iterable of int):
+                The unique identifiers of the flights to retrieve.
+
+        Returns:
+            dict:
+                Maps every flight ID that was found to its row. IDs that do
+                not exist are left out.
+        """
+        rows = self._execute_batched(QUERY_FLIGHTS_BY_IDS, 'ids',
+                                     [int(flight_id)
+                                      for flight_id in flight_ids])
+        return {row._mapping['FLIGHT_ID']: row for row in rows}
+
+    def get_flights_by_dates(self, dates) -> dict:
+        """
+        Retrieve the delayed flights of many dates at once.
+
+        Parameter:
+            dates (iterable of tuple):
+                (day, month, year) tuples of the dates to retrieve.
+
+        Returns:
+            dict:
+                Maps every (day, month, year) tuple to the rows
+                `get_flights_by_date` would return for it.
+        """
+        dates = [tuple(date) for date in dates]
+        results = {date: [] for date in dates}
+        for row in self._execute_batched(QUERY_FLIGHTS_BY_DATES, 'dates',
+                                         dates):
+            mapping = row._mapping
+            results[(mapping['REQUESTED_DAY'], mapping['REQUESTED_MONTH'],
+                     mapping['REQUESTED_YEAR'])].append(row)
+        return results
+
+    def get_delay_percentages(self, route_pairs) -> dict:
+        """
+        Calculate the percentage of delayed flights of many routes at once.
+
+        Parameter:
+            route_pairs (iterable of tuple):
+                (origin, destination) tuples of IATA codes.
+
+        Returns:
+            dict:
+                Maps every (origin, destination) tuple to the rows
+                `generate_percentage_of_delayed_flights` would return for it,
+                one per direction of the route that has flights.
+        """
+        route_pairs = [tuple(pair) for pair in route_pairs]
+        directed = [route for origin, destination in route_pairs
+                    for route in ((origin, destination),
+                                  (destination, origin))]
+        query = QUERY_ROUTE_STATS_BY_ROUTES if self._ensure_route_stats() \
+            else QUERY_PERCENTAGE_BY_ROUTES
+        by_route = {(row[0], row[1]): row
+                    for row in self._execute_batched(query, 'routes',
+                                                     directed)}
+
+        return {(origin, destination):
+                [by_route[route] for route in ((origin, destination),
+                                               (destination, origin))
+                 if route in by_route]
+                for origin, destination in route_pairs}
+
+    def get_airport_coords(self, iata_codes) -> dict:
+        """
+        Retrieve the latitude and longitude of many airports at once.
+
+        Parameter:
+            iata_codes (iterable of str): The IATA codes of the airports.
+
+        Returns:
+            dict:
+                Maps every IATA code that was found to its row
+                (IATA_CODE, LATITUDE, LONGITUDE).
+        """
+        index = self.airport_index
+        found = (index.coords(code) for code in iata_codes)
+        return {coords[0]: coords for coords in found if coords is not None}
+
+    def _route_stats_source(self) -> str:
+        """
+        Return what to select route statistics from: the `route_stats`
+        table, or a subquery over `flights` if it is not available.
+        """
+        if self._ensure_route_stats():
+            return "route_stats"
+        return "(" + QUERY_ROUTE_STATS_SOURCE + ")"
+
+    def _with_route_distances(self, routes) -> list:
+        """
+        Append the great-circle distance of every route (DISTANCE_KM, from
+        the airport index) to route rows starting with (ORIGIN_AIRPORT,
+        DESTINATION_AIRPORT).
+        """
+        if not routes:
+            return []
+        row_type = light_row_type(tuple(routes[0]._fields) + ('DISTANCE_KM',))
+        distance_km = self.airport_index.distance_km
+        return [row_type((*route, distance_km(route[0], route[1])))
+                for route in routes]
+
+    def get_routes_from_airport(self, origin_airport: str) -> Sequence[Row]:
+        """
+        Retrieve every route departing from an airport, with its delay
+        percentage and the coordinates of both airports.
+
+        Parameter:
+            origin_airport (str): The IATA code of the origin airport.
+
+        Returns:
+            Sequence[Row]:
+                (ORIGIN_AIRPORT, DESTINATION_AIRPORT, PERCENT_DELAYED,
+                ORIGIN_LATITUDE, ORIGIN_LONGITUDE, DESTINATION_LATITUDE,
+                DESTINATION_LONGITUDE, TOTAL_FLIGHTS, DISTANCE_KM) rows,
+                most delayed first.
+        """
+        query = QUERY_ROUTES_FROM_AIRPORT.format(
+            route_stats=self._route_stats_source())
+        return self._with_route_distances(self._execute_query(
+            query, {'origin': origin_airport},
+            name='QUERY_ROUTES_FROM_AIRPORT'))
+
+    def get_most_delayed_routes(self, limit: int,
+                                min_flights: int = 1) -> Sequence[Row]:
+        """
+        Retrieve the routes with the highest percentage of delayed flights.
+
+        Parameters:
+            limit (int): The number of routes to return.
+            min_flights (int):
+                Ignore routes with fewer flights, whose percentages are not
+                meaningful.
+
+        Returns:
+            Sequence[Row]:
+                Rows in the same format as `get_routes_from_airport`.
+        """
+        query = QUERY_MOST_DELAYED_ROUTES.format(
+            route_stats=self._route_stats_source())
+        return self._with_route_distances(self._execute_query(
+            query, {'limit': limit, 'min_flights': min_flights},
+            name='QUERY_MOST_DELAYED_ROUTES'))
+
+    @staticmethod
+    def _date_key(date) -> int:
+        """
+        Return a date as the YYYYMMDD integer of the delay cube.
+        """
+        return date.year * 10000 + date.month * 100 + date.day
+
+    def _query_delay_cube(self, query, start, end, airline=None,
+                          origin_airport=None) -> Sequence[Row]:
+        """
+        Run a delay cube range query with optional airline and origin
+        filters.
+
+        Parameters:
+            query (str): The delay cube query template.
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            airline (str):
+                The name (or partial name) of the airline(s), resolved with
+                `resolve_airlines`; None for all airlines.
+            origin_airport (str):
+                The IATA code of the origin airport; None for all airports.
+
+        Returns:
+            Sequence[Row]: The rows of the query.
+        """
+        params = {'start': self._date_key(start), 'end': self._date_key(end),
+                  'last_id': self._NO_FLIGHTS_ID}
+        filters = ""
+        if airline is not None:
+            airline_ids = self.resolve_airlines(airline)
+            if not airline_ids:
+                return []
+            fragment, airline_params = self._bind_list('airline_id',
+                                                       airline_ids)
+            filters += QUERY_DELAY_CUBE_AIRLINE_FILTER.format(ids=fragment)
+            params.update(airline_params)
+        if origin_airport is not None:
+            filters += QUERY_DELAY_CUBE_ORIGIN_FILTER
+            params['origin_airport'] = origin_airport
+        return self._execute_query(
+            query.format(cube=self._delay_cube_source(), filters=filters),
+            params, name=query_name(query))
+
+    def get_delay_summary(self, start, end, airline=None,
+                          origin_airport=None) -> Sequence[Row]:
+        """
+        Summarize the delays of a date range, e.g. the delay rate of United
+        flights out of ORD in March, from the daily delay cube.
+
+        Parameters:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            airline (str):
+                The name (or partial name) of the airline; None for all.
+            origin_airport (str):
+                The IATA code of the origin airport; None for all.
+
+        Returns:
+            Sequence[Row]:
+                One (FLIGHTS, DELAYED_FLIGHTS, PERCENT_DELAYED, AVG_DELAY,
+                MAX_DELAY) row; the measures are NULL if no flight matches.
+        """
+        return self._query_delay_cube(QUERY_DELAY_CUBE_SUMMARY, start, end,
+                                      airline, origin_airport)
+
+    def get_daily_delay_trend(self, start, end, airline=None,
+                              origin_airport=None) -> Sequence[Row]:
+        """
+        Retrieve the delay measures of every day of a date range.
+
+        Parameters:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            airline (str):
+                The name (or partial name) of the airline; None for all.
+            origin_airport (str):
+                The IATA code of the origin airport; None for all.
+
+        Returns:
+            Sequence[Row]:
+                (YEAR, MONTH, DAY, FLIGHTS, DELAYED_FLIGHTS, PERCENT_DELAYED,
+                AVG_DELAY, MAX_DELAY) rows, one per day with flights, in
+                date order.
+        """
+        return self._query_delay_cube(QUERY_DELAY_CUBE_DAILY, start, end,
+                                      airline, origin_airport)
+
+    def get_delays_by_airline(self, start, end,
+                              origin_airport=None) -> Sequence[Row]:
+        """
+        Compare the delays of the airlines over a date range.
+
+        Parameters:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            origin_airport (str):
+                The IATA code of the origin airport; None for all.
+
+        Returns:
+            Sequence[Row]:
+                (AIRLINE, FLIGHTS, DELAYED_FLIGHTS, PERCENT_DELAYED,
+                AVG_DELAY, MAX_DELAY) rows, highest delay rate first.
+        """
+        return self._query_delay_cube(QUERY_DELAY_CUBE_BY_AIRLINE, start,
+                                      end, origin_airport=origin_airport)
+
+    def get_delays_by_origin_airport(self, start, end,
+                                     airline=None) -> Sequence[Row]:
+        """
+        Compare the delays of the origin airports over a date range.
+
+        Parameters:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            airline (str):
+                The name (or partial name) of the airline; None for all.
+
+        Returns:
+            Sequence[Row]:
+                (ORIGIN_AIRPORT, FLIGHTS, DELAYED_FLIGHTS, PERCENT_DELAYED,
+                AVG_DELAY, MAX_DELAY) rows, highest delay rate first.
+        """
+        return self._query_delay_cube(QUERY_DELAY_CUBE_BY_ORIGIN, start,
+                                      end, airline=airline)
+
+    @staticmethod
+    def _delay_group(by) -> tuple:
+        """
+        Return the columns of a delay group (see DELAY_GROUPS).
+
+        Raises:
+            ValueError: If the group is unknown.
+        """
+        if by not in DELAY_GROUPS:
+            raise ValueError(f"Unknown delay group {by!r}, expected one of "
+                             f"{', '.join(DELAY_GROUPS)}")
+        return DELAY_GROUPS[by]
+
+    @staticmethod
+    def _group_select(columns, alias) -> str:
+        """
+        Build the select list of the group columns; airline IDs are
+        replaced by the airline names.
+        """
+        return "".join(
+            f"   {QUERY_AIRLINE_NAME.format(alias=alias)}, "
+            if column == 'AIRLINE' else f"   {alias}.{column}, "
+            for column in columns)
+
+    @staticmethod
+    def _group_list(columns, alias) -> str:
+        """
+        Build a comma separated list of the group columns.
+        """
+        return ", ".join(f"{alias}.{column}" for column in columns)
+
+    def _flight_filters(self, airline, origin_airport, destination_airport):
+        """
+        Build the airline and airport filters of the delay distribution
+        queries.
+
+        Returns:
+            tuple:
+                The filters and their params, or None if no airline matches
+                the airline name.
+        """
+        filters = ""
+        params = {}
+        if airline is not None:
+            airline_ids = self.resolve_airlines(airline)
+            if not airline_ids:
+                return None
+            fragment, params = self._bind_list('airline_id', airline_ids)
+            filters += QUERY_FLIGHTS_AIRLINE_FILTER.format(ids=fragment)
+        if origin_airport is not None:
+            filters += QUERY_FLIGHTS_ORIGIN_FILTER
+            params['origin_airport'] = origin_airport
+        if destination_airport is not None:
+            filters += QUERY_FLIGHTS_DESTINATION_FILTER
+            params['destination_airport'] = destination_airport
+        return filters, params
+
+    def get_delay_percentiles(self, by='all',
+                              percentiles=DEFAULT_PERCENTILES,
+                              airline=None, origin_airport=None,
+                              destination_airport=None,
+                              min_flights=1) -> Sequence[Row]:
+        """
+        Compute departure delay percentiles per airline, airport or route,
+        e.g. the median and 95th percentile delay of every airline out of
+        ORD, in one pass over the matching flights.
+
+        Parameters:
+            by (str):
+                The group: 'all', 'airline', 'origin', 'destination' or
+                'route'.
+            percentiles (iterable of float):
+                The percentiles to compute, 0 to 100 (nearest rank).
+            airline (str):
+                The name (or partial name) of the airline; None for all.
+            origin_airport (str):
+                The IATA code of the origin airport; None for all.
+            destination_airport (str):
+                The IATA code of the destination airport; None for all.
+            min_flights (int):
+                Leave out groups with fewer flights (unless `by` is 'all').
+
+        Returns:
+            Sequence[Row]:
+                Rows of the group columns, FLIGHTS, PERCENT_DELAYED,
+                AVG_DELAY, MIN_DELAY, one P<percentile> column per
+                percentile (e.g. P50, P99_9) and MAX_DELAY, busiest group
+                first. Flights without a departure delay are not counted.
+
+        Raises:
+            ValueError: If the group or a percentile is invalid.
+        """
+        columns = self._delay_group(by)
+        percentiles = list(percentiles)
+        if not all(0 <= percentile <= 100 for percentile in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+        filters = self._flight_filters(airline, origin_airport,
+                                       destination_airport)
+        if filters is None:
+            return []
+        filters, params = filters
+
+        params['min_flights'] = min_flights
+        percentile_columns = ""
+        for i, percentile in enumerate(percentiles):
+            params[f"p_{i}"] = percentile / 100
+            label = f"P{percentile:g}".replace('.', '_')
+            percentile_columns += QUERY_DELAY_PERCENTILE_COLUMN.format(
+                name=f"p_{i}", label=label)
+        query = QUERY_DELAY_PERCENTILES.format(
+            group_select=self._group_select(columns, 'd'),
+            percentiles=percentile_columns,
+            partition="PARTITION BY " + self._group_list(columns, 'c')
+            if columns else "",
+            frequency_columns="".join(f"   f.{column}, "
+                                      for column in columns),
+            filters=filters,
+            group_by=QUERY_DELAY_PERCENTILES_GROUP_BY.format(
+                columns=self._group_list(columns, 'd')) if columns else "")
+        return self._execute_query(query, params,
+                                   name='QUERY_DELAY_PERCENTILES')
+
+    def get_delay_histogram(self, by='all', bin_minutes=15, airline=None,
+                            origin_airport=None,
+                            destination_airport=None) -> Sequence[Row]:
+        """
+        Count the departure delays per airline, airport or route in bins
+        of `bin_minutes`, in one pass over the matching flights.
+
+        Parameters:
+            by (str):
+                The group: 'all', 'airline', 'origin', 'destination' or
+                'route'.
+            bin_minutes (int): The width of the bins in minutes.
+            airline (str):
+                The name (or partial name) of the airline; None for all.
+            origin_airport (str):
+                The IATA code of the origin airport; None for all.
+            destination_airport (str):
+                The IATA code of the destination airport; None for all.
+
+        Returns:
+            Sequence[Row]:
+                Rows of the group columns, BIN_START, BIN_END, FLIGHTS and
+                the PERCENT and CUMULATIVE_PERCENT of the group's flights,
+                per group in bin order. Empty bins are left out.
+
+        Raises:
+            ValueError: If the group or the bin width is invalid.
+        """
+        columns = self._delay_group(by)
+        if int(bin_minutes) != bin_minutes or bin_minutes < 1:
+            raise ValueError("bin_minutes must be a positive integer")
+        filters = self._flight_filters(airline, origin_airport,
+                                       destination_airport)
+        if filters is None:
+            return []
+        filters, params = filters
+
+        params['bin_minutes'] = int(bin_minutes)
+        query = QUERY_DELAY_HISTOGRAM.format(
+            group_select=self._group_select(columns, 'h'),
+            partition="PARTITION BY " + self._group_list(columns, 'h')
+            if columns else "",
+            bin_columns="".join(f"      c.{column}, " for column in columns),
+            frequency_columns="".join(f"   f.{column}, "
+                                      for column in columns),
+            filters=filters,
+            order="".join(f"   h.{column}, " for column in columns))
+        return self._execute_query(query, params,
+                                   name='QUERY_DELAY_HISTOGRAM')
+
+    def get_top_delay_rates(self, by='route', limit=10,
+                            min_flights=100) -> Sequence[Row]:
+        """
+        Rank routes, airports or airlines by their percentage of delayed
+        flights, from the `route_stats` and `daily_delay_cube` summaries.
+
+        Parameters:
+            by (str):
+                'route', 'origin' or 'destination' (from `route_stats`), or
+                'airline' (from `daily_delay_cube`).
+            limit (int): The number of rows to return.
+            min_flights (int):
+                Leave out groups with fewer flights, whose percentages are
+                not meaningful.
+
+        Returns:
+            Sequence[Row]:
+                (DELAY_RANK, group columns, FLIGHTS, DELAYED_FLIGHTS,
+                PERCENT_DELAYED) rows, highest delay rate first. Groups with
+                the same rate share their rank.
+
+        Raises:
+            ValueError: If the group is invalid.
+        """
+        columns = self._delay_group(by)
+        if not columns:
+            raise ValueError("Delay rates need a group other than 'all'")
+        group = dict(group_select=self._group_select(columns, 's'),
+                     group_by=self._group_list(columns, 's') + " ")
+        if by == 'airline':
+            rates = QUERY_DELAY_CUBE_DELAY_RATES.format(
+                cube=self._delay_cube_source(), **group)
+        else:
+            rates = QUERY_ROUTE_STATS_DELAY_RATES.format(
+                route_stats=self._route_stats_source(), **group)
+        return self._execute_query(
+            QUERY_TOP_DELAY_RATES.format(rates=rates),
+            {'limit': limit, 'min_flights': min_flights,
+             'last_id': self._NO_FLIGHTS_ID},
+            name='QUERY_TOP_DELAY_RATES')
+
+    def get_flights_by_date_page(self, day, month, year,
+                                 page_size=DEFAULT_PAGE_SIZE,
+                                 cursor=None) -> tuple:
+        """
+        Retrieve one page of the delayed flights of a specific date.
+
+        Parameters:
+            day (int): The day of the flight.
+            month (int): The month of the flight.
+            year (int): The year of the flight.
+            page_size (int): The maximum number of flights of the page.
+            cursor (str):
+                The cursor returned with the previous page, or None for the
+                first page.
+
+        Returns:
+            tuple:
+                The rows of the page (most delayed first), and the cursor
+                of the next page or None if this is the last page.
+        """
+        params = {'day': day, 'month': month, 'year': year}
+        return self._fetch_page(QUERY_FLIGHT_BY_DATE_PAGE, params, page_size,
+                                cursor)
+
+    def get_delayed_flights_by_airline_page(self, airline: str,
+                                            page_size=DEFAULT_PAGE_SIZE,
+                                            cursor=None) -> tuple:
+        """
+        Retrieve one page of the delayed flights of a specific airline.
+
+        Parameters:
+            airline (str):
+                The name (or partial name) of the airline to search for.
+            page_size (int): The maximum number of flights of the page.
+            cursor (str):
+                The cursor returned with the previous page, or None for the
+                first page.
+
+        Returns:
+            tuple:
+                The rows of the page (most delayed first), and the cursor
+                of the next page or None if this is the last page.
+
+        Notes:
+            - Every matching airline is read through its own seek of
+              idx_flights_airline_delay, and the pages are merged, so a
+              page costs the same whether one or many airlines match.
+        """
+        airline_ids = list(dict.fromkeys(self.resolve_airlines(airline)))
+        if not airline_ids:
+            return [], None
+        _, params = self._bind_list('airline_id', airline_ids)
+        pages = " UNION ALL ".join(
+            QUERY_FLIGHT_BY_AIRLINE_ID_PAGE.format(airline_id=f":{name}")
+            for name in params)
+        return self._fetch_page(
+            QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE.format(pages=pages), params,
+            page_size, cursor, name='QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE')
+
+    def get_delayed_flights_by_airport_page(self, airport_input: str,
+                                            page_size=DEFAULT_PAGE_SIZE,
+                                            cursor=None) -> tuple:
+        """
+        Retrieve one page of the delayed flights departing from a specific
+        airport.
+
+        Parameters:
+            airport_input (str): The IATA code of the origin airport.
+            page_size (int): The maximum number of flights of the page.
+            cursor (str):
+                The cursor returned with the previous page, or None for the
+                first page.
+
+        Returns:
+            tuple:
+                The rows of the page (most delayed first), and the cursor
+                of the next page or None if this is the last page.
+        """
+        params = {'origin_airport': airport_input}
+        return self._fetch_page(QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE, params,
+                                page_size, cursor)
+
+    def get_airlines(self) -> Sequence[Row]:
+        """
+        Retrieve every airline.
+
+        Returns:
+            Sequence[Row]: (ID, AIRLINE) rows.
+        """
+        return self._execute_query(QUERY_AIRLINES, {})
+
+    def get_origin_airports(self) -> list:
+        """
+        Retrieve the IATA codes of every airport with departing flights.
+
+        Returns:
+            list of str: The IATA codes, busiest airport first.
+        """
+        return [row[0] for row in self._execute_query(QUERY_ORIGIN_AIRPORTS,
+                                                      {})]
+
+    def iter_flight_columns(self) -> Iterator[Row]:
+        """
+        Stream the columns of every flight needed for delay analytics.
+
+        Yields:
+            Row:
+                (ID, AIRLINE, ORIGIN_AIRPORT, DESTINATION_AIRPORT, YEAR, MONTH,
+                DAY, DEPARTURE_DELAY) rows.
+        """
+        return self._stream_query(QUERY_FLIGHT_COLUMNS, {})
 
     def __del__(self):
         """
-        Closes the connection to the databse when the object is about to be destroyed
+        Closes the connection to the databse when the object is about to be
+        destroyed without `close` having been called. Prefer `close` (or a
+        `with` block): when this runs is up to the garbage collector.
         """
-        self._engine.dispose()
+        if getattr(self, '_executor', None) is not None:
+            self._executor.shutdown(wait=False)
+        if getattr(self, '_engine_instance', None) is not None:
+            self._engine_instance.dispose()
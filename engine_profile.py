@@ -0,0 +1,159 @@
+"""
+Engine profiles for the FlightData class.
+
+Description:
+    An engine profile describes how the SQLAlchemy engine of FlightData is
+    created: the connection pool and the SQLite PRAGMAs applied to every new
+    connection through a "connect" event hook.
+
+Profiles:
+    DEFAULT_PROFILE:
+        Pooled connections with memory mapped I/O, a 64 MiB page cache and
+        temporary tables in memory. The journal mode of the file is left
+        as it is.
+
+    READ_ONLY_PROFILE:
+        Opens the database file as a read-only, immutable SQLite URI and sets
+        query_only, for a shared database file that is never written.
+        Summary tables and indexes cannot be created with this profile.
+
+    BULK_LOAD_PROFILE:
+        One connection with a 512 MiB page cache, so that index pages stay
+        in memory while many rows are inserted, and synchronous=NORMAL,
+        which in WAL mode syncs on checkpoints only. Used by ingest.py.
+
+Notes:
+    - In-memory databases (sqlite:// and sqlite:///:memory:) always use a
+      StaticPool, so every checkout sees the same database.
+    - A journal mode is stored in the database file and needs write
+      access; it is skipped for read-only profiles. No built-in profile
+      sets one, so that opening a database for lookups does not switch it
+      to WAL and leave -wal and -shm files next to it: WAL is enabled on
+      request with `python maintenance.py journal-mode wal`.
+"""
+
+
+class EngineProfile:
+    """
+    Pool settings and per-connection PRAGMAs of an SQLite engine.
+    """
+
+    def __init__(self, pool_size=5, max_overflow=10,
+                 mmap_size=256 * 1024 * 1024, cache_size=-64 * 1024,
+                 journal_mode=None, temp_store='MEMORY', query_only=False,
+                 read_only=False, immutable=False, synchronous=None):
+        """
+        Parameters:
+            pool_size (int): Connections kept open in the pool.
+            max_overflow (int): Extra connections opened under load.
+            mmap_size (int): PRAGMA mmap_size in bytes, or None.
+            cache_size (int): PRAGMA cache_size; negative values are KiB.
+            journal_mode (str): PRAGMA journal_mode, or None to keep it.
+            temp_store (str): PRAGMA temp_store, or None.
+            query_only (bool): Set PRAGMA query_only on every connection.
+            read_only (bool): Open the database file with mode=ro.
+            immutable (bool): Open the database file with immutable=1, which
+                              skips all file locking.
+            synchronous (str): PRAGMA synchronous, or None to keep it.
+        """
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.journal_mode = journal_mode
+        self.temp_store = temp_store
+        self.query_only = query_only
+        self.read_only = read_only
+        self.immutable = immutable
+        self.synchronous = synchronous
+
+    def pragmas(self) -> list:
+        """
+        Return the PRAGMA statements run on every new connection.
+
+        Returns:
+            list of str: The PRAGMA statements.
+        """
+        pragmas = []
+        if self.mmap_size is not None:
+            pragmas.append(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.cache_size is not None:
+            pragmas.append(f"PRAGMA cache_size = {int(self.cache_size)}")
+        if self.temp_store is not None:
+            pragmas.append(f"PRAGMA temp_store = {self.temp_store}")
+        if self.journal_mode is not None and not self.read_only:
+            pragmas.append(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous is not None and not self.read_only:
+            pragmas.append(f"PRAGMA synchronous = {self.synchronous}")
+        if self.query_only:
+            pragmas.append("PRAGMA query_only = ON")
+        return pragmas
+
+
+DEFAULT_PROFILE = EngineProfile()
+
+READ_ONLY_PROFILE = EngineProfile(query_only=True, read_only=True,
+                                  immutable=True)
+
+BULK_LOAD_PROFILE = EngineProfile(pool_size=1, max_overflow=0,
+                                  cache_size=-512 * 1024,
+                                  synchronous='NORMAL')
+
+
+def _is_memory_database(url) -> bool:
+    return url.database in (None, '', ':memory:')
+
+
+def _read_only_url(url, immutable):
+    """
+    Turn a file based SQLite URL into a read-only SQLite URI.
+    """
+    query = {'mode': 'ro', 'uri': 'true'}
+    if immutable:
+        query['immutable'] = '1'
+    return url.set(database=f"file:{url.database}").update_query_dict(query)
+
+
+def create_profiled_engine(db_uri, profile=None):
+    """
+    Create an SQLAlchemy engine configured by an engine profile.
+
+    Parameters:
+        db_uri (str): The SQLAlchemy URI of the database.
+        profile (EngineProfile):
+            The profile to apply, or None for SQLAlchemy's defaults.
+
+    Returns:
+        Engine: The new engine.
+    """
+    # Imported here so that importing the profiles does not load SQLAlchemy
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import QueuePool, StaticPool
+
+    if profile is None:
+        return create_engine(db_uri)
+
+    url = make_url(db_uri)
+    if _is_memory_database(url):
+        engine = create_engine(url, poolclass=StaticPool,
+                               connect_args={'check_same_thread': False})
+    else:
+        if profile.read_only or profile.immutable:
+            url = _read_only_url(url, profile.immutable)
+        engine = create_engine(url, poolclass=QueuePool,
+                               pool_size=profile.pool_size,
+                               max_overflow=profile.max_overflow)
+
+    pragmas = profile.pragmas()
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
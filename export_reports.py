@@ -0,0 +1,293 @@
+"""
+Parallel export of delayed-flight reports.
+
+Usage:
+    python export_reports.py airports [--out DIR] [--format csv|parquet]
+        [--jobs N] [--db URI]
+    python export_reports.py airlines [...]
+    python export_reports.py dates --start DD/MM/YYYY --end DD/MM/YYYY [...]
+
+Description:
+    Writes the delayed flights of every origin airport, every airline or
+    every day of a date range to one file per partition, e.g.
+    `reports/airport=ORD.csv`. The partitions are spread over a pool of
+    worker processes; every worker opens its own read-only connection to
+    the database (see READ_ONLY_PROFILE in engine_profile.py) and streams
+    its rows straight into the file, so throughput grows with the number of
+    cores while memory stays flat. A progress line is printed for every
+    finished partition.
+
+Notes:
+    - Parquet output needs pyarrow.
+    - Files are written under a temporary name and renamed when complete,
+      so an interrupted export never leaves a truncated partition.
+    - The database must not be written during the export (the read-only
+      profile opens it as immutable).
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import data
+from engine_profile import READ_ONLY_PROFILE
+
+SQLITE_URI = 'sqlite:///data/flights.sqlite3'
+
+COLUMNS = ('ID', 'ORIGIN_AIRPORT', 'DESTINATION_AIRPORT', 'AIRLINE', 'DELAY')
+
+FORMATS = ('csv', 'parquet')
+
+PARQUET_BATCH_SIZE = 10_000
+
+# The FlightData object of a worker process (see _init_worker)
+_data_manager = None
+
+
+def _init_worker(db_uri) -> None:
+    """
+    Open the read-only FlightData object of a worker process.
+    """
+    global _data_manager
+    _data_manager = data.FlightData(db_uri, profile=READ_ONLY_PROFILE)
+
+
+def _partition_rows(kind, key):
+    """
+    Stream the delayed flights of a partition from the worker's database.
+
+    Parameters:
+        kind (str): 'airport', 'airline' or 'date'.
+        key: The IATA code, the airline ID or a (day, month, year) tuple.
+    """
+    if kind == 'airport':
+        return _data_manager.iter_delayed_flights_by_airport(
+            key, raise_errors=True)
+    if kind == 'airline':
+        return _data_manager.iter_delayed_flights_by_airline_ids(
+            [key], raise_errors=True)
+    return _data_manager.iter_flights_by_date(*key, raise_errors=True)
+
+
+def write_csv(rows, path) -> int:
+    """
+    Write rows to a CSV file with a header line.
+
+    Returns:
+        int: The number of rows written.
+    """
+    count = 0
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_parquet(rows, path) -> int:
+    """
+    Write rows to a Parquet file, in row groups of PARQUET_BATCH_SIZE rows.
+
+    Returns:
+        int: The number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([('ID', pa.int64()),
+                        ('ORIGIN_AIRPORT', pa.string()),
+                        ('DESTINATION_AIRPORT', pa.string()),
+                        ('AIRLINE', pa.string()),
+                        ('DELAY', pa.float64())])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(tuple(row))
+            if len(batch) == PARQUET_BATCH_SIZE:
+                writer.write_table(pa.Table.from_arrays(
+                    [list(column) for column in zip(*batch)], schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_arrays(
+                [list(column) for column in zip(*batch)], schema=schema))
+            count += len(batch)
+    return count
+
+
+WRITERS = {'csv': write_csv, 'parquet': write_parquet}
+
+
+def export_partition(kind, key, path, file_format) -> tuple:
+    """
+    Export the delayed flights of one partition. Runs in a worker process.
+
+    The rows are written to a '.partial' file that is renamed when the
+    partition is complete. If the query or the write fails, the partial
+    file is removed and the error is raised, so the partition counts as
+    failed.
+
+    Parameters:
+        kind (str): 'airport', 'airline' or 'date'.
+        key: The IATA code, the airline ID or a (day, month, year) tuple.
+        path (str): The file to write.
+        file_format (str): 'csv' or 'parquet'.
+
+    Returns:
+        tuple: The path and the number of rows written.
+    """
+    partial_path = path + '.partial'
+    try:
+        rows = WRITERS[file_format](_partition_rows(kind, key), partial_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, path)
+    return path, rows
+
+
+def plan_partitions(data_manager, by, start=None, end=None) -> list:
+    """
+    List the partitions of an export.
+
+    Parameters:
+        data_manager (FlightData): The data manager of the main process.
+        by (str): 'airports', 'airlines' or 'dates'.
+        start (datetime): The first day of a 'dates' export.
+        end (datetime): The last day of a 'dates' export.
+
+    Returns:
+        list of tuple:
+            (kind, key, label) per partition. Airports are listed busiest
+            first, so the largest partitions do not end up last.
+    """
+    if by == 'airports':
+        return [('airport', code, code)
+                for code in data_manager.get_origin_airports()]
+    if by == 'airlines':
+        return [('airline', airline_id, str(airline_id))
+                for airline_id, _ in data_manager.get_airlines()]
+    days = (end - start).days + 1
+    return [('date', (day.day, day.month, day.year), day.strftime('%Y-%m-%d'))
+            for day in (start + timedelta(days=i) for i in range(days))]
+
+
+def export_reports(db_uri, by, out_dir, file_format='csv', jobs=None,
+                   start=None, end=None) -> dict:
+    """
+    Export delayed-flight reports in parallel and print the progress.
+
+    Parameters:
+        db_uri (str): The SQLAlchemy URI of the database.
+        by (str): 'airports', 'airlines' or 'dates'.
+        out_dir (str): The directory the files are written to.
+        file_format (str): 'csv' or 'parquet'.
+        jobs (int): The number of worker processes, defaults to the number
+                    of CPUs.
+        start (datetime): The first day of a 'dates' export.
+        end (datetime): The last day of a 'dates' export.
+
+    Returns:
+        dict: The number of partitions, failed partitions and rows, and the
+              elapsed seconds.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    with data.FlightData(db_uri, profile=READ_ONLY_PROFILE) as data_manager:
+        partitions = plan_partitions(data_manager, by, start, end)
+
+    started = time.perf_counter()
+    total_rows = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(db_uri,)) as executor:
+        futures = {}
+        for kind, key, label in partitions:
+            path = os.path.join(out_dir, f"{kind}={label}.{file_format}")
+            futures[executor.submit(export_partition, kind, key, path,
+                                    file_format)] = label
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            elapsed = time.perf_counter() - started
+            try:
+                path, rows = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(futures)}] {futures[future]} failed: {e}")
+                continue
+            total_rows += rows
+            print(f"[{done}/{len(futures)}] {path}: {rows} rows "
+                  f"({elapsed:.1f} s, {total_rows / elapsed:,.0f} rows/s)")
+
+    return {'partitions': len(partitions), 'failed': failed,
+            'rows': total_rows, 'seconds': time.perf_counter() - started}
+
+
+def parse_date(value) -> datetime:
+    # argparse type of the --start and --end options
+    try:
+        return datetime.strptime(value, '%d/%m/%Y')
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {value!r}, expected DD/MM/YYYY")
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the export command.
+
+    Parameter:
+        argv (list of str): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument('--db', default=SQLITE_URI,
+                         help="SQLAlchemy URI of the flights database.")
+    options.add_argument('--out', default='reports',
+                         help="Directory the reports are written to.")
+    options.add_argument('--format', choices=FORMATS, default='csv',
+                         help="File format of the reports.")
+    options.add_argument('--jobs', type=int,
+                         help="Number of worker processes (default: CPUs).")
+
+    parser = argparse.ArgumentParser(
+        description="Export delayed-flight reports in parallel.")
+    commands = parser.add_subparsers(dest='by', required=True)
+    commands.add_parser('airports', parents=[options],
+                        help="One report per origin airport.")
+    commands.add_parser('airlines', parents=[options],
+                        help="One report per airline.")
+    dates = commands.add_parser('dates', parents=[options],
+                                help="One report per day of a date range.")
+    dates.add_argument('--start', type=parse_date, required=True,
+                       help="First day, DD/MM/YYYY.")
+    dates.add_argument('--end', type=parse_date, required=True,
+                       help="Last day, DD/MM/YYYY.")
+
+    args = parser.parse_args(argv)
+    if args.by == 'dates' and args.end < args.start:
+        parser.error("--end is before --start")
+    return args
+
+
+def main(argv=None):
+    # Export entry point.
+    args = parse_arguments(argv)
+    summary = export_reports(args.db, args.by, args.out, args.format,
+                             args.jobs, getattr(args, 'start', None),
+                             getattr(args, 'end', None))
+    print(f"Exported {summary['rows']} rows in {summary['partitions']} "
+          f"partitions ({summary['failed']} failed) in "
+          f"{summary['seconds']:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,66 @@
+import hashlib
+import json
+import os
+import tempfile
+from string import Template
+
 import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster
+
+MAP_CENTER = [39.8283, -98.5795]  # Centered on the USA
+MAP_ZOOM = 4
+
+# Directory of the maps rendered by cached_routes_map
+MAP_CACHE_DIR = "maps"
+MAP_FORMATS = ('html', 'geojson')
+# Part of every map key: bump it when the rendered output changes, so that
+# maps cached by an older version are not reused
+RENDER_VERSION = 1
+
+# Shared viewer of the GeoJSON maps, written once per map directory. It
+# loads the GeoJSON file named after the # of its URL, e.g.
+# viewer.html#0123abcd.geojson (served over HTTP, as browsers do not let
+# file:// pages fetch files).
+VIEWER_FILE = "viewer.html"
+VIEWER_HTML = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Flight delays</title>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css">
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<style>html, body, #map { height: 100%; margin: 0; }</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map('map').setView($center, $zoom);
+L.tileLayer('https://tile.openstreetmap.org/{z}/{x}/{y}.png', {
+    maxZoom: 19,
+    attribution: '&copy; OpenStreetMap contributors'
+}).addTo(map);
+fetch(decodeURIComponent(location.hash.slice(1)))
+    .then(function (response) { return response.json(); })
+    .then(function (data) {
+        L.geoJSON(data, {
+            style: function (feature) {
+                return {color: 'green', weight: feature.properties.weight};
+            },
+            pointToLayer: function (feature, latlng) {
+                return L.circleMarker(latlng, {radius: 3, color: 'black'});
+            },
+            onEachFeature: function (feature, layer) {
+                var p = feature.properties;
+                layer.bindTooltip(p.airport || p.route + ' (' + p.delayed
+                                  + '% delayed)');
+            }
+        }).addTo(map);
+    });
+</script>
+</body>
+</html>
+""").substitute(center=json.dumps(MAP_CENTER), zoom=MAP_ZOOM)
 
 
 def process_data_and_map(origin,
@@ -28,8 +90,7 @@ def process_data_and_map(origin,
 
     # Create the base map
 
-    m = folium.Map(location=[39.8283, -98.5795],
-                   zoom_start=4)  # Centered on the USA
+    m = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
 
     # Add routes to the map
     folium.PolyLine(
@@ -47,3 +108,265 @@ def process_data_and_map(origin,
 
     # Save and display the map
     m.save("flight_delays_map.html")
+
+
+def process_routes_and_map(routes,
+                           output_file="flight_delays_map.html",
+                           cluster_markers=False):
+    """
+    Creates a Folium map that visualizes the delay percentage of many routes.
+
+    All routes are drawn in one pass: coordinates and line weights are
+    computed as NumPy arrays and the routes are added as a single GeoJSON
+    layer, with the airports in a second layer, instead of one map object
+    per route. This keeps generation time and HTML size low for thousands
+    of routes.
+
+    Parameters:
+        routes (list of tuple):
+            (origin, destination, percent_delayed, origin_lat, origin_long,
+            dest_lat, dest_long) per route, e.g. the rows returned by
+            `FlightData.get_routes_from_airport`.
+        output_file (str): Path of the HTML file to write.
+        cluster_markers (bool): Cluster the airport markers.
+
+    Output:
+        - Saves the map as an HTML file named `output_file`.
+    """
+    _routes_map(_route_arrays(routes), cluster_markers).save(output_file)
+
+
+def cached_routes_map(routes, cache_dir=MAP_CACHE_DIR, output_format='html',
+                      cluster_markers=False) -> str:
+    """
+    Render a map of routes into a content-addressed file of `cache_dir`,
+    or reuse the file if the same map was rendered before.
+
+    The file is named after a hash of the drawn data (airports, rounded
+    coordinates and delay percentages) and the render settings, so a
+    repeated request is answered without rendering, and concurrent
+    requests never overwrite each other's maps: a file is written under a
+    temporary name and renamed when complete.
+
+    With output_format 'geojson', only the routes and airports are written,
+    as a compact GeoJSON FeatureCollection (see `routes_geojson`), and
+    VIEWER_FILE is written once to `cache_dir` to display any of them,
+    instead of a full HTML page per map. Marker clustering is not
+    available there.
+
+    Parameters:
+        routes (list of tuple): The routes, as for `process_routes_and_map`.
+        cache_dir (str): The directory of the maps, created if needed.
+        output_format (str): 'html' or 'geojson'.
+        cluster_markers (bool): Cluster the airport markers (HTML only).
+
+    Returns:
+        str: The path of the map file.
+
+    Raises:
+        ValueError: If the output format is unknown.
+    """
+    if output_format not in MAP_FORMATS:
+        raise ValueError(f"Unknown map format {output_format!r}, expected "
+                         f"one of {', '.join(MAP_FORMATS)}")
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = _route_arrays(routes)
+    if output_format == 'geojson':
+        key = _map_key(arrays, output_format)
+    else:
+        key = _map_key(arrays, output_format, folium.__version__,
+                       cluster_markers)
+    path = os.path.join(cache_dir, f"{key}.{output_format}")
+    if os.path.exists(path):
+        return path
+
+    if output_format == 'geojson':
+        viewer = os.path.join(cache_dir, VIEWER_FILE)
+        if not os.path.exists(viewer):
+            _write_atomic(viewer, lambda temp: _write_text(temp, VIEWER_HTML))
+        body = json.dumps(_features(arrays), separators=(',', ':'))
+        _write_atomic(path, lambda temp: _write_text(temp, body))
+    else:
+        _write_atomic(path, _routes_map(arrays, cluster_markers).save)
+    return path
+
+
+def viewer_url(path) -> str:
+    """
+    Return the URL of the shared viewer displaying a GeoJSON map, relative
+    to the map directory.
+    """
+    return f"{VIEWER_FILE}#{os.path.basename(path)}"
+
+
+def routes_geojson(routes) -> dict:
+    """
+    Return the routes and their airports as a GeoJSON FeatureCollection:
+    one LineString per route with its `route`, `delayed` (percent) and
+    line `weight` properties, and one Point per airport with its `airport`
+    code.
+
+    Parameter:
+        routes (list of tuple): The routes, as for `process_routes_and_map`.
+    """
+    return _features(_route_arrays(routes))
+
+
+def _route_arrays(routes):
+    """
+    Return the airport codes, coordinates, delay percentages and line
+    weights of routes as NumPy arrays, rounded as they are drawn, or None if
+    there are no routes.
+    """
+    if not len(routes):
+        return None
+    codes = np.array([(route[0], route[1]) for route in routes],
+                     dtype=object)
+    percent_delayed = np.array([route[2] for route in routes], dtype=float)
+    coords = np.array([route[3:7] for route in routes], dtype=float)
+    coords = np.round(coords, 4)
+    # Same scale as process_data_and_map, in steps of 0.5 so that
+    # routes share a small number of distinct line styles
+    weights = np.maximum(np.round(percent_delayed / 5 * 2) / 2, 0.5)
+    percent_delayed = np.round(percent_delayed, 1)
+    return codes, coords, percent_delayed, weights
+
+
+def _map_key(arrays, *settings) -> str:
+    """
+    Hash the drawn data of a map and its render settings.
+    """
+    content = [RENDER_VERSION, *settings]
+    if arrays is not None:
+        content.extend(array.tolist() for array in arrays)
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:32]
+
+
+def _write_text(path, text) -> None:
+    with open(path, 'w', encoding='utf-8') as text_file:
+        text_file.write(text)
+
+
+def _write_atomic(path, write) -> None:
+    """
+    Write a file with `write(temporary_path)` and rename it to `path` once
+    it is complete.
+    """
+    handle, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    suffix='.tmp')
+    os.close(handle)
+    try:
+        write(temp)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def _features(arrays) -> dict:
+    """
+    The GeoJSON FeatureCollection of routes and airports (see
+    `routes_geojson`).
+    """
+    if arrays is None:
+        return {'type': 'FeatureCollection', 'features': []}
+    codes, coords, percent_delayed, weights = arrays
+    routes = _route_features(codes, coords, percent_delayed, weights)
+    airports = _airport_features(*_airports(codes, coords))
+    return {'type': 'FeatureCollection',
+            'features': routes['features'] + airports['features']}
+
+
+def _routes_map(arrays, cluster_markers) -> folium.Map:
+    """
+    Build the folium map of routes.
+    """
+    m = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+
+    if arrays is not None:
+        codes, coords, percent_delayed, weights = arrays
+        folium.GeoJson(
+            _route_features(codes, coords, percent_delayed, weights),
+            name="Routes",
+            style_function=lambda feature: {
+                'color': 'green',
+                'weight': feature['properties']['weight']},
+            tooltip=folium.GeoJsonTooltip(fields=['route', 'delayed'],
+                                          aliases=['Route', '% delayed'])
+        ).add_to(m)
+
+        _add_airport_markers(m, codes, coords, cluster_markers)
+
+    return m
+
+
+def _route_features(codes, coords, percent_delayed, weights) -> dict:
+    """
+    Build a GeoJSON FeatureCollection with one LineString per route.
+    GeoJSON positions are (longitude, latitude).
+    """
+    lines = coords[:, [1, 0, 3, 2]].reshape(-1, 2, 2).tolist()
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature',
+             'geometry': {'type': 'LineString', 'coordinates': line},
+             'properties': {'route': f"{origin} <-> {destination}",
+                            'delayed': delayed,
+                            'weight': weight}}
+            for line, (origin, destination), delayed, weight
+            in zip(lines, codes, percent_delayed.tolist(), weights.tolist())
+        ]
+    }
+
+
+def _airports(codes, coords) -> tuple:
+    """
+    Return the distinct airports of the routes and their (lat, long)
+    positions.
+    """
+    airports = np.concatenate([codes[:, 0], codes[:, 1]])
+    positions = np.concatenate([coords[:, 0:2], coords[:, 2:4]])
+    airports, first = np.unique(airports.astype(str), return_index=True)
+    return airports, positions[first]
+
+
+def _airport_features(airports, positions) -> dict:
+    """
+    Build a GeoJSON FeatureCollection with one Point per airport.
+    """
+    return {'type': 'FeatureCollection',
+            'features': [
+                {'type': 'Feature',
+                 'geometry': {'type': 'Point', 'coordinates': [long, lat]},
+                 'properties': {'airport': code}}
+                for (lat, long), code in zip(positions.tolist(),
+                                             airports.tolist())]}
+
+
+def _add_airport_markers(m, codes, coords, cluster_markers) -> None:
+    """
+    Add one marker per distinct airport of the routes to the map.
+    """
+    airports, positions = _airports(codes, coords)
+
+    if cluster_markers:
+        FastMarkerCluster(
+            data=[[lat, long, code] for (lat, long), code
+                  in zip(positions.tolist(), airports.tolist())],
+            name="Airports",
+            callback="function (row) {"
+                     "  return L.marker(new L.LatLng(row[0], row[1]))"
+                     "    .bindTooltip(row[2]);"
+                     "}"
+        ).add_to(m)
+        return
+
+    folium.GeoJson(
+        _airport_features(airports, positions),
+        name="Airports",
+        marker=folium.CircleMarker(radius=3, color='black', fill=True),
+        tooltip=folium.GeoJsonTooltip(fields=['airport'], labels=False)
+    ).add_to(m)
@@ -0,0 +1,330 @@
+"""
+Bulk ingest of flight CSV files into the flights database.
+
+Usage:
+    python ingest.py FILE [FILE ...] [--db URI] [--defer-indexes]
+        [--chunk-rows N] [--commit-rows N] [--no-refresh]
+        [--delay-threshold MINUTES]
+
+Description:
+    Streams every CSV file (optionally gzip compressed, or `-` for stdin)
+    into the `flights` table. The rows are read and inserted in chunks with
+    `executemany`, and a transaction is committed every --commit-rows rows,
+    so memory use stays flat however large the files are. The database is
+    opened with BULK_LOAD_PROFILE (see engine_profile.py).
+
+    The header line of a file names its columns; they are matched to the
+    `flights` columns without regard to case, and columns the table does
+    not have are ignored. If the file has an ID column, rows whose ID is
+    already in `flights` are skipped, so a file can be ingested again
+    without adding duplicates. Without it, new IDs are assigned.
+
+    Rows missing one of the REQUIRED_COLUMNS are rejected and reported by
+    line number. Progress lines report the rows read, inserted and skipped
+    and the rows per second.
+
+    Afterwards the `daily_delay_cube` and `route_stats` summary tables are
+    brought up to date (unless --no-refresh): flights appended with higher
+    IDs are added to the cube incrementally.
+
+Options:
+    --defer-indexes:
+        Drop the indexes of `flights` before loading and create them again
+        once at the end. Faster when the files add a large share of the
+        table (e.g. an initial load); for small daily files into a large
+        table, keeping the indexes is faster.
+"""
+import argparse
+import csv
+import gzip
+import io
+import sys
+import time
+
+import data
+from engine_profile import BULK_LOAD_PROFILE
+from util_sql_query import DEFAULT_DELAY_THRESHOLD
+
+SQLITE_URI = 'sqlite:///data/flights.sqlite3'
+
+REQUIRED_COLUMNS = ('YEAR', 'MONTH', 'DAY', 'AIRLINE', 'ORIGIN_AIRPORT',
+                    'DESTINATION_AIRPORT')
+
+# Seconds between two progress lines
+PROGRESS_INTERVAL = 2.0
+
+# Rejected rows reported by line number, per file
+MAX_REPORTED_REJECTS = 10
+
+
+def open_csv(path):
+    """
+    Open a CSV file for reading as text: gzip compressed if the name ends
+    with .gz, stdin for `-`.
+    """
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig',
+                                newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def match_columns(header, table_columns) -> tuple:
+    """
+    Match the header of a CSV file to the columns of the `flights` table.
+
+    Parameters:
+        header (list of str): The column names of the file.
+        table_columns (list of str): The column names of `flights`.
+
+    Returns:
+        tuple:
+            The matched table columns, the positions of their values in a
+            CSV row and the names of the ignored file columns. The first
+            occurrence of a repeated column is used.
+    """
+    by_name = {column.upper(): column for column in table_columns}
+    columns, positions, ignored = [], [], []
+    for position, name in enumerate(header):
+        column = by_name.get(name.strip().upper())
+        if column is None or column in columns:
+            ignored.append(name)
+            continue
+        columns.append(column)
+        positions.append(position)
+    return columns, positions, ignored
+
+
+def iter_flight_rows(reader, positions, required, rejects):
+    """
+    Yield the values of every valid row of a CSV reader.
+
+    Empty values become NULL; SQLite converts the others to the types of
+    the columns.
+
+    Parameters:
+        reader (iterator of list): The CSV rows after the header.
+        positions (list of int): The positions of the inserted values.
+        required (list of int): The positions that must not be empty.
+        rejects (dict):
+            Counts the rejected rows under 'count' and collects the line
+            numbers of the first MAX_REPORTED_REJECTS under 'lines'.
+
+    Yields:
+        tuple: The values of a row, in the order of `positions`.
+    """
+    width = max(positions) + 1
+    for row in reader:
+        if len(row) < width or not all(row[i] for i in required):
+            if row:
+                rejects['count'] += 1
+                if len(rejects['lines']) < MAX_REPORTED_REJECTS:
+                    rejects['lines'].append(reader.line_num)
+            continue
+        yield tuple([row[i] or None for i in positions])
+
+
+class Progress:
+    """
+    Prints the rows read, inserted and skipped, and the rows per second,
+    at most every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._reported = self.started
+        self._reported_rows = None
+
+    def __call__(self, read, inserted, final=False) -> None:
+        now = time.perf_counter()
+        if read == self._reported_rows or (
+                not final and now - self._reported < PROGRESS_INTERVAL):
+            return
+        self._reported = now
+        self._reported_rows = read
+        rate = read / max(now - self.started, 1e-9)
+        print(f"   {read:,} rows read, {inserted:,} inserted, "
+              f"{read - inserted:,} skipped ({rate:,.0f} rows/s)")
+
+
+def ingest_file(data_manager, path, table_columns, chunk_rows,
+                commit_rows) -> tuple:
+    """
+    Insert the flights of one CSV file.
+
+    Parameters:
+        data_manager (FlightData): The data manager of the database.
+        path (str): The CSV file, or `-` for stdin.
+        table_columns (list of str): The column names of `flights`.
+        chunk_rows (int): Rows per executemany call.
+        commit_rows (int): Rows per transaction.
+
+    Returns:
+        tuple:
+            The number of rows read, inserted and rejected, or None if the
+            file could not be ingested.
+    """
+    print(f"{path}:")
+    try:
+        csv_file = open_csv(path)
+    except OSError as e:
+        print(f"   Cannot open file: {e}")
+        return None
+
+    with csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, None)
+        if header is None:
+            print("   Empty file.")
+            return 0, 0, 0
+        columns, positions, ignored = match_columns(header, table_columns)
+        missing = [column for column in REQUIRED_COLUMNS
+                   if column not in columns]
+        if missing:
+            print(f"   Missing columns: {', '.join(missing)}")
+            return None
+        if ignored:
+            print(f"   Ignored columns: {', '.join(ignored)}")
+        if 'ID' not in columns:
+            print("   No ID column: new IDs are assigned, rows are not "
+                  "deduplicated.")
+
+        required = [positions[columns.index(column)]
+                    for column in REQUIRED_COLUMNS]
+        rejects = {'count': 0, 'lines': []}
+        progress = Progress()
+        counts = data_manager.insert_flights(
+            columns, iter_flight_rows(reader, positions, required, rejects),
+            chunk_rows=chunk_rows, commit_rows=commit_rows,
+            progress=progress)
+
+    if counts is None:
+        return None
+    progress(*counts, final=True)
+    if rejects['count']:
+        lines = ", ".join(str(line) for line in rejects['lines'])
+        more = ", ..." if rejects['count'] > len(rejects['lines']) else ""
+        print(f"   {rejects['count']:,} rows rejected (lines {lines}{more})")
+    return counts[0], counts[1], rejects['count']
+
+
+def ingest(data_manager, paths, chunk_rows=data.FlightData.INSERT_CHUNK_ROWS,
+           commit_rows=data.FlightData.INSERT_COMMIT_ROWS,
+           defer_indexes=False, refresh=True) -> dict:
+    """
+    Insert the flights of CSV files and update the summary tables.
+
+    Parameters:
+        data_manager (FlightData): The data manager of the database.
+        paths (list of str): The CSV files.
+        chunk_rows (int): Rows per executemany call.
+        commit_rows (int): Rows per transaction.
+        defer_indexes (bool):
+            Drop the indexes of `flights` during the load and create them
+            once at the end.
+        refresh (bool): Update the summary tables afterwards.
+
+    Returns:
+        dict: The number of rows read, inserted and rejected, the number of
+              failed files and the elapsed seconds.
+    """
+    summary = {'read': 0, 'inserted': 0, 'rejected': 0, 'failed': 0}
+    table_columns = data_manager.get_flights_table_columns()
+    if not table_columns:
+        print("The database has no flights table.")
+        summary['failed'] = len(paths)
+        summary['seconds'] = 0.0
+        return summary
+
+    started = time.perf_counter()
+    indexes = data_manager.drop_flights_indexes() if defer_indexes else []
+    try:
+        for path in paths:
+            counts = ingest_file(data_manager, path, table_columns,
+                                 chunk_rows, commit_rows)
+            if counts is None:
+                summary['failed'] += 1
+                continue
+            summary['read'] += counts[0]
+            summary['inserted'] += counts[1]
+            summary['rejected'] += counts[2]
+    finally:
+        if indexes:
+            print(f"Creating indexes: {', '.join(name for name, _ in indexes)}")
+            index_started = time.perf_counter()
+            if data_manager.create_flights_indexes(indexes):
+                print(f"   done in {time.perf_counter() - index_started:.1f} s")
+            else:
+                print("   Could not create the indexes, run "
+                      "`python maintenance.py indexes`.")
+
+    if refresh and summary['inserted']:
+        print("Updating summary tables")
+        if not data_manager.refresh_delay_cube():
+            print("   Could not update daily_delay_cube.")
+        if not data_manager.refresh_route_stats():
+            print("   Could not rebuild route_stats.")
+
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the ingest command.
+
+    Parameter:
+        argv (list of str): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load flight CSV files into the flights database.")
+    parser.add_argument('files', nargs='+',
+                        help="CSV files (.csv or .csv.gz), `-` for stdin.")
+    parser.add_argument('--db', default=SQLITE_URI,
+                        help="SQLAlchemy URI of the flights database.")
+    parser.add_argument('--chunk-rows', type=int,
+                        default=data.FlightData.INSERT_CHUNK_ROWS,
+                        help="Rows per executemany call.")
+    parser.add_argument('--commit-rows', type=int,
+                        default=data.FlightData.INSERT_COMMIT_ROWS,
+                        help="Rows per transaction.")
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help="Drop the flights indexes during the load and "
+                             "create them once at the end.")
+    parser.add_argument('--no-refresh', dest='refresh',
+                        action='store_false',
+                        help="Do not update the summary tables.")
+    parser.add_argument('--delay-threshold', type=int,
+                        default=DEFAULT_DELAY_THRESHOLD,
+                        help="Delay threshold of the updated summary "
+                             "tables, in minutes.")
+    args = parser.parse_args(argv)
+    if args.chunk_rows < 1 or args.commit_rows < 1:
+        parser.error("--chunk-rows and --commit-rows must be positive")
+    return args
+
+
+def main(argv=None):
+    # Ingest entry point.
+    args = parse_arguments(argv)
+    with data.FlightData(args.db, profile=BULK_LOAD_PROFILE,
+                         delay_threshold=args.delay_threshold) as data_manager:
+        summary = ingest(data_manager, args.files, args.chunk_rows,
+                         args.commit_rows, args.defer_indexes, args.refresh)
+    seconds = summary['seconds']
+    print(f"Read {summary['read']:,} rows in {seconds:.1f} s "
+          f"({summary['read'] / max(seconds, 1e-9):,.0f} rows/s): "
+          f"{summary['inserted']:,} inserted, "
+          f"{summary['read'] - summary['inserted']:,} skipped, "
+          f"{summary['rejected']:,} rejected, "
+          f"{summary['failed']} files failed.")
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
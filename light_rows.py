@@ -0,0 +1,84 @@
+"""
+Lightweight result rows for the FlightData fast path.
+
+Description:
+    With `FlightData(light_rows=True)`, queries are run on the DBAPI cursor
+    of a pooled connection and their plain tuples are wrapped in LightRow
+    objects, skipping the result processing SQLAlchemy does for every
+    `Row`. LightRow offers what the rest of the code uses of a `Row`:
+        - tuple access: row[0], unpacking, len(row), comparison
+        - attribute access by column name: row.ORIGIN_AIRPORT
+        - `_fields` and `_mapping`
+
+    If a column name appears more than once (e.g. AIRLINE in the flight
+    lookups), the last column wins for attribute and `_mapping` access,
+    like with SQLAlchemy rows.
+
+Notes:
+    - One LightRow subclass is created per distinct list of columns and
+      reused; every row is a tuple with no per-instance dict.
+"""
+from functools import lru_cache
+from operator import itemgetter
+
+
+class LightRow(tuple):
+    """
+    A result row: a tuple with named columns.
+    """
+    __slots__ = ()
+    _fields = ()
+
+    @property
+    def _mapping(self) -> dict:
+        return dict(zip(self._fields, self))
+
+    def _asdict(self) -> dict:
+        return self._mapping
+
+    def __reduce__(self):
+        return _make_row, (self._fields, tuple(self))
+
+    def __repr__(self) -> str:
+        return tuple.__repr__(self)
+
+
+@lru_cache(maxsize=256)
+def light_row_type(columns: tuple) -> type:
+    """
+    Return the LightRow subclass of a list of column names.
+
+    Parameter:
+        columns (tuple of str): The column names, in result order.
+
+    Returns:
+        type: A LightRow subclass with one property per column name.
+    """
+    attributes = {'__slots__': (), '_fields': columns}
+    for i, column in enumerate(columns):
+        if column.isidentifier() and not column.startswith('_'):
+            attributes[column] = property(itemgetter(i))
+    return type('LightRow', (LightRow,), attributes)
+
+
+def _make_row(columns, values) -> LightRow:
+    # Unpickles a LightRow
+    return light_row_type(columns)(values)
+
+
+def make_light_rows(description, values) -> list:
+    """
+    Wrap the tuples fetched from a DBAPI cursor in LightRow objects.
+
+    Parameters:
+        description (sequence): The `description` of the cursor, or None
+                                for statements that return no rows.
+        values (list of tuple): The fetched rows.
+
+    Returns:
+        list of LightRow: The rows.
+    """
+    if description is None:
+        return []
+    row_type = light_row_type(tuple(column[0] for column in description))
+    return list(map(row_type, values))
@@ -1,11 +1,23 @@
+import argparse
+import os
+import shlex
+import shutil
+import sys
+
 import data
 from datetime import datetime
-import sqlalchemy
 
-from generate_visual_data_map import process_data_and_map
+from engine_profile import DEFAULT_PROFILE
+from output_writers import WRITERS
+from query_cache import QueryCache
+from util_sql_query import DEFAULT_DELAY_THRESHOLD, DELAY_GROUPS
+
+# generate_visual_data_map (and with it folium) is imported by the map
+# functions when a map is drawn, to keep startup fast
 
 SQLITE_URI = 'sqlite:///data/flights.sqlite3'
 IATA_LENGTH = 3
+ROUTE_MAP_MIN_FLIGHTS = 10
 
 
 def generate_percentage_of_delayed_flights(data_manager) -> None:
@@ -31,27 +43,83 @@ def generate_percentage_of_delayed_flights(data_manager) -> None:
                 and len(airport_destination_input) == IATA_LENGTH):
             valid = True
 
-    results_percent_delayed = (
-        data_manager.generate_percentage_of_delayed_flights
-        (airport_origin_input, airport_destination_input))
-
-    results_percent_delayed = (results_percent_delayed[0][2] +
-                               results_percent_delayed[1][2]) / 2
-
-    results_lat_long = (data_manager.get_airport_lat_long
-                        (airport_origin_input, airport_destination_input))
-
-    process_data_and_map(airport_origin_input,
-                         airport_destination_input,
-                         results_lat_long[0][1],
-                         results_lat_long[0][2],
-                         results_lat_long[1][1],
-                         results_lat_long[1][2],
-                         results_percent_delayed
-                         )
+    airport_origin_input = airport_origin_input.upper()
+    airport_destination_input = airport_destination_input.upper()
+
+    # The percentages and the coordinates are independent lookups: run
+    # them concurrently. The percentages have one row per direction of the
+    # route that has flights; the coordinates are keyed by IATA code, as
+    # the order of the rows says nothing about which airport is the origin
+    rows, coords = data_manager.fan_out(
+        lambda: data_manager.generate_percentage_of_delayed_flights(
+            airport_origin_input, airport_destination_input),
+        lambda: data_manager.get_airport_coords([airport_origin_input,
+                                                 airport_destination_input]))
+    percentages = [row[2] for row in rows]
+    if not percentages:
+        print("No flights found on this route.")
+        return
+    results_percent_delayed = sum(percentages) / len(percentages)
+
+    origin = coords.get(airport_origin_input)
+    destination = coords.get(airport_destination_input)
+    if origin is None or destination is None:
+        print("Unknown airport, no map generated.")
+        return
+
+    path = draw_routes_map([(airport_origin_input, airport_destination_input,
+                             results_percent_delayed, *origin[1:],
+                             *destination[1:])])
     print(
         f"Origin: {airport_origin_input} <-> Destination: "
         f"{airport_destination_input} ({results_percent_delayed}% delayed)")
+    print(f"Map: {path}")
+
+
+def generate_routes_map_by_airport(data_manager) -> None:
+    """
+    Prompts the user to input an origin airport IATA code and visualizes the
+    percentage of delayed flights of every route departing from it on a map.
+
+    Parameter:
+        data_manager: An instance of the FlightData class that provides access
+                      to flight-related queries.
+    """
+    valid = False
+    while not valid:
+        airport_input = input("Enter origin airport IATA code: ")
+        if airport_input.isalpha() and len(airport_input) == IATA_LENGTH:
+            valid = True
+
+    routes = data_manager.get_routes_from_airport(airport_input.upper())
+    path = draw_routes_map(routes)
+    print(f"Mapped {len(routes)} routes from {airport_input.upper()}: "
+          f"{path}")
+
+
+def generate_most_delayed_routes_map(data_manager) -> None:
+    """
+    Prompts the user for a number N and visualizes the N routes with the
+    highest percentage of delayed flights on a map. Routes with fewer than
+    ROUTE_MAP_MIN_FLIGHTS flights are ignored.
+
+    Parameter:
+        data_manager: An instance of the FlightData class that provides access
+                      to flight-related queries.
+    """
+    valid = False
+    while not valid:
+        try:
+            limit = int(input("Enter number of routes: "))
+        except ValueError:
+            print("Try again...")
+        else:
+            valid = limit > 0
+
+    routes = data_manager.get_most_delayed_routes(limit,
+                                                  ROUTE_MAP_MIN_FLIGHTS)
+    path = draw_routes_map(routes, cluster_markers=len(routes) > 500)
+    print(f"Mapped the {len(routes)} most delayed routes: {path}")
 
 
 def delayed_flights_by_airline(data_manager) -> None:
@@ -59,16 +127,18 @@ def delayed_flights_by_airline(data_manager) -> None:
     Retrieve and display delayed flights for a specific airline.
 
     Asks the user for a textual airline name (any string will work here).
-    Then runs the query using the data object method "get_delayed_flights_by_airline".
-    When results are back, calls "print_results" to show them to on the screen.
+    Then runs the query using the data object method
+    "get_delayed_flights_by_airline_page" and shows the results one page at a
+    time with "print_paged_results".
 
     Parameters:
         data_manager (FlightData):
             The data manager instance for executing database queries.
     """
     airline_input = input("Enter airline name: ")
-    results = data_manager.get_delayed_flights_by_airline(airline_input)
-    print_results(results)
+    print_paged_results(lambda cursor: data_manager.
+                        get_delayed_flights_by_airline_page(airline_input,
+                                                            cursor=cursor))
 
 
 def delayed_flights_by_airport(data_manager) -> None:
@@ -77,8 +147,8 @@ def delayed_flights_by_airport(data_manager) -> None:
 
     Asks the user for a textual IATA 3-letter airport code (loops until input
     is valid). Then runs the query using the data object method
-    "get_delayed_flights_by_airport". When results are back, calls
-    "print_results" to show them to on the screen.
+    "get_delayed_flights_by_airport_page" and shows the results one page at
+    a time with "print_paged_results".
 
     Parameters:
         data_manager (FlightData):
@@ -90,8 +160,9 @@ def delayed_flights_by_airport(data_manager) -> None:
         # Valide input
         if airport_input.isalpha() and len(airport_input) == IATA_LENGTH:
             valid = True
-    results = data_manager.get_delayed_flights_by_airport(airport_input)
-    print_results(results)
+    print_paged_results(lambda cursor: data_manager.
+                        get_delayed_flights_by_airport_page(airport_input,
+                                                            cursor=cursor))
 
 
 def flight_by_id(data_manager) -> None:
@@ -125,8 +196,9 @@ def flights_by_date(data_manager) -> None:
     Prompts the user to input a date in the format 'DD/MM/YYYY'
 
     Asks the user for date input (and loops until it's valid),
-    Then runs the query using the data object method "get_flights_by_date".
-    When results are back, calls "print_results" to show them to on the screen.
+    Then runs the query using the data object method
+    "get_flights_by_date_page" and shows the results one page at a time with
+    "print_paged_results".
 
     Parameters:
     data_manager (FlightData):
@@ -141,9 +213,8 @@ def flights_by_date(data_manager) -> None:
             print("Try again... [DD/MM/YYYY] ", e)
         else:
             valid = True
-    results = data_manager.get_flights_by_date(date.day, date.month,
-                                               date.year)
-    print_results(results)
+    print_paged_results(lambda cursor: data_manager.get_flights_by_date_page(
+        date.day, date.month, date.year, cursor=cursor))
 
 
 def print_results(results) -> None:
@@ -155,14 +226,24 @@ def print_results(results) -> None:
     Each object *has* to contain the columns:
     FLIGHT_ID, ORIGIN_AIRPORT, DESTINATION_AIRPORT, AIRLINE, and DELAY.
 
+    Results can also be an iterator (see the `iter_*` methods of FlightData).
+    Its rows are printed as they arrive and the number of results is printed
+    at the end, so large results never have to be held in memory.
+
     Parameters:
-        results (list of RowProxy):
+        results (list or iterator of RowProxy):
             A list of dictionary-like objects containing flight details.
             Each object must include the columns: `ID`, `ORIGIN_AIRPORT`,
             `DESTINATION_AIRPORT`, `AIRLINE`, and `DELAY`.
     """
-    print(f"Got {len(results)} results.")
+    from sqlalchemy.exc import SQLAlchemyError
+
+    streaming = not hasattr(results, '__len__')
+    if not streaming:
+        print(f"Got {len(results)} results.")
+    count = 0
     for result in results:
+        count += 1
         # turn result into dictionary
         result = result._mapping
 
@@ -173,7 +254,7 @@ def print_results(results) -> None:
             origin = result['ORIGIN_AIRPORT']
             dest = result['DESTINATION_AIRPORT']
             airline = result['AIRLINE']
-        except (ValueError, sqlalchemy.exc.SQLAlchemyError) as e:
+        except (ValueError, SQLAlchemyError) as e:
             print("Error showing results: ", e)
             return
 
@@ -185,6 +266,33 @@ def print_results(results) -> None:
         else:
             print(f"{result['ID']}. {origin} -> {dest} by {airline}")
 
+    if streaming:
+        print(f"Got {count} results.")
+
+
+def print_paged_results(fetch_page) -> None:
+    """
+    Display paginated query results one page at a time.
+
+    Prints a page with "print_results" and asks the user whether to show the
+    next one, until the last page is shown or the user declines.
+
+    Parameters:
+        fetch_page (callable):
+            Takes the cursor of the next page (None for the first page) and
+            returns the rows of the page and the cursor of the following
+            page, or None after the last page (see the `*_page` methods of
+            FlightData).
+    """
+    cursor = None
+    while True:
+        results, cursor = fetch_page(cursor)
+        print_results(results)
+        if cursor is None:
+            return
+        if input("Show next page? (y/n): ").strip().lower() != 'y':
+            return
+
 
 def show_menu_and_get_input():
     """
@@ -212,6 +320,373 @@ def show_menu_and_get_input():
         print("Try again...")
 
 
+def iata_code(value) -> str:
+    # argparse type of airport arguments
+    if not (value.isalpha() and len(value) == IATA_LENGTH):
+        raise argparse.ArgumentTypeError(f"invalid IATA code {value!r}")
+    return value.upper()
+
+
+def date_argument(value) -> datetime:
+    # argparse type of date arguments
+    try:
+        return datetime.strptime(value, '%d/%m/%Y')
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {value!r}, expected DD/MM/YYYY")
+
+
+def command_flight_by_id(data_manager, args):
+    """
+    Rows of `flights by-id ID`.
+    """
+    return data_manager.get_flight_by_id(args.id)
+
+
+def command_flights_by_date(data_manager, args):
+    """
+    Rows of `flights by-date DD/MM/YYYY`.
+    """
+    return data_manager.iter_flights_by_date(args.date.day, args.date.month,
+                                             args.date.year)
+
+
+def command_flights_by_airline(data_manager, args):
+    """
+    Rows of `flights by-airline NAME`.
+    """
+    return data_manager.iter_delayed_flights_by_airline(args.airline)
+
+
+def command_flights_by_airport(data_manager, args):
+    """
+    Rows of `flights by-airport IATA`.
+    """
+    return data_manager.iter_delayed_flights_by_airport(args.airport)
+
+
+def command_route_delay(data_manager, args):
+    """
+    Rows of `routes delay ORIGIN DESTINATION`.
+    """
+    return data_manager.generate_percentage_of_delayed_flights(
+        args.origin, args.destination)
+
+
+def command_delay_percentiles(data_manager, args):
+    """
+    Rows of `delays percentiles`.
+    """
+    return data_manager.get_delay_percentiles(
+        args.by, args.percentiles, airline=args.airline,
+        origin_airport=args.origin, destination_airport=args.destination,
+        min_flights=args.min_flights)
+
+
+def command_delay_histogram(data_manager, args):
+    """
+    Rows of `delays histogram`.
+    """
+    return data_manager.get_delay_histogram(
+        args.by, args.bin_minutes, airline=args.airline,
+        origin_airport=args.origin, destination_airport=args.destination)
+
+
+def command_top_delay_rates(data_manager, args):
+    """
+    Rows of `delays top`.
+    """
+    return data_manager.get_top_delay_rates(args.by, args.limit,
+                                            args.min_flights)
+
+
+def percentiles_argument(value) -> list:
+    # argparse type of the --percentiles option, e.g. "50,90,99.9"
+    try:
+        percentiles = [float(part) for part in value.split(',')]
+    except ValueError:
+        percentiles = []
+    if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+        raise argparse.ArgumentTypeError(
+            f"invalid percentiles {value!r}, expected e.g. 50,90,99")
+    return percentiles
+
+
+def draw_routes_map(routes, map_dir=None, map_format='html', output=None,
+                    cluster_markers=False) -> str:
+    """
+    Draw routes into the map directory, where a map drawn before is reused
+    (see generate_visual_data_map.cached_routes_map).
+
+    Parameters:
+        routes (list of tuple): The routes, as for process_routes_and_map.
+        map_dir (str): The map directory, defaults to MAP_CACHE_DIR.
+        map_format (str): 'html', or 'geojson' for a GeoJSON file shown by
+                          the shared viewer of the map directory.
+        output (str): Also copy the map to this file.
+        cluster_markers (bool): Cluster the airport markers.
+
+    Returns:
+        str: Where to find the map.
+    """
+    from generate_visual_data_map import MAP_CACHE_DIR, cached_routes_map, \
+        viewer_url
+    map_dir = map_dir or MAP_CACHE_DIR
+    path = cached_routes_map(routes, map_dir, map_format, cluster_markers)
+    if output:
+        shutil.copyfile(path, output)
+        return output
+    if map_format == 'geojson':
+        return f"{path} (view {os.path.join(map_dir, viewer_url(path))})"
+    return path
+
+
+def report_map(path) -> None:
+    # Map commands write rows to stdout: report the map on stderr
+    print(f"Map: {path}", file=sys.stderr)
+
+
+def command_route_map(data_manager, args):
+    """
+    Map both directions of a route, each with its own percentage of delayed
+    flights, and return the percentage rows.
+    """
+    percentages, coords = data_manager.fan_out(
+        lambda: data_manager.generate_percentage_of_delayed_flights(
+            args.origin, args.destination),
+        lambda: data_manager.get_airport_coords([args.origin,
+                                                 args.destination]))
+    routes = [(origin, destination, percent,
+               *coords[origin][1:], *coords[destination][1:])
+              for origin, destination, percent in percentages
+              if origin in coords and destination in coords]
+    report_map(draw_routes_map(routes, args.map_dir, args.map_format,
+                               args.output))
+    return percentages
+
+
+def command_airport_routes_map(data_manager, args):
+    """
+    Map every route from an airport and return the routes.
+    """
+    routes = data_manager.get_routes_from_airport(args.airport)
+    report_map(draw_routes_map(routes, args.map_dir, args.map_format,
+                               args.output))
+    return routes
+
+
+def command_most_delayed_routes_map(data_manager, args):
+    """
+    Map the most delayed routes and return them.
+    """
+    routes = data_manager.get_most_delayed_routes(args.limit,
+                                                  args.min_flights)
+    report_map(draw_routes_map(routes, args.map_dir, args.map_format,
+                               args.output,
+                               cluster_markers=len(routes) > 500))
+    return routes
+
+
+def add_commands(parser) -> None:
+    """
+    Add the subcommands of the non-interactive command line to a parser.
+    They mirror the FUNCTIONS menu options; every subcommand sets `func` to
+    a function taking the data manager and the arguments and returning the
+    result rows.
+
+    Parameter:
+        parser (argparse.ArgumentParser): The parser to extend.
+    """
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    flights = commands.add_parser('flights', help="Look up flights.")
+    lookups = flights.add_subparsers(dest='lookup', required=True)
+    by_id = lookups.add_parser('by-id', help=FUNCTIONS[1][1])
+    by_id.add_argument('id', type=int)
+    by_id.set_defaults(func=command_flight_by_id)
+    by_date = lookups.add_parser('by-date', help=FUNCTIONS[2][1])
+    by_date.add_argument('date', type=date_argument, help="DD/MM/YYYY")
+    by_date.set_defaults(func=command_flights_by_date)
+    by_airline = lookups.add_parser('by-airline', help=FUNCTIONS[3][1])
+    by_airline.add_argument('airline')
+    by_airline.set_defaults(func=command_flights_by_airline)
+    by_airport = lookups.add_parser('by-airport', help=FUNCTIONS[4][1])
+    by_airport.add_argument('airport', type=iata_code)
+    by_airport.set_defaults(func=command_flights_by_airport)
+
+    routes = commands.add_parser('routes', help="Route statistics.")
+    route_commands = routes.add_subparsers(dest='lookup', required=True)
+    delay = route_commands.add_parser(
+        'delay', help="Percentage of delayed flights of a route.")
+    delay.add_argument('origin', type=iata_code)
+    delay.add_argument('destination', type=iata_code)
+    delay.set_defaults(func=command_route_delay)
+
+    delays = commands.add_parser('delays', help="Delay distributions.")
+    delay_commands = delays.add_subparsers(dest='lookup', required=True)
+    percentiles = delay_commands.add_parser(
+        'percentiles', help="Delay percentiles per group.")
+    percentiles.add_argument('--percentiles', type=percentiles_argument,
+                             default=data.FlightData.DEFAULT_PERCENTILES,
+                             help="Comma separated, e.g. 50,90,99.")
+    percentiles.add_argument('--min-flights', type=int, default=1)
+    percentiles.set_defaults(func=command_delay_percentiles)
+    histogram = delay_commands.add_parser(
+        'histogram', help="Delay histogram per group.")
+    histogram.add_argument('--bin-minutes', type=int, default=15)
+    histogram.set_defaults(func=command_delay_histogram)
+    for command in (percentiles, histogram):
+        command.add_argument('--by', choices=DELAY_GROUPS, default='all')
+        command.add_argument('--airline')
+        command.add_argument('--origin', type=iata_code)
+        command.add_argument('--destination', type=iata_code)
+    top = delay_commands.add_parser(
+        'top', help="Highest percentages of delayed flights.")
+    top.add_argument('--by', choices=[group for group in DELAY_GROUPS
+                                      if group != 'all'], default='route')
+    top.add_argument('--limit', type=int, default=10)
+    top.add_argument('--min-flights', type=int, default=100)
+    top.set_defaults(func=command_top_delay_rates)
+
+    maps = commands.add_parser('map', help="Generate delay maps.")
+    map_commands = maps.add_subparsers(dest='lookup', required=True)
+    route = map_commands.add_parser('route', help=FUNCTIONS[5][1])
+    route.add_argument('origin', type=iata_code)
+    route.add_argument('destination', type=iata_code)
+    route.set_defaults(func=command_route_map)
+    airport = map_commands.add_parser('airport', help=FUNCTIONS[6][1])
+    airport.add_argument('airport', type=iata_code)
+    airport.set_defaults(func=command_airport_routes_map)
+    most_delayed = map_commands.add_parser('most-delayed',
+                                           help=FUNCTIONS[7][1])
+    most_delayed.add_argument('--limit', type=int, default=50)
+    most_delayed.add_argument('--min-flights', type=int,
+                              default=ROUTE_MAP_MIN_FLIGHTS)
+    most_delayed.set_defaults(func=command_most_delayed_routes_map)
+    for map_command in (route, airport, most_delayed):
+        map_command.add_argument('--output',
+                                 help="Also copy the map to this file.")
+        map_command.add_argument('--map-dir',
+                                 help="Directory of the cached maps "
+                                      "(default: maps).")
+        map_command.add_argument('--map-format', choices=('html', 'geojson'),
+                                 default='html',
+                                 help="A full HTML page, or GeoJSON data "
+                                      "shown by the shared viewer.html.")
+    # Also accept --format after the command, e.g. "flights by-id 1
+    # --format json"
+    for command in (by_id, by_date, by_airline, by_airport, delay,
+                    percentiles, histogram, top, route, airport,
+                    most_delayed):
+        command.add_argument('--format', choices=WRITERS,
+                             default=argparse.SUPPRESS,
+                             help="Output format (json writes JSON Lines).")
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """
+    Parse the arguments of the non-interactive command line.
+
+    Parameter:
+        argv (list of str): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Query the flights database. Without arguments, the "
+                    "interactive menu is shown.")
+    parser.add_argument('--db', default=SQLITE_URI,
+                        help="SQLAlchemy URI of the flights database.")
+    parser.add_argument('--format', choices=WRITERS, default='table',
+                        help="Output format (json writes JSON Lines).")
+    parser.add_argument('--delay-threshold', type=int,
+                        default=DEFAULT_DELAY_THRESHOLD,
+                        help="Minutes from which a departure is delayed.")
+    parser.add_argument('--batch', action='store_true',
+                        help="Read one command per line from stdin, e.g. "
+                             "'flights by-airport ORD'.")
+    args, rest = parser.parse_known_args(argv)
+    if not args.batch:
+        add_commands(parser)
+        args = parser.parse_args(argv)
+    elif rest:
+        parser.error("--batch reads its commands from stdin")
+    return args
+
+
+def run_batch(data_manager, writer, lines) -> int:
+    """
+    Run one command per input line with the same data manager, writing the
+    results of every line tagged with the line. Empty lines and lines
+    starting with # are skipped. A failing line is reported in the output
+    and does not stop the batch.
+
+    Parameters:
+        data_manager (FlightData): The data manager shared by all lines.
+        writer (BufferedWriter): The output writer.
+        lines (iterable of str): The command lines.
+
+    Returns:
+        int: The number of failed lines.
+    """
+    parser = argparse.ArgumentParser(prog='batch', add_help=False)
+    add_commands(parser)
+    failed = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+            writer.write_rows(args.func(data_manager, args), query=line)
+        except SystemExit:
+            failed += 1
+            writer.write_error("invalid command", query=line)
+        except Exception as e:
+            failed += 1
+            writer.write_error(str(e), query=line)
+    return failed
+
+
+def run_command_line(argv=None) -> int:
+    """
+    Run the non-interactive command line.
+
+    Parameter:
+        argv (list of str): The arguments, defaults to sys.argv.
+
+    Returns:
+        int: The exit status.
+    """
+    args = parse_arguments(argv)
+    writer = WRITERS[args.format](sys.stdout)
+    try:
+        # Query errors are raised, so that they are reported on stderr or
+        # in the error record of a batch line instead of amid the rows
+        with data.FlightData(args.db, cache=QueryCache(),
+                             profile=DEFAULT_PROFILE, light_rows=True,
+                             delay_threshold=args.delay_threshold,
+                             raise_errors=True) as data_manager:
+            if args.batch:
+                status = 1 if run_batch(data_manager, writer,
+                                        sys.stdin) else 0
+            else:
+                writer.write_rows(args.func(data_manager, args))
+                status = 0
+        writer.close()
+    except BrokenPipeError:
+        # The reader of the output (e.g. head) exited early; silence the
+        # error Python reports when flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        status = 1
+    except Exception as e:
+        writer.close()
+        print(f"Error: {e}", file=sys.stderr)
+        status = 1
+    return status
+
+
 """
 Function Dispatch Dictionary
 """
@@ -224,20 +699,30 @@ FUNCTIONS = {1: (flight_by_id, "Show flight by ID"),
              5: (
                  generate_percentage_of_delayed_flights,
                  "Generate Visual Map for delayed flights"),
-             6: (quit, "Exit")
+             6: (
+                 generate_routes_map_by_airport,
+                 "Generate Visual Map for all routes from an airport"),
+             7: (
+                 generate_most_delayed_routes_map,
+                 "Generate Visual Map for the most delayed routes"),
+             8: (quit, "Exit")
              }
 
 
 def main():
     # Main program entry point.
-
-    # Create an instance of the Data Object using our SQLite URI
-    data_manager = data.FlightData(SQLITE_URI)
-
-    # The Main Menu loop
-    while True:
-        choice_func = show_menu_and_get_input()
-        choice_func(data_manager)
+    if len(sys.argv) > 1:
+        sys.exit(run_command_line())
+
+    # Create an instance of the Data Object using our SQLite URI; it is
+    # closed when the Exit option raises SystemExit
+    with data.FlightData(SQLITE_URI, cache=QueryCache(),
+                         profile=DEFAULT_PROFILE,
+                         light_rows=True) as data_manager:
+        # The Main Menu loop
+        while True:
+            choice_func = show_menu_and_get_input()
+            choice_func(data_manager)
 
 
 if __name__ == "__main__":
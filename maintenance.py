@@ -0,0 +1,171 @@
+"""
+Maintenance commands for the flights database.
+
+Usage:
+    python maintenance.py route-stats [--force] [--db URI]
+    python maintenance.py delay-cube [--force] [--db URI]
+    python maintenance.py indexes [--db URI]
+    python maintenance.py journal-mode {wal,delete} [--db URI]
+
+    Pass --delay-threshold MINUTES to build the summary tables for another
+    delay threshold than DEFAULT_DELAY_THRESHOLD.
+
+Commands:
+    route-stats:
+        Rebuild the `route_stats` summary table if the `flights` table has
+        changed since it was last built. Use --force to always rebuild.
+
+    delay-cube:
+        Add the flights appended since the last update to the
+        `daily_delay_cube` summary table, or rebuild it if flights were
+        changed or deleted. Use --force to always rebuild.
+
+    indexes:
+        Inspect the query plan of every registered query, create the
+        indexes the queries need and report the plans before and after.
+
+    journal-mode:
+        Switch the database file to the WAL journal, so that lookups are
+        not blocked while flights are written, or back to the default
+        rollback journal (delete). The mode is stored in the file; in WAL
+        mode SQLite keeps -wal and -shm files next to it. Lookups never
+        change the journal mode.
+"""
+import argparse
+
+import data
+from util_sql_query import DEFAULT_DELAY_THRESHOLD, JOURNAL_MODES
+
+SQLITE_URI = 'sqlite:///data/flights.sqlite3'
+
+
+def rebuild_route_stats(data_manager, args) -> None:
+    """
+    Rebuild the route statistics summary table and report the outcome.
+
+    Parameters:
+        data_manager (FlightData):
+            The data manager instance for executing database queries.
+        args (argparse.Namespace):
+            The parsed command line arguments.
+    """
+    if not args.force and not data_manager.is_route_stats_stale():
+        print("route_stats is up to date.")
+        return
+
+    if data_manager.build_route_stats():
+        print("route_stats rebuilt.")
+    else:
+        print("Could not rebuild route_stats.")
+
+
+def refresh_delay_cube(data_manager, args) -> None:
+    """
+    Update or rebuild the daily delay cube and report the outcome.
+
+    Parameters:
+        data_manager (FlightData):
+            The data manager instance for executing database queries.
+        args (argparse.Namespace):
+            The parsed command line arguments.
+    """
+    status = 'rebuild' if args.force else data_manager.delay_cube_status()
+    if status == 'fresh':
+        print("daily_delay_cube is up to date.")
+        return
+
+    if status == 'append':
+        updated = data_manager.update_delay_cube()
+    else:
+        updated = data_manager.build_delay_cube()
+    action = "updated" if status == 'append' else "rebuilt"
+    if updated:
+        print(f"daily_delay_cube {action}.")
+    else:
+        print(f"Could not {action[:-1]} daily_delay_cube.")
+
+
+def provision_indexes(data_manager, args) -> None:
+    """
+    Create the missing indexes and report the query plans.
+
+    Parameters:
+        data_manager (FlightData):
+            The data manager instance for executing database queries.
+        args (argparse.Namespace):
+            The parsed command line arguments.
+    """
+    data_manager.provision_indexes(report=True)
+
+
+def set_journal_mode(data_manager, args) -> None:
+    """
+    Switch the journal mode of the database file and report the outcome.
+
+    Parameters:
+        data_manager (FlightData):
+            The data manager instance for executing database queries.
+        args (argparse.Namespace):
+            The parsed command line arguments.
+    """
+    mode = data_manager.set_journal_mode(args.mode)
+    if mode == args.mode.upper():
+        print(f"Journal mode is {mode.lower()}.")
+    else:
+        print(f"Could not switch the journal mode to {args.mode}.")
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the maintenance commands.
+
+    Parameter:
+        argv (list of str): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Maintenance commands for the flights database.")
+    parser.add_argument('--db', default=SQLITE_URI,
+                        help="SQLAlchemy URI of the flights database.")
+    parser.add_argument('--delay-threshold', type=int,
+                        default=DEFAULT_DELAY_THRESHOLD,
+                        help="Minutes from which a departure is delayed.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    route_stats = commands.add_parser(
+        'route-stats', help="Rebuild the route_stats summary table.")
+    route_stats.add_argument('--force', action='store_true',
+                             help="Rebuild even if it is up to date.")
+    route_stats.set_defaults(func=rebuild_route_stats)
+
+    delay_cube = commands.add_parser(
+        'delay-cube', help="Update the daily_delay_cube summary table.")
+    delay_cube.add_argument('--force', action='store_true',
+                            help="Rebuild even if it is up to date.")
+    delay_cube.set_defaults(func=refresh_delay_cube)
+
+    indexes = commands.add_parser(
+        'indexes', help="Create the indexes the queries need.")
+    indexes.set_defaults(func=provision_indexes)
+
+    journal_mode = commands.add_parser(
+        'journal-mode', help="Switch the journal mode of the database.")
+    journal_mode.add_argument('mode', choices=[mode.lower() for mode
+                                               in JOURNAL_MODES])
+    journal_mode.set_defaults(func=set_journal_mode)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # Maintenance entry point.
+    args = parse_arguments(argv)
+    with data.FlightData(args.db, delay_threshold=args.delay_threshold) \
+            as data_manager:
+        args.func(data_manager, args)
+
+
+if __name__ == "__main__":
+    main()
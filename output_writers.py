@@ -0,0 +1,200 @@
+"""
+Buffered writers for the non-interactive command line (see main.py).
+
+Description:
+    A writer turns query result rows into text on an output stream:
+        - TableWriter: human readable lines, like the interactive menu.
+        - CsvWriter: CSV with a header line per result set.
+        - JsonLinesWriter: one JSON object per row (JSON Lines).
+
+    Rows are formatted into an in-memory buffer that is written to the
+    stream every `buffer_rows` rows, instead of one print() per row, so
+    large results and thousands of batch queries stay fast.
+
+    In batch mode every row is tagged with the query line that produced it
+    (a QUERY column, a "query" key, or a header line for tables), so the
+    output of many queries can be told apart.
+"""
+import csv
+import io
+import json
+
+DEFAULT_BUFFER_ROWS = 1000
+
+# Created once: json.dumps() with options builds a new encoder per call
+_encode_json = json.JSONEncoder(default=str).encode
+
+FLIGHT_COLUMNS = ('ID', 'ORIGIN_AIRPORT', 'DESTINATION_AIRPORT', 'AIRLINE',
+                  'DELAY')
+
+
+def row_columns(row) -> list:
+    """
+    Return the column names of a result row (SQLAlchemy Row, DelayedFlight
+    or plain tuple).
+    """
+    fields = getattr(row, '_fields', None)
+    if fields is not None:
+        return list(fields)
+    return [str(i) for i in range(len(row))]
+
+
+class BufferedWriter:
+    """
+    Base class of the writers: buffers formatted rows and writes them to the
+    stream in blocks.
+
+    The columns of a result set are looked up once, from its first row;
+    subclasses turn them into a row formatter (`_formatter`) that is then
+    applied to the plain value tuples of every row.
+    """
+
+    def __init__(self, stream, buffer_rows=DEFAULT_BUFFER_ROWS):
+        """
+        Parameters:
+            stream (file object): The text stream to write to.
+            buffer_rows (int): Number of rows buffered between writes.
+        """
+        self.stream = stream
+        self.buffer_rows = buffer_rows
+        self._buffer = io.StringIO()
+        self._buffered = 0
+
+    def _flush_buffer(self) -> None:
+        self.stream.write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffered = 0
+
+    def _start(self, query) -> None:
+        """
+        Called before the rows of a result set; `query` is the batch query
+        line, or None.
+        """
+
+    def _formatter(self, columns, query):
+        """
+        Return a function writing the values of one row to the buffer.
+        """
+        raise NotImplementedError
+
+    def write_rows(self, rows, query=None) -> int:
+        """
+        Write the rows of one result set.
+
+        Parameters:
+            rows (iterable of Row): The rows, may be an iterator.
+            query (str): The batch query line that produced the rows.
+
+        Returns:
+            int: The number of rows written.
+        """
+        self._start(query)
+        write_row = None
+        count = 0
+        for row in rows:
+            if write_row is None:
+                write_row = self._formatter(row_columns(row), query)
+            write_row(tuple(row))
+            count += 1
+            self._buffered += 1
+            if self._buffered >= self.buffer_rows:
+                self._flush_buffer()
+        return count
+
+    def write_error(self, message, query=None) -> None:
+        """
+        Write an error of a batch query as part of the output.
+        """
+
+    def close(self) -> None:
+        """
+        Write the buffered rows and flush the stream.
+        """
+        self._flush_buffer()
+        self.stream.flush()
+
+
+class TableWriter(BufferedWriter):
+    """
+    Human readable output. Flights are printed like in the interactive
+    menu; other rows as "COLUMN: value" pairs.
+    """
+
+    def _start(self, query) -> None:
+        if query is not None:
+            self._buffer.write(f"# {query}\n")
+
+    def _formatter(self, columns, query):
+        write = self._buffer.write
+        if not all(column in columns for column in FLIGHT_COLUMNS):
+            def write_row(values):
+                write(", ".join(f"{column}: {value}" for column, value
+                                in zip(columns, values)) + "\n")
+            return write_row
+
+        # The last column of a name wins, like in row._mapping
+        position = {column: i for i, column in enumerate(columns)}
+        flight_id, origin, destination, airline, delay = (
+            position[column] for column in FLIGHT_COLUMNS)
+
+        def write_flight(values):
+            line = (f"{values[flight_id]}. {values[origin]} -> "
+                    f"{values[destination]} by {values[airline]}")
+            if values[delay] and int(values[delay]) > 0:
+                line += f", Delay: {int(values[delay])} Minutes"
+            write(line + "\n")
+        return write_flight
+
+    def write_error(self, message, query=None) -> None:
+        self._start(query)
+        self._buffer.write(f"Error: {message}\n")
+
+
+class CsvWriter(BufferedWriter):
+    """
+    CSV output with a header line whenever the columns change. In batch
+    mode the first column, QUERY, holds the query line.
+    """
+
+    def __init__(self, stream, buffer_rows=DEFAULT_BUFFER_ROWS):
+        super().__init__(stream, buffer_rows)
+        self._csv = csv.writer(self._buffer)
+        self._header = None
+
+    def _formatter(self, columns, query):
+        header = columns if query is None else ['QUERY'] + columns
+        if header != self._header:
+            self._csv.writerow(header)
+            self._header = header
+        writerow = self._csv.writerow
+        if query is None:
+            return writerow
+        return lambda values: writerow((query,) + values)
+
+
+class JsonLinesWriter(BufferedWriter):
+    """
+    JSON Lines output: one object per row. In batch mode every object has a
+    "query" key, and failed queries are written as {"query", "error"}
+    objects.
+    """
+
+    def _formatter(self, columns, query):
+        write = self._buffer.write
+        if query is not None:
+            columns = ['query'] + columns
+            prefix = (query,)
+        else:
+            prefix = ()
+
+        def write_row(values):
+            write(_encode_json(dict(zip(columns, prefix + values))) + "\n")
+        return write_row
+
+    def write_error(self, message, query=None) -> None:
+        self._buffer.write(_encode_json({'query': query, 'error': message})
+                           + "\n")
+
+
+WRITERS = {'table': TableWriter, 'csv': CsvWriter, 'json': JsonLinesWriter}
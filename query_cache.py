@@ -0,0 +1,257 @@
+"""
+Query result caches for the FlightData class.
+
+Description:
+    A cache stores the rows returned for a (query, params) pair, so repeated
+    lookups of the same airports, airlines and dates do not run the SQL
+    again. Two backends share the same interface:
+
+    QueryCache:
+        In-process LRU cache bounded by the total number of cached rows,
+        with an optional time to live (TTL) per entry.
+
+    DiskQueryCache:
+        The same cache kept in an SQLite file, so cached results survive a
+        restart of the program.
+
+    Both count hits, misses and evictions (see `stats`) and can be
+    invalidated entirely or for a single key (see `invalidate`).
+
+Notes:
+    - The flights data is historical, so by default entries never expire.
+      FlightData invalidates its cache whenever it writes to the database.
+"""
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(query, params) -> tuple:
+    """
+    Build the cache key of a query.
+
+    Parameters:
+        query (str): The SQL query string.
+        params (dict): The parameter values of the query.
+
+    Returns:
+        tuple: A hashable key identifying the query and its parameters.
+    """
+    return query, tuple(sorted((params or {}).items()))
+
+
+class QueryCache:
+    """
+    In-process LRU cache of query results.
+
+    The cache is bounded by the total number of rows it holds. When a new
+    result does not fit, the least recently used results are evicted. A
+    result with more rows than the whole cache can hold is not cached.
+    The cache can be shared by several threads.
+    """
+
+    def __init__(self, max_rows=100_000, ttl=None):
+        """
+        Initialize an empty cache.
+
+        Parameters:
+            max_rows (int): The maximum number of rows held in the cache.
+            ttl (float): Seconds after which an entry expires, or None to
+                         keep entries until they are evicted.
+        """
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return the cached rows of a key.
+
+        Parameter:
+            key (tuple): The key built by `make_key`.
+
+        Returns:
+            The cached rows, or None if the key is not cached or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, rows) -> None:
+        """
+        Store the rows of a key, evicting least recently used entries
+        until the rows fit.
+
+        Parameters:
+            key (tuple): The key built by `make_key`.
+            rows (Sequence[Row]): The rows returned by the query.
+        """
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._rows + len(rows) > self.max_rows:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (rows, time.monotonic())
+            self._rows += len(rows)
+
+    def invalidate(self, key=None) -> None:
+        """
+        Remove a single key, or every entry if no key is given.
+
+        Parameter:
+            key (tuple): The key built by `make_key`.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._rows = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            dict: hits, misses, evictions, entries and rows.
+        """
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': len(self._entries),
+                    'rows': self._rows}
+
+    def _expired(self, created) -> bool:
+        return self.ttl is not None and time.monotonic() - created > self.ttl
+
+    def _remove(self, key) -> None:
+        rows, _ = self._entries.pop(key)
+        self._rows -= len(rows)
+
+
+class DiskQueryCache(QueryCache):
+    """
+    LRU cache of query results kept in an SQLite file.
+
+    Results are pickled and survive a restart of the program. The bound,
+    the TTL and the counters behave like those of QueryCache; the counters
+    only cover the current process.
+    """
+
+    def __init__(self, path, max_rows=1_000_000, ttl=None):
+        """
+        Open (or create) the cache file.
+
+        Parameters:
+            path (str): Path of the SQLite cache file.
+            max_rows (int): The maximum number of rows held in the cache.
+            ttl (float): Seconds after which an entry expires, or None to
+                         keep entries until they are evicted.
+        """
+        super().__init__(max_rows, ttl)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS query_cache ( "
+                                 "   KEY TEXT PRIMARY KEY, "
+                                 "   ROWS BLOB NOT NULL, "
+                                 "   ROW_COUNT INTEGER NOT NULL, "
+                                 "   CREATED REAL NOT NULL, "
+                                 "   LAST_USED REAL NOT NULL)")
+        self._connection.commit()
+
+    def get(self, key):
+        digest = self._digest(key)
+        with self._lock:
+            entry = self._connection.execute(
+                "SELECT ROWS, CREATED FROM query_cache WHERE KEY = ?",
+                (digest,)).fetchone()
+            if entry is not None and self.ttl is not None \
+                    and time.time() - entry[1] > self.ttl:
+                self._delete(digest)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE query_cache SET LAST_USED = ? WHERE KEY = ?",
+                (time.time(), digest))
+            self._connection.commit()
+            self.hits += 1
+            return pickle.loads(entry[0])
+
+    def put(self, key, rows) -> None:
+        if len(rows) > self.max_rows:
+            return
+        digest = self._digest(key)
+        with self._lock:
+            self._delete(digest)
+            cached_rows = self._row_count()
+            while cached_rows + len(rows) > self.max_rows:
+                oldest = self._connection.execute(
+                    "SELECT KEY, ROW_COUNT FROM query_cache "
+                    "ORDER BY LAST_USED LIMIT 1").fetchone()
+                if oldest is None:
+                    break
+                self._delete(oldest[0])
+                cached_rows -= oldest[1]
+                self.evictions += 1
+            now = time.time()
+            self._connection.execute(
+                "INSERT INTO query_cache VALUES (?, ?, ?, ?, ?)",
+                (digest, pickle.dumps(list(rows)), len(rows), now, now))
+            self._connection.commit()
+
+    def invalidate(self, key=None) -> None:
+        with self._lock:
+            if key is None:
+                self._connection.execute("DELETE FROM query_cache")
+            else:
+                self._delete(self._digest(key))
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT COUNT(*) FROM query_cache").fetchone()[0]
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': entries,
+                    'rows': self._row_count()}
+
+    def close(self) -> None:
+        """
+        Close the cache file.
+        """
+        self._connection.close()
+
+    def _row_count(self) -> int:
+        return self._connection.execute(
+            "SELECT COALESCE(SUM(ROW_COUNT), 0) FROM query_cache").fetchone()[0]
+
+    def _delete(self, digest) -> None:
+        self._connection.execute("DELETE FROM query_cache WHERE KEY = ?",
+                                 (digest,))
+
+    @staticmethod
+    def _digest(key) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
@@ -0,0 +1,238 @@
+"""
+Query timing and profiling instrumentation for the FlightData class.
+
+Description:
+    QueryStats records, per query name, the wall time, connection checkout
+    time, execute time, fetch time and number of rows of every query
+    FlightData runs. It keeps a bounded window of recent samples for
+    percentiles and cumulative histograms for the whole run.
+
+    Queries slower than `slow_query_ms` are logged through the
+    "flight_data.slow_queries" logger together with their EXPLAIN QUERY PLAN.
+
+    The statistics can be dumped as JSON (`to_json`) or in the Prometheus
+    text exposition format (`to_prometheus`).
+
+Notes:
+    - Query names are the names of the constants in util_sql_query.py.
+    - For streamed queries (the `iter_*` methods) the fetch time includes
+      the time the caller spends between rows.
+"""
+import json
+import logging
+import threading
+from collections import deque
+
+import util_sql_query
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+              10000)
+
+PERCENTILES = (50, 90, 95, 99)
+
+TIMINGS = ('wall', 'checkout', 'execute', 'fetch')
+
+QUERY_NAMES = {value: name for name, value in vars(util_sql_query).items()
+               if name.startswith('QUERY_') and isinstance(value, str)}
+
+slow_query_logger = logging.getLogger('flight_data.slow_queries')
+
+
+def query_name(query: str) -> str:
+    """
+    Return the name of a query defined in util_sql_query.py, or "other".
+
+    Parameter:
+        query (str): The SQL query string.
+
+    Returns:
+        str: The name of the constant holding the query.
+    """
+    return QUERY_NAMES.get(query, 'other')
+
+
+def _percentile(sorted_values, percentile) -> float:
+    """
+    Return a percentile of sorted values (nearest rank).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(percentile / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class _QueryRecord:
+    """
+    The samples and counters of a single query name.
+    """
+
+    def __init__(self, max_samples):
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.rows = 0
+        self.samples = {timing: deque(maxlen=max_samples)
+                        for timing in TIMINGS}
+        self.wall_sum = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+
+class QueryStats:
+    """
+    Collects per-query timings of a FlightData object. It can be shared by
+    several threads.
+    """
+
+    def __init__(self, slow_query_ms=None, max_samples=10_000):
+        """
+        Parameters:
+            slow_query_ms (float):
+                Log queries slower than this many milliseconds, with their
+                query plan. None disables slow query logging.
+            max_samples (int):
+                Number of recent samples kept per query for percentiles.
+        """
+        self.slow_query_ms = slow_query_ms
+        self.max_samples = max_samples
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name) -> _QueryRecord:
+        record = self._records.get(name)
+        if record is None:
+            record = self._records[name] = _QueryRecord(self.max_samples)
+        return record
+
+    def record(self, name, rows, wall_ms, checkout_ms=0.0, execute_ms=0.0,
+               fetch_ms=0.0, explain=None) -> None:
+        """
+        Record a query that was executed.
+
+        Parameters:
+            name (str): The name of the query.
+            rows (int): The number of rows returned.
+            wall_ms (float): The total time of the query.
+            checkout_ms (float): Time spent checking out a connection.
+            execute_ms (float): Time spent executing the statement.
+            fetch_ms (float): Time spent fetching the rows.
+            explain (callable):
+                Returns the query plan; only called for slow queries.
+        """
+        with self._lock:
+            record = self._record(name)
+            record.count += 1
+            record.rows += rows
+            record.wall_sum += wall_ms
+            for timing, value in zip(TIMINGS, (wall_ms, checkout_ms,
+                                               execute_ms, fetch_ms)):
+                record.samples[timing].append(value)
+            for i, bound in enumerate(BUCKETS_MS):
+                if wall_ms <= bound:
+                    record.buckets[i] += 1
+
+        if self.slow_query_ms is not None and wall_ms >= self.slow_query_ms:
+            plan = explain() if explain is not None else []
+            slow_query_logger.warning(
+                "Slow query %s: %.1f ms, %d rows. Plan: %s",
+                name, wall_ms, rows, '; '.join(plan) or 'unavailable')
+
+    def record_error(self, name) -> None:
+        """
+        Record a query that raised an exception.
+
+        Parameter:
+            name (str): The name of the query.
+        """
+        with self._lock:
+            self._record(name).errors += 1
+
+    def record_cache_hit(self, name) -> None:
+        """
+        Record a query that was answered from the result cache.
+
+        Parameter:
+            name (str): The name of the query.
+        """
+        with self._lock:
+            self._record(name).cache_hits += 1
+
+    def summary(self) -> dict:
+        """
+        Return the statistics of every query.
+
+        Returns:
+            dict:
+                Maps query names to their counters and, per timing, the
+                mean, maximum and percentiles (over the recent samples) in
+                milliseconds.
+        """
+        with self._lock:
+            summary = {}
+            for name, record in self._records.items():
+                timings = {}
+                for timing in TIMINGS:
+                    values = sorted(record.samples[timing])
+                    timings[timing] = {
+                        'mean': sum(values) / len(values) if values else 0.0,
+                        'max': values[-1] if values else 0.0,
+                        **{f"p{p}": _percentile(values, p)
+                           for p in PERCENTILES}}
+                summary[name] = {'count': record.count,
+                                 'errors': record.errors,
+                                 'cache_hits': record.cache_hits,
+                                 'rows': record.rows,
+                                 'timings_ms': timings}
+            return summary
+
+    def slowest(self, count=5, percentile=95) -> list:
+        """
+        Return the names of the slowest queries.
+
+        Parameters:
+            count (int): The number of queries to return.
+            percentile (int): The wall time percentile to rank by.
+
+        Returns:
+            list of tuple: (name, wall time percentile in ms), slowest first.
+        """
+        ranked = [(name, stats['timings_ms']['wall'][f"p{percentile}"])
+                  for name, stats in self.summary().items()]
+        return sorted(ranked, key=lambda item: item[1], reverse=True)[:count]
+
+    def to_json(self, indent=2) -> str:
+        """
+        Return the statistics as a JSON document (see `summary`).
+        """
+        return json.dumps(self.summary(), indent=indent, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """
+        Return the statistics in the Prometheus text exposition format.
+        Durations are exported in seconds.
+        """
+        lines = [
+            "# HELP flight_data_query_duration_seconds Wall time of queries.",
+            "# TYPE flight_data_query_duration_seconds histogram"]
+        counters = {'rows': [], 'errors': [], 'cache_hits': []}
+        with self._lock:
+            for name, record in sorted(self._records.items()):
+                label = f'query="{name}"'
+                for bound, bucket in zip(BUCKETS_MS, record.buckets):
+                    lines.append(f'flight_data_query_duration_seconds_bucket'
+                                 f'{{{label},le="{bound / 1000:g}"}} {bucket}')
+                lines.append(f'flight_data_query_duration_seconds_bucket'
+                             f'{{{label},le="+Inf"}} {record.count}')
+                lines.append(f'flight_data_query_duration_seconds_sum'
+                             f'{{{label}}} {record.wall_sum / 1000:.6f}')
+                lines.append(f'flight_data_query_duration_seconds_count'
+                             f'{{{label}}} {record.count}')
+                counters['rows'].append((label, record.rows))
+                counters['errors'].append((label, record.errors))
+                counters['cache_hits'].append((label, record.cache_hits))
+
+        for counter, values in counters.items():
+            metric = f"flight_data_query_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines += [f"{metric}{{{label}}} {value}" for label, value in values]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,681 @@
+"""
+Local HTTP/JSON query service for the flights database.
+
+Usage:
+    python server.py [--db URI] [--host HOST] [--port PORT] [--workers N]
+        [--max-age SECONDS] [--delay-threshold MINUTES] [--quiet]
+
+Endpoints (GET):
+    /flights/<id>
+    /flights/date/<YYYY-MM-DD>          paged: ?page_size=N&cursor=C
+    /flights/airline/<name>             paged
+    /flights/airport/<IATA>             paged
+    /routes/delay/<ORIGIN>/<DESTINATION>
+    /routes/from/<IATA>
+    /routes/most-delayed                ?limit=N&min_flights=N
+    /delays/summary                     ?start=YYYY-MM-DD&end=YYYY-MM-DD
+    /delays/daily                           [&airline=NAME][&origin=IATA]
+    /delays/airlines                    ?start=...&end=...[&origin=IATA]
+    /delays/airports                    ?start=...&end=...[&airline=NAME]
+    /delays/percentiles                 ?by=GROUP&percentiles=50,90,99
+                                            &min_flights=N[&airline=NAME]
+                                            [&origin=IATA][&destination=IATA]
+    /delays/histogram                   ?by=GROUP&bin_minutes=N[&airline=...]
+    /delays/top                         ?by=GROUP&limit=N&min_flights=N
+    /airports/<IATA>
+    /airports/<IATA>/nearby             ?radius_km=N
+    /maps/route/<ORIGIN>/<DESTINATION>  (HTML)         [?format=geojson]
+    /maps/airport/<IATA>                (HTML)         [?format=geojson]
+    /maps/most-delayed                  ?limit=N&min_flights=N (HTML)
+                                            [&format=geojson]
+    /maps/viewer#<GeoJSON map URL>      (HTML)
+    /health
+
+    GROUP is one of all, airline, origin, destination and route.
+
+    HTML maps are rendered once into the map directory (MAP_CACHE_DIR of
+    generate_visual_data_map.py) and read from there afterwards. With
+    format=geojson, the map endpoints return the routes and airports as
+    GeoJSON instead; /maps/viewer displays such a URL, e.g.
+    /maps/viewer#/maps/airport/ORD?format=geojson.
+
+    Rows are returned as {"columns": [...], "rows": [[...], ...]}; paged
+    endpoints add "next_cursor" (null after the last page). Invalid
+    arguments are answered with 400 and {"error": "..."}.
+
+Description:
+    All requests are served by one FlightData object, and so by one pooled
+    engine, from a fixed pool of worker threads. FlightData runs with an
+    in-memory result cache and LightRow results. The independent lookups of
+    a route map run concurrently (FlightData.fan_out).
+
+    The flight data is historical and only changes when flights are
+    loaded. Every response carries a weak ETag built from the data version
+    (row count and highest ID of `flights`, re-read every
+    `version_ttl` seconds) and the request URL, and a Cache-Control max-age.
+    Conditional requests with a matching If-None-Match are answered with
+    304 without running the query. Encoded responses are kept in a bounded
+    in-memory cache, and bodies larger than GZIP_MIN_BYTES are gzipped for
+    clients that accept it.
+
+Notes:
+    - Persistent (keep-alive) connections occupy a worker until they are
+      idle for KEEP_ALIVE_TIMEOUT seconds; use at least as many workers as
+      concurrent clients.
+    - The service is meant for a trusted local network: it has no
+      authentication.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import data
+from engine_profile import DEFAULT_PROFILE
+from output_writers import row_columns
+from query_cache import QueryCache
+from util_sql_query import DEFAULT_DELAY_THRESHOLD
+
+SQLITE_URI = 'sqlite:///data/flights.sqlite3'
+
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_AGE = 3600
+DEFAULT_VERSION_TTL = 60
+KEEP_ALIVE_TIMEOUT = 5
+
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+# Bound of the encoded response cache
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
+MAX_PAGE_SIZE = 1000
+# Largest SQLite INTEGER (and flights.ID)
+MAX_FLIGHT_ID = 2 ** 63 - 1
+ROUTE_MAP_MIN_FLIGHTS = 10
+
+_encode_json = json.JSONEncoder(default=str).encode
+
+
+class BadRequest(ValueError):
+    """
+    An invalid request argument, answered with 400.
+    """
+
+
+class ResponseCache:
+    """
+    A thread-safe LRU of encoded response bodies, bounded by their total
+    size in bytes.
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._bodies = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._bodies.get(key)
+            if entry is not None:
+                self._bodies.move_to_end(key)
+            return entry
+
+    def put(self, key, entry) -> None:
+        """
+        Store a (content type, body, content encoding) entry.
+        """
+        size = len(entry[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._bodies[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._bytes -= len(evicted[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
+            self._bytes = 0
+
+
+# Argument parsing
+
+def _iata(value) -> str:
+    if not (value.isalpha() and len(value) == 3):
+        raise BadRequest(f"invalid IATA code {value!r}")
+    return value.upper()
+
+
+def _int(query, name, default, minimum=1, maximum=None) -> int:
+    value = query.get(name, [None])[0]
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise BadRequest(f"{name} is out of range")
+    return number
+
+
+def _float(query, name, default) -> float:
+    value = query.get(name, [None])[0]
+    if value is None:
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be a number")
+    if number < 0:
+        raise BadRequest(f"{name} must not be negative")
+    return number
+
+
+def _flight_id(value) -> int:
+    flight_id = int(value)
+    if flight_id > MAX_FLIGHT_ID:
+        raise BadRequest(f"flight ID {value} is out of range")
+    return flight_id
+
+
+def _date(value, name="date") -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"invalid {name} {value!r}, expected YYYY-MM-DD")
+
+
+def _date_range(query) -> tuple:
+    start = _date(query.get('start', [None])[0], 'start')
+    end = _date(query.get('end', [None])[0], 'end')
+    if end < start:
+        raise BadRequest("end is before start")
+    return start, end
+
+
+def _optional(query, name):
+    return query.get(name, [None])[0]
+
+
+# Response bodies
+
+def rows_body(rows, **extra) -> dict:
+    """
+    Return the JSON object of a result: its columns and value lists.
+    """
+    rows = list(rows)
+    columns = row_columns(rows[0]) if rows else []
+    return {'columns': columns, 'rows': [list(row) for row in rows], **extra}
+
+
+def page_body(page) -> dict:
+    rows, next_cursor = page
+    return rows_body(rows, next_cursor=next_cursor)
+
+
+def airports_body(found) -> dict:
+    """
+    Return the JSON object of (Airport, distance) pairs.
+    """
+    if not found:
+        return {'columns': [], 'rows': []}
+    columns = list(found[0][0]._fields) + ['DISTANCE_KM']
+    return {'columns': columns,
+            'rows': [list(airport) + [distance]
+                     for airport, distance in found]}
+
+
+def map_body(routes, query, cluster_markers=False):
+    """
+    Return the HTML of a map of routes, rendered once into the map
+    directory, or their GeoJSON with ?format=geojson.
+    """
+    from generate_visual_data_map import cached_routes_map, routes_geojson
+
+    map_format = _optional(query, 'format') or 'html'
+    if map_format == 'geojson':
+        return routes_geojson(routes)
+    if map_format != 'html':
+        raise BadRequest(f"invalid map format {map_format!r}")
+    path = cached_routes_map(routes, cluster_markers=cluster_markers)
+    with open(path, encoding='utf-8') as html_file:
+        return html_file.read()
+
+
+def route_map_routes(fd, origin, destination) -> list:
+    """
+    Both directions of a route in the format of process_routes_and_map.
+    """
+    percentages, coords = fd.fan_out(
+        lambda: fd.generate_percentage_of_delayed_flights(origin,
+                                                          destination),
+        lambda: fd.get_airport_coords([origin, destination]))
+    return [(route_origin, route_destination, percent,
+             *coords[route_origin][1:], *coords[route_destination][1:])
+            for route_origin, route_destination, percent in percentages
+            if route_origin in coords and route_destination in coords]
+
+
+# Endpoints: (pattern, handler). A handler is called with the FlightData
+# object, the path groups and the query arguments and returns a JSON object,
+# or a str of HTML.
+
+def _flight_by_id(fd, groups, query):
+    return rows_body(fd.get_flight_by_id(_flight_id(groups[0])))
+
+
+def _flights_by_date(fd, groups, query):
+    day = _date(groups[0])
+    return page_body(fd.get_flights_by_date_page(
+        day.day, day.month, day.year,
+        _int(query, 'page_size', fd.DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE),
+        _optional(query, 'cursor')))
+
+
+def _flights_by_airline(fd, groups, query):
+    return page_body(fd.get_delayed_flights_by_airline_page(
+        groups[0],
+        _int(query, 'page_size', fd.DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE),
+        _optional(query, 'cursor')))
+
+
+def _flights_by_airport(fd, groups, query):
+    return page_body(fd.get_delayed_flights_by_airport_page(
+        _iata(groups[0]),
+        _int(query, 'page_size', fd.DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE),
+        _optional(query, 'cursor')))
+
+
+def _route_delay(fd, groups, query):
+    return rows_body(fd.generate_percentage_of_delayed_flights(
+        _iata(groups[0]), _iata(groups[1])))
+
+
+def _routes_from_airport(fd, groups, query):
+    return rows_body(fd.get_routes_from_airport(_iata(groups[0])))
+
+
+def _most_delayed_routes(fd, groups, query):
+    return rows_body(fd.get_most_delayed_routes(
+        _int(query, 'limit', 100, maximum=100_000),
+        _int(query, 'min_flights', ROUTE_MAP_MIN_FLIGHTS)))
+
+
+def _cube_filters(query) -> dict:
+    filters = {}
+    if _optional(query, 'airline') is not None:
+        filters['airline'] = _optional(query, 'airline')
+    if _optional(query, 'origin') is not None:
+        filters['origin_airport'] = _iata(_optional(query, 'origin'))
+    return filters
+
+
+def _delay_summary(fd, groups, query):
+    return rows_body(fd.get_delay_summary(*_date_range(query),
+                                          **_cube_filters(query)))
+
+
+def _daily_delays(fd, groups, query):
+    return rows_body(fd.get_daily_delay_trend(*_date_range(query),
+                                              **_cube_filters(query)))
+
+
+def _delays_by_airline(fd, groups, query):
+    filters = _cube_filters(query)
+    filters.pop('airline', None)
+    return rows_body(fd.get_delays_by_airline(*_date_range(query), **filters))
+
+
+def _delays_by_airport(fd, groups, query):
+    filters = _cube_filters(query)
+    filters.pop('origin_airport', None)
+    return rows_body(fd.get_delays_by_origin_airport(*_date_range(query),
+                                                     **filters))
+
+
+def _flight_filters(query) -> dict:
+    filters = _cube_filters(query)
+    if _optional(query, 'destination') is not None:
+        filters['destination_airport'] = _iata(_optional(query,
+                                                         'destination'))
+    return filters
+
+
+def _percentiles(query) -> list:
+    value = _optional(query, 'percentiles')
+    if value is None:
+        return list(data.FlightData.DEFAULT_PERCENTILES)
+    try:
+        return [float(part) for part in value.split(',')]
+    except ValueError:
+        raise BadRequest("percentiles must be comma separated numbers")
+
+
+def _delay_percentiles(fd, groups, query):
+    return rows_body(fd.get_delay_percentiles(
+        _optional(query, 'by') or 'all', _percentiles(query),
+        min_flights=_int(query, 'min_flights', 1), **_flight_filters(query)))
+
+
+def _delay_histogram(fd, groups, query):
+    return rows_body(fd.get_delay_histogram(
+        _optional(query, 'by') or 'all',
+        _int(query, 'bin_minutes', 15, maximum=24 * 60),
+        **_flight_filters(query)))
+
+
+def _top_delay_rates(fd, groups, query):
+    return rows_body(fd.get_top_delay_rates(
+        _optional(query, 'by') or 'route',
+        _int(query, 'limit', 10, maximum=100_000),
+        _int(query, 'min_flights', 100)))
+
+
+def _airport(fd, groups, query):
+    airport = fd.airport_index.get(_iata(groups[0]))
+    return rows_body([airport] if airport is not None else [])
+
+
+def _nearby_airports(fd, groups, query):
+    return airports_body(fd.get_airports_within(
+        _iata(groups[0]), _float(query, 'radius_km', 100.0)))
+
+
+def _route_map(fd, groups, query):
+    return map_body(route_map_routes(fd, _iata(groups[0]), _iata(groups[1])),
+                    query)
+
+
+def _airport_map(fd, groups, query):
+    return map_body(fd.get_routes_from_airport(_iata(groups[0])), query)
+
+
+def _most_delayed_map(fd, groups, query):
+    routes = fd.get_most_delayed_routes(
+        _int(query, 'limit', 100, maximum=100_000),
+        _int(query, 'min_flights', ROUTE_MAP_MIN_FLIGHTS))
+    return map_body(routes, query, cluster_markers=len(routes) > 500)
+
+
+def _map_viewer(fd, groups, query):
+    from generate_visual_data_map import VIEWER_HTML
+    return VIEWER_HTML
+
+
+ENDPOINTS = [(re.compile(pattern), handler) for pattern, handler in (
+    (r'/flights/(\d+)', _flight_by_id),
+    (r'/flights/date/([^/]+)', _flights_by_date),
+    (r'/flights/airline/([^/]+)', _flights_by_airline),
+    (r'/flights/airport/([^/]+)', _flights_by_airport),
+    (r'/routes/delay/([^/]+)/([^/]+)', _route_delay),
+    (r'/routes/from/([^/]+)', _routes_from_airport),
+    (r'/routes/most-delayed', _most_delayed_routes),
+    (r'/delays/summary', _delay_summary),
+    (r'/delays/daily', _daily_delays),
+    (r'/delays/airlines', _delays_by_airline),
+    (r'/delays/airports', _delays_by_airport),
+    (r'/delays/percentiles', _delay_percentiles),
+    (r'/delays/histogram', _delay_histogram),
+    (r'/delays/top', _top_delay_rates),
+    (r'/airports/([^/]+)', _airport),
+    (r'/airports/([^/]+)/nearby', _nearby_airports),
+    (r'/maps/route/([^/]+)/([^/]+)', _route_map),
+    (r'/maps/airport/([^/]+)', _airport_map),
+    (r'/maps/most-delayed', _most_delayed_map),
+    (r'/maps/viewer', _map_viewer),
+)]
+
+
+class FlightDataHandler(BaseHTTPRequestHandler):
+    """
+    Serves the endpoints of a FlightDataServer.
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FlightData/1.0'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body are written separately: without TCP_NODELAY every
+    # keep-alive response waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        path = unquote(url.path).rstrip('/') or '/'
+        if path == '/health':
+            self._send(HTTPStatus.OK, 'application/json',
+                       _encode_json({'status': 'ok'}).encode(),
+                       cache_control='no-store')
+            return
+
+        for pattern, handler in ENDPOINTS:
+            match = pattern.fullmatch(path)
+            if match is not None:
+                break
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"unknown path {path!r}")
+            return
+
+        server = self.server
+        etag = server.etag(url.path, url.query)
+        if etag in self._if_none_match():
+            self._send(HTTPStatus.NOT_MODIFIED, None, b'', etag=etag)
+            return
+
+        accepts_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        key = (etag, accepts_gzip)
+        cached = server.responses.get(key)
+        if cached is None:
+            try:
+                result = handler(server.data_manager, match.groups(),
+                                 parse_qs(url.query))
+            except ValueError as e:
+                # BadRequest, and invalid page cursors
+                self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+                return
+            if isinstance(result, str):
+                content_type = 'text/html; charset=utf-8'
+                body = result.encode()
+            else:
+                content_type = 'application/json'
+                body = _encode_json(result).encode()
+            encoding = None
+            if accepts_gzip and len(body) >= GZIP_MIN_BYTES:
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+                encoding = 'gzip'
+            cached = (content_type, body, encoding)
+            server.responses.put(key, cached)
+
+        content_type, body, encoding = cached
+        self._send(HTTPStatus.OK, content_type, body, etag=etag,
+                   content_encoding=encoding)
+
+    def _if_none_match(self) -> list:
+        header = self.headers.get('If-None-Match', '')
+        return [tag.strip() for tag in header.split(',') if tag.strip()]
+
+    def _send(self, status, content_type, body, etag=None,
+              content_encoding=None, cache_control=None) -> None:
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header('Content-Type', content_type)
+        if content_encoding is not None:
+            self.send_header('Content-Encoding', content_encoding)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', cache_control or
+                         f"public, max-age={self.server.max_age}")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message) -> None:
+        self._send(status, 'application/json',
+                   _encode_json({'error': message}).encode(),
+                   cache_control='no-store')
+
+    def log_message(self, format, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class FlightDataServer(ThreadingHTTPServer):
+    """
+    An HTTP server answering requests from a fixed pool of worker threads
+    with one shared FlightData object.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, data_manager, workers=DEFAULT_WORKERS,
+                 max_age=DEFAULT_MAX_AGE, version_ttl=DEFAULT_VERSION_TTL,
+                 quiet=False):
+        """
+        Parameters:
+            address (tuple): The (host, port) to listen on.
+            data_manager (FlightData): Serves every request.
+            workers (int): The number of worker threads.
+            max_age (int): The Cache-Control max-age in seconds.
+            version_ttl (int): Seconds between checks of the data version.
+            quiet (bool): Do not log every request.
+        """
+        super().__init__(address, FlightDataHandler)
+        self.data_manager = data_manager
+        self.max_age = max_age
+        self.version_ttl = version_ttl
+        self.quiet = quiet
+        self.responses = ResponseCache()
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='flight-data')
+        self._version = None
+        self._version_checked = 0.0
+        self._version_lock = threading.Lock()
+
+    def process_request(self, request, client_address) -> None:
+        self._executor.submit(self.process_request_thread, request,
+                              client_address)
+
+    def handle_error(self, request, client_address) -> None:
+        # A client closing its connection early is not an error of the server
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=False)
+        self.data_manager.close()
+
+    def data_version(self) -> str:
+        """
+        Return the data version, re-read at most every `version_ttl`
+        seconds. The result and response caches are cleared when it
+        changes.
+        """
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked \
+                >= self.version_ttl:
+            with self._version_lock:
+                if self._version is None or now - self._version_checked \
+                        >= self.version_ttl:
+                    version = self.data_manager.data_version()
+                    if self._version is not None and version != self._version:
+                        if self.data_manager.cache is not None:
+                            self.data_manager.cache.invalidate()
+                        self.responses.clear()
+                    self._version = version
+                    self._version_checked = now
+        return self._version
+
+    def etag(self, path, query) -> str:
+        """
+        Return the weak ETag of a request URL at the current data version.
+        """
+        digest = hashlib.sha1(f"{path}?{query}".encode()).hexdigest()[:16]
+        return f'W/"{self.data_version()}-{digest}"'
+
+
+def create_server(db_uri, host='127.0.0.1', port=DEFAULT_PORT,
+                  workers=DEFAULT_WORKERS, max_age=DEFAULT_MAX_AGE,
+                  quiet=False,
+                  delay_threshold=DEFAULT_DELAY_THRESHOLD) -> FlightDataServer:
+    """
+    Create a server with a shared FlightData object. The summary tables
+    and in-memory indexes are loaded before the first request.
+
+    Returns:
+        FlightDataServer: The server, call `serve_forever` to start it.
+    """
+    data_manager = data.FlightData(db_uri, cache=QueryCache(),
+                                   profile=DEFAULT_PROFILE, light_rows=True,
+                                   delay_threshold=delay_threshold)
+    data_manager.resolve_airlines("")
+    data_manager.get_airport_coords([])
+    data_manager.refresh_route_stats()
+    data_manager.refresh_delay_cube()
+    return FlightDataServer((host, port), data_manager, workers=workers,
+                            max_age=max_age, quiet=quiet)
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the server.
+
+    Parameter:
+        argv (list of str): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="HTTP/JSON query service for the flights database.")
+    parser.add_argument('--db', default=SQLITE_URI,
+                        help="SQLAlchemy URI of the flights database.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Number of worker threads.")
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE,
+                        help="Cache-Control max-age in seconds.")
+    parser.add_argument('--delay-threshold', type=int,
+                        default=DEFAULT_DELAY_THRESHOLD,
+                        help="Minutes from which a departure is delayed.")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Do not log every request.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # Server entry point.
+    args = parse_arguments(argv)
+    server = create_server(args.db, args.host, args.port, args.workers,
+                           args.max_age, args.quiet, args.delay_threshold)
+    print(f"Serving {args.db} on http://{args.host}:{server.server_port}/ "
+          f"with {args.workers} workers.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
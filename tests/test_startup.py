@@ -0,0 +1,86 @@
+"""
+Startup time budget.
+
+Imports `main` in fresh interpreters with `python -X importtime` and fails
+if the cumulative import time of `main` (best of STARTUP_RUNS) is over the
+budget, or if importing it loads a module that must only be loaded on
+demand: folium and NumPy are imported when a map is drawn, SQLAlchemy on
+the first query.
+
+Run with `python -m pytest tests`; benchmarks/check_import_time.py prints
+the same measurement with the slowest imports.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 150
+
+STARTUP_RUNS = 5
+
+LAZY_MODULES = ('folium', 'branca', 'numpy', 'sqlalchemy')
+
+
+def import_times(module) -> dict:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict: Maps the module and every module imported while importing it
+              (but not the interpreter startup) to their cumulative import
+              time in microseconds.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True,
+                            check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(cumulative), depth))
+
+    # Nested imports are listed right before the module importing them
+    end = max(i for i, (name, _, depth) in enumerate(entries)
+              if name == module and depth == 0)
+    start = end
+    while start > 0 and entries[start - 1][2] > 0:
+        start -= 1
+    return {name: cumulative for name, cumulative, _ in entries[start:end + 1]}
+
+
+def best_import_times(module, runs) -> dict:
+    """
+    Return the `import_times` of the fastest of several imports.
+    """
+    return min((import_times(module) for _ in range(runs)),
+               key=lambda times: times[module])
+
+
+def eager_modules(module) -> list:
+    """
+    Return the lazy modules found in `sys.modules` after importing a
+    module in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, '-c',
+         f"import sys, {module}; "
+         f"print(' '.join(sorted({{name.split('.')[0] for name in "
+         f"sys.modules}} & set({LAZY_MODULES!r}))))"],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_main_imports_no_lazy_modules():
+    assert eager_modules('main') == []
+
+
+def test_main_import_time_within_budget():
+    total_ms = best_import_times('main', STARTUP_RUNS)['main'] / 1000
+    assert total_ms <= DEFAULT_BUDGET_MS, \
+        f"import main took {total_ms:.1f} ms, budget {DEFAULT_BUDGET_MS} ms"
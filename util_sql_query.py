@@ -14,35 +14,217 @@ Queries:
 
     QUERY_FLIGHT_BY_DATE:
         Retrieves flights based on a specific date and filters those with
-        a departure delay of at least 20 minutes.
+        a departure delay of at least `delay_threshold` minutes.
 
         Parameters:
             - day (int): The day of the flight.
             - month (int): The month of the flight.
             - year (int): The year of the flight.
 
-    QUERY_FLIGHT_BY_AIRLINE:
-        Retrieves flights for a specific airline, filtering those with a
-        departure delay of at least 20 minutes.
+    QUERY_FLIGHT_BY_AIRLINE_IDS:
+        Retrieves flights of a set of airlines, filtering those with a
+        departure delay of at least `delay_threshold` minutes. The airline
+        IDs are resolved from the (partial) name the user entered with
+        AirlineSearch (see airline_search.py), so the flights are found
+        through the (AIRLINE, DEPARTURE_DELAY) index.
 
-        Parameter:
-            - airline (str): The name (or partial name) of the airline,
-                              case-insensitive.
+        Template:
+            - {ids}: the placeholders of the airline IDs (see
+              "Batch queries").
 
     QUERY_FLIGHT_BY_ORIGIN_AIRPORT:
         Retrieves flights departing from a specified origin airport and filters
-        those with a departure delay of at least 20 minutes.
+        those with a departure delay of at least `delay_threshold` minutes.
 
         Parameter:
             - origin_airport (str): The IATA code of the origin airport.
 
+    QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS:
+        Calculates the percentage of delayed flights for a route in both
+        directions by grouping the whole `flights` table. Only used as a
+        fallback when the `route_stats` summary table cannot be built.
+
+        Parameters:
+            - origin, destination (str): IATA codes of the route.
+            - origin_vv, destination_vv (str): IATA codes of the reverse route.
+
+    QUERY_ROUTE_STATS_PERCENTAGE:
+        Same result as QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS, answered as a
+        point lookup on the precomputed `route_stats` table.
+
+        Parameters:
+            - origin, destination (str): IATA codes of the route.
+            - origin_vv, destination_vv (str): IATA codes of the reverse route.
+
+Route statistics:
+    The `route_stats` table holds the delayed and total number of flights per
+    directed route (ORIGIN_AIRPORT, DESTINATION_AIRPORT). `route_stats_meta`
+    stores the fingerprint (row count and highest ID) of `flights` at the time
+    the summary was built, so a changed `flights` table can be detected with
+    QUERY_FLIGHTS_FINGERPRINT and the summary rebuilt. It also stores the
+    delay threshold the summary was built with; QUERY_TABLE_COLUMNS tells
+    whether a meta table from an older version lacks that column.
+
+    Updates and deletes in place do not always change the row count or the
+    highest ID. The `flights_changes` table holds a counter that the
+    triggers of QUERY_CREATE_FLIGHTS_UPDATE_TRIGGER and
+    QUERY_CREATE_FLIGHTS_DELETE_TRIGGER increment for every updated or
+    deleted flight; the meta tables store it too (FLIGHTS_CHANGES). The
+    counter table and the triggers are created with the summary tables.
+    Inserts are not counted: they change the row count, and the delay cube
+    adds appended flights incrementally.
+
+Batch queries:
+    QUERY_FLIGHTS_BY_IDS, QUERY_FLIGHTS_BY_DATES,
+    QUERY_ROUTE_STATS_BY_ROUTES and QUERY_PERCENTAGE_BY_ROUTES answer many
+    lookups in one statement. They are templates: `{ids}`, `{dates}` and
+    `{routes}` are replaced by a list of numbered placeholders (see
+    `FlightData._bind_list`) before the query is executed.
+
+Route maps:
+    QUERY_ROUTES_FROM_AIRPORT and QUERY_MOST_DELAYED_ROUTES return the delay
+    percentage and the coordinates of both airports for a set of routes.
+    `{route_stats}` is replaced by `route_stats`, or by the subquery
+    QUERY_ROUTE_STATS_SOURCE when the summary table is not available.
+
+Columnar analytics:
+    QUERY_FLIGHT_COLUMNS and QUERY_AIRLINES load the columns
+    ColumnarFlightData (see columnar_data.py) keeps in memory. NULL
+    airlines, airports and date parts are loaded as -1, '' and 0, which
+    no lookup matches, so the columns fit in integer arrays.
+
+Airport index:
+    QUERY_AIRPORTS loads the airports table into the AirportIndex (see
+    airport_index.py) that answers coordinate and distance lookups.
+
+Daily delay cube:
+    The `daily_delay_cube` table pre-aggregates `flights` per cell
+    (FLIGHT_DATE, AIRLINE, ORIGIN_AIRPORT), FLIGHT_DATE being the date as a
+    YYYYMMDD integer. Every cell holds the number of flights, delayed
+    flights, flights with a departure delay, the sum of the delays and the
+    highest delay, so rates and averages over any date range can be summed
+    up from the cells.
+
+    QUERY_UPSERT_DELAY_CUBE aggregates the flights with an ID above
+    :last_id (see QUERY_DELAY_CUBE_SOURCE) and adds them to their cells,
+    so appended flights only touch the cells of their days.
+    `daily_delay_cube_meta` stores the fingerprint of `flights` the cube
+    includes, like `route_stats_meta`.
+
+    QUERY_DELAY_CUBE_SUMMARY, QUERY_DELAY_CUBE_DAILY,
+    QUERY_DELAY_CUBE_BY_AIRLINE and QUERY_DELAY_CUBE_BY_ORIGIN answer range
+    queries from the cells. They are templates: `{cube}` is replaced by
+    `daily_delay_cube` (or by QUERY_DELAY_CUBE_SOURCE as a subquery when the
+    cube is not available) and `{filters}` by any of
+    QUERY_DELAY_CUBE_AIRLINE_FILTER and QUERY_DELAY_CUBE_ORIGIN_FILTER.
+
+        Parameters:
+            - start, end (int): the first and last date, YYYYMMDD.
+            - origin_airport (str): with QUERY_DELAY_CUBE_ORIGIN_FILTER.
+
+Delay distributions:
+    QUERY_DELAY_PERCENTILES, QUERY_DELAY_HISTOGRAM and QUERY_TOP_DELAY_RATES
+    are templates for delay analytics grouped by one of DELAY_GROUPS; the
+    group columns are filled in by FlightData. Each is answered by SQLite
+    in one scan; no flight rows are sent to Python.
+
+    QUERY_DELAY_FREQUENCIES counts the flights per group and departure
+    delay. Delays are mostly whole minutes, so this exact distribution has
+    a few hundred rows per group, and with the (..., DEPARTURE_DELAY) indexes it
+    is read in index order without sorting. `{frequency_columns}` is the
+    list of group columns and `{filters}` any of
+    QUERY_FLIGHTS_AIRLINE_FILTER, QUERY_FLIGHTS_ORIGIN_FILTER and
+    QUERY_FLIGHTS_DESTINATION_FILTER.
+
+    QUERY_DELAY_PERCENTILES adds the cumulative share of every delay
+    within its group to the distribution with window sums (both ordered
+    by delay, so that SQLite sorts the rows once). The p-th
+    percentile is the smallest delay whose share reaches p (nearest rank);
+    `{percentiles}` holds one QUERY_DELAY_PERCENTILE_COLUMN per percentile,
+    and `{group_by}` is QUERY_DELAY_PERCENTILES_GROUP_BY unless all flights
+    form one group.
+
+        Parameters:
+            - min_flights (int): the smallest group size to report.
+            - p_0, p_1, ... (float): the percentiles as fractions, 0 to 1.
+
+    QUERY_DELAY_HISTOGRAM sums the distribution up in bins of :bin_minutes
+    (bins start at multiples of it, also for early departures; a delay
+    falls into the bin of floor(delay / :bin_minutes), which SQLite
+    computes with CAST, as truncation towards zero corrected for negative
+    delays, since floor() is not available in every build) and adds
+    the share and cumulative share of every bin with window sums over the
+    group.
+
+    QUERY_TOP_DELAY_RATES ranks groups by their percentage of delayed
+    flights and returns the first :limit ones. `{rates}` is
+    QUERY_ROUTE_STATS_DELAY_RATES (routes, origin or destination airports,
+    summed from `route_stats`) or QUERY_DELAY_CUBE_DELAY_RATES (airlines,
+    summed from `daily_delay_cube`).
+
+Reports:
+    QUERY_ORIGIN_AIRPORTS lists the airports with departing flights, busiest
+    first, used to partition the exports of export_reports.py.
+
+Keyset pagination:
+    QUERY_FLIGHT_BY_DATE_PAGE, QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE and
+    QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE return one page of the matching
+    delayed flights, ordered by (DEPARTURE_DELAY, ID) descending. A page
+    starts right after the (last_delay, last_id) position of the previous
+    page, so SQLite seeks to it in the (..., DEPARTURE_DELAY) indexes
+    instead of sorting and skipping every earlier row.
+
+    QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE is a template: `{pages}` is replaced
+    by one QUERY_FLIGHT_BY_AIRLINE_ID_PAGE per airline ID (a template on
+    the `{airline_id}` placeholder), joined with UNION ALL. Each of them
+    seeks idx_flights_airline_delay for one airline, so only the first
+    rows of every airline are merged, however many airlines match.
+
+        Parameters:
+            - the parameters of the unpaginated query, plus
+            - last_delay, last_id: the position of the last row of the
+              previous page.
+            - page_size (int): the maximum number of rows to return.
+
+Ingest:
+    QUERY_TABLE_COLUMNS (with table = 'flights') lists the columns the
+    columns of an ingested CSV file are matched against.
+
+    QUERY_INSERT_FLIGHTS is a template inserting one flight; `{columns}` is
+    replaced by the column list and `{placeholders}` by one `?` per column,
+    for `executemany` on the DBAPI cursor. Rows whose ID is already in
+    `flights` are skipped, so ingesting a file twice adds nothing.
+
+    QUERY_FLIGHTS_INDEXES lists the indexes of `flights` with the
+    statements that create them, so that they can be dropped before a bulk
+    load and created again once afterwards (QUERY_DROP_INDEX, a template
+    on `{name}`).
+
+Journal mode:
+    QUERY_SET_JOURNAL_MODE is a template on `{mode}`, one of JOURNAL_MODES,
+    and returns the journal mode in effect. The mode is stored in the
+    database file, so it is only changed on request (see maintenance.py),
+    never by a lookup.
+
+Indexes:
+    INDEX_DEFINITIONS maps index names to the statements creating them.
+    QUERY_INDEX_ADVICE maps the name of every registered query (see
+    REGISTERED_QUERIES) to the indexes that let SQLite answer it without a
+    full table scan. `FlightData.provision_indexes` uses both to create the
+    missing indexes.
+
 Notes:
     - The `COALESCE` function ensures null values in `DEPARTURE_DELAY`
       are treated as zero. An empty value should not be treated as a delay.
-    - The `DEPARTURE_DELAY` is filtered greater or equal to 20 minutes.
-      A flight is considered delayed if it is delayed by 20 minutes or more
+    - A flight is considered delayed if it is delayed by `delay_threshold`
+      minutes or more (DEFAULT_DELAY_THRESHOLD, 20, unless FlightData is
+      given another threshold). Every query counting or listing delayed
+      flights takes it as the `:delay_threshold` parameter; the summary
+      tables record the threshold they were built with.
 """
 
+DEFAULT_DELAY_THRESHOLD = 20
+
 QUERY_FLIGHT_BY_ID = ("SELECT flights.*, airlines.airline, flights.ID as "
                       "FLIGHT_ID, flights.DEPARTURE_DELAY as DELAY FROM "
                       "flights JOIN airlines ON flights.airline = airlines.id "
@@ -63,31 +245,29 @@ QUERY_FLIGHT_BY_DATE = ("SELECT "
                         "   COALESCE(f.DEPARTURE_DELAY, 0) AND "
                         "   f.DAY = :day AND f.MONTH = :month AND f.YEAR = :year "
                         "AND "
-                        "   f.DEPARTURE_DELAY >= 20 "
+                        "   f.DEPARTURE_DELAY >= :delay_threshold "
                         "ORDER BY "
                         "DEPARTURE_DELAY DESC "
                         )
 
-QUERY_FLIGHT_BY_AIRLINE = ("SELECT "
-                           "   f.id, "
-                           "   f.ORIGIN_AIRPORT, "
-                           "   f.DESTINATION_AIRPORT, "
-                           "   a.AIRLINE, "
-                           "   f.DEPARTURE_DELAY AS DELAY "
-                           "FROM "
-                           "   airlines AS a "
-                           "JOIN "
-                           "   flights AS f "
-                           "ON	a.ID = f.AIRLINE "
-                           "WHERE "
-                           "   COALESCE(f.DEPARTURE_DELAY, 0) "
-                           "AND "
-                           "   f.DEPARTURE_DELAY >= 20 "
-                           "AND "
-                           "   lower(a.AIRLINE) LIKE lower(:airline) "
-                           "ORDER BY "
-                           "DEPARTURE_DELAY DESC"
-                           )
+QUERY_FLIGHT_BY_AIRLINE_IDS = ("SELECT "
+                               "   f.id, "
+                               "   f.ORIGIN_AIRPORT, "
+                               "   f.DESTINATION_AIRPORT, "
+                               "   a.AIRLINE, "
+                               "   f.DEPARTURE_DELAY AS DELAY "
+                               "FROM "
+                               "   flights AS f "
+                               "JOIN "
+                               "   airlines AS a "
+                               "ON	a.ID = f.AIRLINE "
+                               "WHERE "
+                               "   f.AIRLINE IN ({ids}) "
+                               "AND "
+                               "   f.DEPARTURE_DELAY >= :delay_threshold "
+                               "ORDER BY "
+                               "DEPARTURE_DELAY DESC"
+                               )
 
 QUERY_FLIGHT_BY_ORIGIN_AIRPORT = ("SELECT "
                                   "   f.id, "
@@ -103,7 +283,7 @@ QUERY_FLIGHT_BY_ORIGIN_AIRPORT = ("SELECT "
                                   "WHERE "
                                   "   COALESCE(f.DEPARTURE_DELAY, 0) "
                                   "AND "
-                                  "   f.DEPARTURE_DELAY >= 20 "
+                                  "   f.DEPARTURE_DELAY >= :delay_threshold "
                                   "AND "
                                   "   f.ORIGIN_AIRPORT = :origin_airport "
                                   "ORDER BY "
@@ -119,7 +299,7 @@ QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS = \
      "          SELECT  "
      "          ORIGIN_AIRPORT, "
      "          DESTINATION_AIRPORT, "
-     "          COUNT(CASE WHEN DEPARTURE_DELAY >= 20 THEN 0 END) "
+     "          COUNT(CASE WHEN DEPARTURE_DELAY >= :delay_threshold THEN 0 END) "
      "          AS DELAYED_FLIGHTS, "
      "          COUNT(*) AS TOTAL_FLIGHTS "
      "   FROM flights "
@@ -130,14 +310,706 @@ QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS = \
      "   GROUP BY ORIGIN_AIRPORT, DESTINATION_AIRPORT "
      )
 
-QUERY_LONG_LAT = ("SELECT "
+QUERY_TABLE_EXISTS = ("SELECT "
+                      "   name "
+                      "FROM "
+                      "   sqlite_master "
+                      "WHERE "
+                      "   type = 'table' AND name = :name"
+                      )
+
+QUERY_TABLE_COLUMNS = ("SELECT "
+                       "   name "
+                       "FROM "
+                       "   pragma_table_info(:table) "
+                       "ORDER BY "
+                       "   cid"
+                       )
+
+QUERY_INDEX_EXISTS = ("SELECT "
+                      "   name "
+                      "FROM "
+                      "   sqlite_master "
+                      "WHERE "
+                      "   type = 'index' AND name = :name"
+                      )
+
+QUERY_CREATE_ROUTE_STATS = ("CREATE TABLE IF NOT EXISTS route_stats ( "
+                            "   ORIGIN_AIRPORT TEXT NOT NULL, "
+                            "   DESTINATION_AIRPORT TEXT NOT NULL, "
+                            "   DELAYED_FLIGHTS INTEGER NOT NULL, "
+                            "   TOTAL_FLIGHTS INTEGER NOT NULL, "
+                            "   PRIMARY KEY (ORIGIN_AIRPORT, DESTINATION_AIRPORT) "
+                            ") WITHOUT ROWID"
+                            )
+
+QUERY_CREATE_ROUTE_STATS_META = ("CREATE TABLE IF NOT EXISTS route_stats_meta ( "
+                                 "   FLIGHTS_COUNT INTEGER NOT NULL, "
+                                 "   FLIGHTS_MAX_ID INTEGER, "
+                                 "   BUILT_AT TEXT NOT NULL, "
+                                 "   DELAY_THRESHOLD INTEGER NOT NULL, "
+                                 "   FLIGHTS_CHANGES INTEGER NOT NULL "
+                                 ")"
+                                 )
+
+QUERY_CLEAR_ROUTE_STATS = "DELETE FROM route_stats"
+
+QUERY_DROP_ROUTE_STATS_META = "DROP TABLE IF EXISTS route_stats_meta"
+
+QUERY_ROUTE_STATS_SOURCE = \
+    ("SELECT "
+     "   ORIGIN_AIRPORT, "
+     "   DESTINATION_AIRPORT, "
+     "   COUNT(CASE WHEN DEPARTURE_DELAY >= :delay_threshold THEN 0 END) AS DELAYED_FLIGHTS, "
+     "   COUNT(*) AS TOTAL_FLIGHTS "
+     "FROM "
+     "   flights "
+     "WHERE "
+     "   ORIGIN_AIRPORT IS NOT NULL AND DESTINATION_AIRPORT IS NOT NULL "
+     "GROUP BY "
+     "   ORIGIN_AIRPORT, DESTINATION_AIRPORT"
+     )
+
+QUERY_POPULATE_ROUTE_STATS = \
+    ("INSERT INTO route_stats "
+     "   (ORIGIN_AIRPORT, DESTINATION_AIRPORT, DELAYED_FLIGHTS, TOTAL_FLIGHTS) "
+     + QUERY_ROUTE_STATS_SOURCE
+     )
+
+QUERY_FLIGHTS_FINGERPRINT = ("SELECT "
+                             "   COUNT(*) AS FLIGHTS_COUNT, "
+                             "   MAX(ID) AS FLIGHTS_MAX_ID "
+                             "FROM "
+                             "   flights"
+                             )
+
+QUERY_CREATE_FLIGHTS_CHANGES = ("CREATE TABLE IF NOT EXISTS flights_changes ( "
+                                "   ID INTEGER PRIMARY KEY CHECK (ID = 1), "
+                                "   CHANGES INTEGER NOT NULL "
+                                ")"
+                                )
+
+QUERY_INIT_FLIGHTS_CHANGES = ("INSERT OR IGNORE INTO flights_changes "
+                              "   (ID, CHANGES) "
+                              "VALUES "
+                              "   (1, 0)"
+                              )
+
+QUERY_CREATE_FLIGHTS_UPDATE_TRIGGER = \
+    ("CREATE TRIGGER IF NOT EXISTS flights_changes_update "
+     "AFTER UPDATE ON flights "
+     "BEGIN "
+     "   UPDATE flights_changes SET CHANGES = CHANGES + 1 WHERE ID = 1; "
+     "END"
+     )
+
+QUERY_CREATE_FLIGHTS_DELETE_TRIGGER = \
+    ("CREATE TRIGGER IF NOT EXISTS flights_changes_delete "
+     "AFTER DELETE ON flights "
+     "BEGIN "
+     "   UPDATE flights_changes SET CHANGES = CHANGES + 1 WHERE ID = 1; "
+     "END"
+     )
+
+QUERY_FLIGHTS_CHANGES = ("SELECT "
+                         "   CHANGES "
+                         "FROM "
+                         "   flights_changes "
+                         "WHERE "
+                         "   ID = 1"
+                         )
+
+QUERY_INSERT_ROUTE_STATS_META = \
+    ("INSERT INTO route_stats_meta "
+     "   (FLIGHTS_COUNT, FLIGHTS_MAX_ID, BUILT_AT, DELAY_THRESHOLD, "
+     "    FLIGHTS_CHANGES) "
+     "SELECT "
+     "   COUNT(*), "
+     "   MAX(ID), "
+     "   datetime('now'), "
+     "   :delay_threshold, "
+     "   (SELECT CHANGES FROM flights_changes WHERE ID = 1) "
+     "FROM "
+     "   flights"
+     )
+
+QUERY_ROUTE_STATS_META = ("SELECT "
+                          "   FLIGHTS_COUNT, "
+                          "   FLIGHTS_MAX_ID, "
+                          "   BUILT_AT, "
+                          "   DELAY_THRESHOLD, "
+                          "   FLIGHTS_CHANGES "
+                          "FROM "
+                          "   route_stats_meta"
+                          )
+
+QUERY_ROUTE_STATS_PERCENTAGE = \
+    ("SELECT "
+     "   ORIGIN_AIRPORT, "
+     "   DESTINATION_AIRPORT, "
+     "   DELAYED_FLIGHTS * 100.0 / TOTAL_FLIGHTS AS PERCENT_DELAYED "
+     "FROM "
+     "   route_stats "
+     "WHERE "
+     "   (ORIGIN_AIRPORT = :origin AND DESTINATION_AIRPORT = :destination) "
+     "OR "
+     "   (ORIGIN_AIRPORT = :origin_vv AND DESTINATION_AIRPORT = :destination_vv)"
+     )
+
+QUERY_FLIGHTS_BY_IDS = ("SELECT flights.*, airlines.airline, flights.ID as "
+                        "FLIGHT_ID, flights.DEPARTURE_DELAY as DELAY FROM "
+                        "flights JOIN airlines ON flights.airline = airlines.id "
+                        "WHERE flights.ID IN ({ids})")
+
+QUERY_FLIGHTS_BY_DATES = ("WITH requested (DAY, MONTH, YEAR) AS ( "
+                          "   VALUES {dates} "
+                          ") "
+                          "SELECT "
+                          "   f.id, "
+                          "   f.ORIGIN_AIRPORT, "
+                          "   f.DESTINATION_AIRPORT, "
+                          "   a.AIRLINE, "
+                          "   f.DEPARTURE_DELAY AS DELAY, "
+                          "   q.DAY AS REQUESTED_DAY, "
+                          "   q.MONTH AS REQUESTED_MONTH, "
+                          "   q.YEAR AS REQUESTED_YEAR "
+                          "FROM "
+                          "   requested AS q "
+                          "JOIN "
+                          "   flights AS f "
+                          "ON f.YEAR = q.YEAR AND f.MONTH = q.MONTH "
+                          "AND f.DAY = q.DAY "
+                          "JOIN "
+                          "   airlines AS a "
+                          "ON	a.ID = f.AIRLINE "
+                          "WHERE "
+                          "   f.DEPARTURE_DELAY >= :delay_threshold "
+                          "ORDER BY "
+                          "DEPARTURE_DELAY DESC "
+                          )
+
+QUERY_ROUTE_STATS_BY_ROUTES = \
+    ("WITH requested (ORIGIN, DESTINATION) AS ( "
+     "   VALUES {routes} "
+     ") "
+     "SELECT "
+     "   r.ORIGIN_AIRPORT, "
+     "   r.DESTINATION_AIRPORT, "
+     "   r.DELAYED_FLIGHTS * 100.0 / r.TOTAL_FLIGHTS AS PERCENT_DELAYED "
+     "FROM "
+     "   requested AS q "
+     "JOIN "
+     "   route_stats AS r "
+     "ON r.ORIGIN_AIRPORT = q.ORIGIN AND r.DESTINATION_AIRPORT = q.DESTINATION"
+     )
+
+QUERY_PERCENTAGE_BY_ROUTES = \
+    ("WITH requested (ORIGIN, DESTINATION) AS ( "
+     "   VALUES {routes} "
+     ") "
+     "SELECT "
+     "   f.ORIGIN_AIRPORT, "
+     "   f.DESTINATION_AIRPORT, "
+     "   COUNT(CASE WHEN f.DEPARTURE_DELAY >= :delay_threshold THEN 0 END) * 100.0 "
+     "   / COUNT(*) AS PERCENT_DELAYED "
+     "FROM "
+     "   requested AS q "
+     "JOIN "
+     "   flights AS f "
+     "ON f.ORIGIN_AIRPORT = q.ORIGIN AND f.DESTINATION_AIRPORT = q.DESTINATION "
+     "GROUP BY "
+     "   f.ORIGIN_AIRPORT, f.DESTINATION_AIRPORT"
+     )
+
+QUERY_ROUTE_MAP_SELECT = \
+    ("SELECT "
+     "   r.ORIGIN_AIRPORT, "
+     "   r.DESTINATION_AIRPORT, "
+     "   r.DELAYED_FLIGHTS * 100.0 / r.TOTAL_FLIGHTS AS PERCENT_DELAYED, "
+     "   o.LATITUDE AS ORIGIN_LATITUDE, "
+     "   o.LONGITUDE AS ORIGIN_LONGITUDE, "
+     "   d.LATITUDE AS DESTINATION_LATITUDE, "
+     "   d.LONGITUDE AS DESTINATION_LONGITUDE, "
+     "   r.TOTAL_FLIGHTS "
+     "FROM "
+     "   {route_stats} AS r "
+     "JOIN "
+     "   airports AS o "
+     "ON o.IATA_CODE = r.ORIGIN_AIRPORT "
+     "JOIN "
+     "   airports AS d "
+     "ON d.IATA_CODE = r.DESTINATION_AIRPORT "
+     )
+
+QUERY_ROUTES_FROM_AIRPORT = (QUERY_ROUTE_MAP_SELECT +
+                             "WHERE "
+                             "   r.ORIGIN_AIRPORT = :origin "
+                             "ORDER BY "
+                             "   PERCENT_DELAYED DESC"
+                             )
+
+QUERY_MOST_DELAYED_ROUTES = (QUERY_ROUTE_MAP_SELECT +
+                             "WHERE "
+                             "   r.TOTAL_FLIGHTS >= :min_flights "
+                             "ORDER BY "
+                             "   PERCENT_DELAYED DESC "
+                             "LIMIT :limit"
+                             )
+
+QUERY_FLIGHT_COLUMNS = ("SELECT "
+                        "   ID, "
+                        "   COALESCE(AIRLINE, -1) AS AIRLINE, "
+                        "   COALESCE(ORIGIN_AIRPORT, '') AS ORIGIN_AIRPORT, "
+                        "   COALESCE(DESTINATION_AIRPORT, '') "
+                        "   AS DESTINATION_AIRPORT, "
+                        "   COALESCE(YEAR, 0) AS YEAR, "
+                        "   COALESCE(MONTH, 0) AS MONTH, "
+                        "   COALESCE(DAY, 0) AS DAY, "
+                        "   DEPARTURE_DELAY "
+                        "FROM "
+                        "   flights"
+                        )
+
+QUERY_AIRLINES = ("SELECT "
+                  "   ID, "
+                  "   AIRLINE "
+                  "FROM "
+                  "   airlines"
+                  )
+
+QUERY_AIRPORTS = ("SELECT "
                   "   IATA_CODE, "
+                  "   AIRPORT, "
+                  "   CITY, "
+                  "   STATE, "
+                  "   COUNTRY, "
                   "   LATITUDE, "
                   "   LONGITUDE "
                   "FROM "
-                  "   airports "
-                  "WHERE "
-                  "   IATA_CODE = :origin "
-                  "OR"
-                  "   IATA_CODE = :destination "
+                  "   airports"
                   )
+
+QUERY_CREATE_DELAY_CUBE = ("CREATE TABLE IF NOT EXISTS daily_delay_cube ( "
+                           "   FLIGHT_DATE INTEGER NOT NULL, "
+                           "   AIRLINE INTEGER NOT NULL, "
+                           "   ORIGIN_AIRPORT TEXT NOT NULL, "
+                           "   FLIGHTS INTEGER NOT NULL, "
+                           "   DELAYED_FLIGHTS INTEGER NOT NULL, "
+                           "   DELAY_COUNT INTEGER NOT NULL, "
+                           "   DELAY_SUM REAL NOT NULL, "
+                           "   MAX_DELAY REAL, "
+                           "   PRIMARY KEY (FLIGHT_DATE, AIRLINE, ORIGIN_AIRPORT) "
+                           ") WITHOUT ROWID"
+                           )
+
+QUERY_CREATE_DELAY_CUBE_INDEX = ("CREATE INDEX IF NOT EXISTS "
+                                 "idx_delay_cube_origin_airline "
+                                 "ON daily_delay_cube "
+                                 "(ORIGIN_AIRPORT, AIRLINE, FLIGHT_DATE)"
+                                 )
+
+QUERY_CREATE_DELAY_CUBE_META = ("CREATE TABLE IF NOT EXISTS daily_delay_cube_meta ( "
+                                "   FLIGHTS_COUNT INTEGER NOT NULL, "
+                                "   FLIGHTS_MAX_ID INTEGER, "
+                                "   BUILT_AT TEXT NOT NULL, "
+                                "   DELAY_THRESHOLD INTEGER NOT NULL, "
+                                "   FLIGHTS_CHANGES INTEGER NOT NULL "
+                                ")"
+                                )
+
+QUERY_DROP_DELAY_CUBE_META = "DROP TABLE IF EXISTS daily_delay_cube_meta"
+
+QUERY_CLEAR_DELAY_CUBE = "DELETE FROM daily_delay_cube"
+
+QUERY_CLEAR_DELAY_CUBE_META = "DELETE FROM daily_delay_cube_meta"
+
+QUERY_DELAY_CUBE_SOURCE = \
+    ("SELECT "
+     "   YEAR * 10000 + MONTH * 100 + DAY AS FLIGHT_DATE, "
+     "   AIRLINE, "
+     "   ORIGIN_AIRPORT, "
+     "   COUNT(*) AS FLIGHTS, "
+     "   COUNT(CASE WHEN DEPARTURE_DELAY >= :delay_threshold THEN 0 END) AS DELAYED_FLIGHTS, "
+     "   COUNT(DEPARTURE_DELAY) AS DELAY_COUNT, "
+     "   TOTAL(DEPARTURE_DELAY) AS DELAY_SUM, "
+     "   MAX(DEPARTURE_DELAY) AS MAX_DELAY "
+     "FROM "
+     "   flights "
+     "WHERE "
+     "   ID > :last_id "
+     "AND "
+     "   YEAR IS NOT NULL AND MONTH IS NOT NULL AND DAY IS NOT NULL "
+     "AND "
+     "   AIRLINE IS NOT NULL AND ORIGIN_AIRPORT IS NOT NULL "
+     "GROUP BY "
+     "   YEAR, MONTH, DAY, AIRLINE, ORIGIN_AIRPORT"
+     )
+
+QUERY_UPSERT_DELAY_CUBE = \
+    ("INSERT INTO daily_delay_cube "
+     "   (FLIGHT_DATE, AIRLINE, ORIGIN_AIRPORT, FLIGHTS, DELAYED_FLIGHTS, "
+     "    DELAY_COUNT, DELAY_SUM, MAX_DELAY) "
+     + QUERY_DELAY_CUBE_SOURCE +
+     " ON CONFLICT (FLIGHT_DATE, AIRLINE, ORIGIN_AIRPORT) DO UPDATE SET "
+     "   FLIGHTS = FLIGHTS + excluded.FLIGHTS, "
+     "   DELAYED_FLIGHTS = DELAYED_FLIGHTS + excluded.DELAYED_FLIGHTS, "
+     "   DELAY_COUNT = DELAY_COUNT + excluded.DELAY_COUNT, "
+     "   DELAY_SUM = DELAY_SUM + excluded.DELAY_SUM, "
+     "   MAX_DELAY = CASE "
+     "      WHEN excluded.MAX_DELAY IS NULL OR MAX_DELAY >= excluded.MAX_DELAY "
+     "      THEN MAX_DELAY ELSE excluded.MAX_DELAY END"
+     )
+
+QUERY_INSERT_DELAY_CUBE_META = \
+    ("INSERT INTO daily_delay_cube_meta "
+     "   (FLIGHTS_COUNT, FLIGHTS_MAX_ID, BUILT_AT, DELAY_THRESHOLD, "
+     "    FLIGHTS_CHANGES) "
+     "SELECT "
+     "   COUNT(*), "
+     "   MAX(ID), "
+     "   datetime('now'), "
+     "   :delay_threshold, "
+     "   (SELECT CHANGES FROM flights_changes WHERE ID = 1) "
+     "FROM "
+     "   flights"
+     )
+
+QUERY_DELAY_CUBE_META = ("SELECT "
+                         "   FLIGHTS_COUNT, "
+                         "   FLIGHTS_MAX_ID, "
+                         "   BUILT_AT, "
+                         "   DELAY_THRESHOLD, "
+                         "   FLIGHTS_CHANGES "
+                         "FROM "
+                         "   daily_delay_cube_meta"
+                         )
+
+QUERY_COUNT_FLIGHTS_AFTER_ID = ("SELECT "
+                                "   COUNT(*) "
+                                "FROM "
+                                "   flights "
+                                "WHERE "
+                                "   ID > :last_id"
+                                )
+
+QUERY_DELAY_CUBE_MEASURES = \
+    ("   SUM(c.FLIGHTS) AS FLIGHTS, "
+     "   SUM(c.DELAYED_FLIGHTS) AS DELAYED_FLIGHTS, "
+     "   SUM(c.DELAYED_FLIGHTS) * 100.0 / SUM(c.FLIGHTS) AS PERCENT_DELAYED, "
+     "   SUM(c.DELAY_SUM) / SUM(c.DELAY_COUNT) AS AVG_DELAY, "
+     "   MAX(c.MAX_DELAY) AS MAX_DELAY "
+     )
+
+QUERY_DELAY_CUBE_RANGE = ("FROM "
+                          "   {cube} AS c "
+                          "WHERE "
+                          "   c.FLIGHT_DATE BETWEEN :start AND :end "
+                          "{filters}"
+                          )
+
+QUERY_DELAY_CUBE_AIRLINE_FILTER = "AND c.AIRLINE IN ({ids}) "
+
+QUERY_DELAY_CUBE_ORIGIN_FILTER = "AND c.ORIGIN_AIRPORT = :origin_airport "
+
+QUERY_DELAY_CUBE_SUMMARY = ("SELECT " +
+                            QUERY_DELAY_CUBE_MEASURES +
+                            QUERY_DELAY_CUBE_RANGE
+                            )
+
+QUERY_DELAY_CUBE_DAILY = ("SELECT "
+                          "   c.FLIGHT_DATE / 10000 AS YEAR, "
+                          "   c.FLIGHT_DATE / 100 % 100 AS MONTH, "
+                          "   c.FLIGHT_DATE % 100 AS DAY, " +
+                          QUERY_DELAY_CUBE_MEASURES +
+                          QUERY_DELAY_CUBE_RANGE +
+                          "GROUP BY "
+                          "   c.FLIGHT_DATE "
+                          "ORDER BY "
+                          "   c.FLIGHT_DATE"
+                          )
+
+QUERY_DELAY_CUBE_BY_AIRLINE = ("SELECT "
+                               "   (SELECT a.AIRLINE FROM airlines AS a "
+                               "    WHERE a.ID = c.AIRLINE) AS AIRLINE, " +
+                               QUERY_DELAY_CUBE_MEASURES +
+                               QUERY_DELAY_CUBE_RANGE +
+                               "GROUP BY "
+                               "   c.AIRLINE "
+                               "ORDER BY "
+                               "   PERCENT_DELAYED DESC"
+                               )
+
+QUERY_DELAY_CUBE_BY_ORIGIN = ("SELECT "
+                              "   c.ORIGIN_AIRPORT, " +
+                              QUERY_DELAY_CUBE_MEASURES +
+                              QUERY_DELAY_CUBE_RANGE +
+                              "GROUP BY "
+                              "   c.ORIGIN_AIRPORT "
+                              "ORDER BY "
+                              "   PERCENT_DELAYED DESC"
+                              )
+
+DELAY_GROUPS = {
+    'all': (),
+    'airline': ('AIRLINE',),
+    'origin': ('ORIGIN_AIRPORT',),
+    'destination': ('DESTINATION_AIRPORT',),
+    'route': ('ORIGIN_AIRPORT', 'DESTINATION_AIRPORT'),
+}
+
+QUERY_AIRLINE_NAME = ("(SELECT a.AIRLINE FROM airlines AS a "
+                      "WHERE a.ID = {alias}.AIRLINE) AS AIRLINE"
+                      )
+
+QUERY_FLIGHTS_AIRLINE_FILTER = "AND f.AIRLINE IN ({ids}) "
+
+QUERY_FLIGHTS_ORIGIN_FILTER = "AND f.ORIGIN_AIRPORT = :origin_airport "
+
+QUERY_FLIGHTS_DESTINATION_FILTER = \
+    "AND f.DESTINATION_AIRPORT = :destination_airport "
+
+QUERY_DELAY_FREQUENCIES = ("SELECT "
+                           "{frequency_columns}"
+                           "   f.DEPARTURE_DELAY AS DELAY, "
+                           "   COUNT(*) AS FLIGHTS "
+                           "FROM "
+                           "   flights AS f "
+                           "WHERE "
+                           "   f.DEPARTURE_DELAY IS NOT NULL "
+                           "{filters}"
+                           "GROUP BY "
+                           "{frequency_columns}"
+                           "   f.DEPARTURE_DELAY"
+                           )
+
+QUERY_DELAY_PERCENTILE_COLUMN = \
+    "   MIN(CASE WHEN d.SHARE >= :{name} THEN d.DELAY END) AS {label}, "
+
+QUERY_DELAY_PERCENTILES = \
+    ("SELECT "
+     "{group_select}"
+     "   SUM(d.FLIGHTS) AS FLIGHTS, "
+     "   TOTAL(CASE WHEN d.DELAY >= :delay_threshold THEN d.FLIGHTS END) "
+     "   * 100.0 / SUM(d.FLIGHTS) AS PERCENT_DELAYED, "
+     "   TOTAL(d.DELAY * d.FLIGHTS) / SUM(d.FLIGHTS) AS AVG_DELAY, "
+     "   MIN(d.DELAY) AS MIN_DELAY, "
+     "{percentiles}"
+     "   MAX(d.DELAY) AS MAX_DELAY "
+     "FROM ( "
+     "   SELECT "
+     "      c.*, "
+     "      SUM(c.FLIGHTS) OVER ({partition} ORDER BY c.DELAY) * 1.0 "
+     "      / SUM(c.FLIGHTS) OVER ({partition} ORDER BY c.DELAY "
+     "         ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) "
+     "      AS SHARE "
+     "   FROM ( " + QUERY_DELAY_FREQUENCIES + ") AS c "
+     ") AS d "
+     "{group_by}"
+     "ORDER BY "
+     "   FLIGHTS DESC"
+     )
+
+QUERY_DELAY_PERCENTILES_GROUP_BY = ("GROUP BY "
+                                    "   {columns} "
+                                    "HAVING "
+                                    "   SUM(d.FLIGHTS) >= :min_flights "
+                                    )
+
+QUERY_DELAY_HISTOGRAM = \
+    ("SELECT "
+     "{group_select}"
+     "   h.BIN_START, "
+     "   h.BIN_START + :bin_minutes AS BIN_END, "
+     "   h.FLIGHTS, "
+     "   h.FLIGHTS * 100.0 / SUM(h.FLIGHTS) OVER ({partition}) AS PERCENT, "
+     "   SUM(h.FLIGHTS) OVER ({partition} ORDER BY h.BIN_START) * 100.0 "
+     "   / SUM(h.FLIGHTS) OVER ({partition}) AS CUMULATIVE_PERCENT "
+     "FROM ( "
+     "   SELECT "
+     "{bin_columns}"
+     "      (CAST(c.DELAY / :bin_minutes AS INTEGER) "
+     "       - (c.DELAY < CAST(c.DELAY / :bin_minutes AS INTEGER) "
+     "          * :bin_minutes)) * :bin_minutes AS BIN_START, "
+     "      SUM(c.FLIGHTS) AS FLIGHTS "
+     "   FROM ( " + QUERY_DELAY_FREQUENCIES + ") AS c "
+     "   GROUP BY "
+     "{bin_columns}"
+     "      BIN_START "
+     ") AS h "
+     "ORDER BY "
+     "{order}"
+     "   h.BIN_START"
+     )
+
+QUERY_ROUTE_STATS_DELAY_RATES = \
+    ("SELECT "
+     "{group_select}"
+     "   SUM(s.TOTAL_FLIGHTS) AS FLIGHTS, "
+     "   SUM(s.DELAYED_FLIGHTS) AS DELAYED_FLIGHTS, "
+     "   SUM(s.DELAYED_FLIGHTS) * 100.0 / SUM(s.TOTAL_FLIGHTS) "
+     "   AS PERCENT_DELAYED "
+     "FROM "
+     "   {route_stats} AS s "
+     "GROUP BY "
+     "{group_by}"
+     "HAVING "
+     "   SUM(s.TOTAL_FLIGHTS) >= :min_flights"
+     )
+
+QUERY_DELAY_CUBE_DELAY_RATES = \
+    ("SELECT "
+     "{group_select}"
+     "   SUM(s.FLIGHTS) AS FLIGHTS, "
+     "   SUM(s.DELAYED_FLIGHTS) AS DELAYED_FLIGHTS, "
+     "   SUM(s.DELAYED_FLIGHTS) * 100.0 / SUM(s.FLIGHTS) AS PERCENT_DELAYED "
+     "FROM "
+     "   {cube} AS s "
+     "GROUP BY "
+     "{group_by}"
+     "HAVING "
+     "   SUM(s.FLIGHTS) >= :min_flights"
+     )
+
+QUERY_TOP_DELAY_RATES = ("SELECT "
+                         "   RANK() OVER (ORDER BY t.PERCENT_DELAYED DESC) "
+                         "   AS DELAY_RANK, "
+                         "   t.* "
+                         "FROM ( "
+                         "{rates}"
+                         ") AS t "
+                         "ORDER BY "
+                         "   DELAY_RANK, t.FLIGHTS DESC "
+                         "LIMIT :limit"
+                         )
+
+QUERY_ORIGIN_AIRPORTS = ("SELECT "
+                         "   ORIGIN_AIRPORT "
+                         "FROM "
+                         "   flights "
+                         "GROUP BY "
+                         "   ORIGIN_AIRPORT "
+                         "ORDER BY "
+                         "   COUNT(*) DESC, ORIGIN_AIRPORT"
+                         )
+
+QUERY_DELAYED_FLIGHT_PAGE_SELECT = ("SELECT "
+                                    "   f.id, "
+                                    "   f.ORIGIN_AIRPORT, "
+                                    "   f.DESTINATION_AIRPORT, "
+                                    "   a.AIRLINE, "
+                                    "   f.DEPARTURE_DELAY AS DELAY "
+                                    "FROM "
+                                    "   airlines AS a "
+                                    "JOIN "
+                                    "   flights AS f "
+                                    "ON	a.ID = f.AIRLINE "
+                                    "WHERE "
+                                    "   f.DEPARTURE_DELAY >= :delay_threshold "
+                                    "AND "
+                                    "   (f.DEPARTURE_DELAY, f.ID) "
+                                    "   < (:last_delay, :last_id) "
+                                    "AND "
+                                    )
+
+QUERY_DELAYED_FLIGHT_PAGE_ORDER = ("ORDER BY "
+                                   "   f.DEPARTURE_DELAY DESC, f.ID DESC "
+                                   "LIMIT :page_size"
+                                   )
+
+QUERY_FLIGHT_BY_DATE_PAGE = \
+    (QUERY_DELAYED_FLIGHT_PAGE_SELECT +
+     "   f.DAY = :day AND f.MONTH = :month AND f.YEAR = :year " +
+     QUERY_DELAYED_FLIGHT_PAGE_ORDER)
+
+QUERY_FLIGHT_BY_AIRLINE_ID_PAGE = \
+    ("SELECT "
+     "   id AS ID, "
+     "   ORIGIN_AIRPORT, "
+     "   DESTINATION_AIRPORT, "
+     "   AIRLINE, "
+     "   DELAY "
+     "FROM (" +
+     QUERY_DELAYED_FLIGHT_PAGE_SELECT +
+     "   f.AIRLINE = {airline_id} " +
+     QUERY_DELAYED_FLIGHT_PAGE_ORDER +
+     ")")
+
+QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE = ("{pages} "
+                                    "ORDER BY "
+                                    "   DELAY DESC, ID DESC "
+                                    "LIMIT :page_size"
+                                    )
+
+QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE = \
+    (QUERY_DELAYED_FLIGHT_PAGE_SELECT +
+     "   f.ORIGIN_AIRPORT = :origin_airport " +
+     QUERY_DELAYED_FLIGHT_PAGE_ORDER)
+
+QUERY_INSERT_FLIGHTS = ("INSERT OR IGNORE INTO flights ({columns}) "
+                        "VALUES ({placeholders})"
+                        )
+
+QUERY_FLIGHTS_INDEXES = ("SELECT "
+                         "   name, "
+                         "   sql "
+                         "FROM "
+                         "   sqlite_master "
+                         "WHERE "
+                         "   type = 'index' AND tbl_name = 'flights' "
+                         "   AND sql IS NOT NULL "
+                         "ORDER BY "
+                         "   name"
+                         )
+
+QUERY_DROP_INDEX = "DROP INDEX IF EXISTS {name}"
+
+QUERY_SET_JOURNAL_MODE = "PRAGMA journal_mode = {mode}"
+
+JOURNAL_MODES = ('WAL', 'DELETE')
+
+INDEX_DEFINITIONS = {
+    'idx_flights_date_delay':
+        "CREATE INDEX IF NOT EXISTS idx_flights_date_delay "
+        "ON flights (YEAR, MONTH, DAY, DEPARTURE_DELAY)",
+    'idx_flights_origin_delay':
+        "CREATE INDEX IF NOT EXISTS idx_flights_origin_delay "
+        "ON flights (ORIGIN_AIRPORT, DEPARTURE_DELAY)",
+    'idx_flights_airline_delay':
+        "CREATE INDEX IF NOT EXISTS idx_flights_airline_delay "
+        "ON flights (AIRLINE, DEPARTURE_DELAY)",
+    'idx_flights_route_delay':
+        "CREATE INDEX IF NOT EXISTS idx_flights_route_delay "
+        "ON flights (ORIGIN_AIRPORT, DESTINATION_AIRPORT, DEPARTURE_DELAY)",
+}
+
+# Templates are registered with a single placeholder in their lists, the
+# airline page with two airlines
+REGISTERED_QUERIES = {
+    'QUERY_FLIGHT_BY_ID': QUERY_FLIGHT_BY_ID,
+    'QUERY_FLIGHT_BY_DATE': QUERY_FLIGHT_BY_DATE,
+    'QUERY_FLIGHT_BY_AIRLINE_IDS':
+        QUERY_FLIGHT_BY_AIRLINE_IDS.format(ids=":airline_id"),
+    'QUERY_FLIGHT_BY_ORIGIN_AIRPORT': QUERY_FLIGHT_BY_ORIGIN_AIRPORT,
+    'QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS':
+        QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS,
+    'QUERY_ROUTE_STATS_SOURCE': QUERY_ROUTE_STATS_SOURCE,
+    'QUERY_FLIGHT_BY_DATE_PAGE': QUERY_FLIGHT_BY_DATE_PAGE,
+    'QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE':
+        QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE.format(pages=" UNION ALL ".join(
+            QUERY_FLIGHT_BY_AIRLINE_ID_PAGE.format(
+                airline_id=f":airline_id_{i}") for i in range(2))),
+    'QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE': QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE,
+}
+
+QUERY_INDEX_ADVICE = {
+    # ID is the INTEGER PRIMARY KEY (rowid) of flights, no index needed
+    'QUERY_FLIGHT_BY_ID': [],
+    'QUERY_FLIGHT_BY_DATE': ['idx_flights_date_delay'],
+    'QUERY_FLIGHT_BY_AIRLINE_IDS': ['idx_flights_airline_delay'],
+    'QUERY_FLIGHT_BY_ORIGIN_AIRPORT': ['idx_flights_origin_delay'],
+    'QUERY_AVG_PERCENTAGE_DELAYED_FLIGHTS': ['idx_flights_route_delay'],
+    'QUERY_ROUTE_STATS_SOURCE': ['idx_flights_route_delay'],
+    'QUERY_FLIGHT_BY_DATE_PAGE': ['idx_flights_date_delay'],
+    'QUERY_FLIGHT_BY_AIRLINE_IDS_PAGE': ['idx_flights_airline_delay'],
+    'QUERY_FLIGHT_BY_ORIGIN_AIRPORT_PAGE': ['idx_flights_origin_delay'],
+}